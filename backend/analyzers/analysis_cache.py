@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_description(description: str) -> str:
+    """Unicode-normalizes and collapses whitespace, so reposts that differ only in formatting match."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", description or "")).strip()
+
+
+class AnalysisCache:
+    """
+    Persistent LLM analysis cache, keyed by sha256(model, prompt version, normalized description).
+    Entries live in a local SQLite file; when it holds more than `max_entries`
+    the least recently used entries are evicted.
+    Hits, misses and the estimated cost saved are counted for the current run.
+    """
+    def __init__(self, path: str = ":memory:", max_entries: int = 50000,
+                 input_cost_per_million: float = 0.0, output_cost_per_million: float = 0.0,
+                 estimated_output_tokens: int = 500):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.input_cost_per_million = input_cost_per_million
+        self.output_cost_per_million = output_cost_per_million
+        self.estimated_output_tokens = estimated_output_tokens
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0, "saved_tokens": 0}
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute("pragma journal_mode = wal")
+            self.conn.execute(
+                "create table if not exists analysis_cache ("
+                "key text primary key, analysis text not null, created_at real not null, last_used real not null"
+                ") without rowid"
+            )
+            self.conn.execute("create index if not exists idx_analysis_cache_last_used on analysis_cache (last_used)")
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "AnalysisCache":
+        return cls(settings['path'], settings['max_entries'], settings['input_cost_per_million'],
+                   settings['output_cost_per_million'], settings['estimated_output_tokens'])
+
+    @staticmethod
+    def key(model: str, prompt_version: str, description: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt_version}\0{normalize_description(description)}".encode("utf-8")).hexdigest()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("select count(*) from analysis_cache").fetchone()[0]
+
+    def get(self, key: str, prompt_tokens: int = 0) -> Optional[Dict[str, Any]]:
+        """Returns the cached analysis (refreshing its LRU position) or None."""
+        with self._lock, self.conn:
+            row = self.conn.execute("select analysis from analysis_cache where key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.conn.execute("update analysis_cache set last_used = ? where key = ?", (time.time(), key))
+        self.record_hit(prompt_tokens)
+        return json.loads(row[0])
+
+    def record_hit(self, prompt_tokens: int = 0):
+        """Counts a saved LLM call (also used when a concurrent identical request is shared)."""
+        self.stats["hits"] += 1
+        self.stats["saved_tokens"] += prompt_tokens + self.estimated_output_tokens
+
+    def put(self, key: str, analysis: Dict[str, Any]):
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "insert into analysis_cache (key, analysis, created_at, last_used) values (?, ?, ?, ?) "
+                "on conflict (key) do update set analysis = excluded.analysis, last_used = excluded.last_used",
+                (key, json.dumps(analysis), now, now),
+            )
+            self.stats["stored"] += 1
+            excess = self.conn.execute("select count(*) from analysis_cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "delete from analysis_cache where key in (select key from analysis_cache order by last_used limit ?)",
+                    (excess,),
+                )
+                self.stats["evicted"] += excess
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def saved_cost(self) -> float:
+        """Estimated dollars saved this run: the prompt and output tokens of every hit."""
+        output_tokens = self.stats["hits"] * self.estimated_output_tokens
+        input_tokens = self.stats["saved_tokens"] - output_tokens
+        return (input_tokens * self.input_cost_per_million + output_tokens * self.output_cost_per_million) / 1_000_000
+
+    def report(self) -> str:
+        return (
+            f"Analysis cache: {self.stats['hits']} hits / {self.stats['misses']} misses "
+            f"({self.hit_rate():.0%} hit rate), saved {self.stats['hits']} LLM calls "
+            f"(~${self.saved_cost():.4f}), {self.stats['evicted']} evicted"
+        )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
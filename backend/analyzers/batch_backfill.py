@@ -0,0 +1,328 @@
+import json
+import os
+import time
+import uuid
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from db.storage import ANALYSIS_COLUMNS
+
+logger = logging.getLogger("BatchBackfill")
+
+# Batch statuses after which nothing changes any more
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class OpenAIBatchClient:
+    """The OpenAI Batch API (or any compatible endpoint at base_url), returning plain dicts."""
+    def __init__(self, base_url: Optional[str] = None, completion_window: str = "24h"):
+        from openai import OpenAI
+
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            logger.warning("OPENAI_API_KEY not found. Batch requests may fail.")
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.completion_window = completion_window
+
+    def upload_file(self, path: str) -> str:
+        with open(path, "rb") as f:
+            return self.client.files.create(file=f, purpose="batch").id
+
+    def create_batch(self, input_file_id: str, endpoint: str) -> Dict[str, Any]:
+        return self.client.batches.create(
+            input_file_id=input_file_id, endpoint=endpoint, completion_window=self.completion_window
+        ).model_dump()
+
+    def retrieve_batch(self, batch_id: str) -> Dict[str, Any]:
+        return self.client.batches.retrieve(batch_id).model_dump()
+
+    def download_file(self, file_id: str) -> str:
+        return self.client.files.content(file_id).text
+
+
+class LocalBatchServer:
+    """
+    In-process stand-in for the batch API, for tests and dry runs.
+    Each request body is answered by `handler(body) -> chat completion content`;
+    a handler exception becomes an error line. A batch reports in_progress for
+    `polls_until_done` retrievals before it completes.
+    """
+    def __init__(self, handler: Callable[[Dict[str, Any]], str], polls_until_done: int = 1):
+        self.handler = handler
+        self.polls_until_done = polls_until_done
+        self.files: Dict[str, str] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.polls: Dict[str, int] = {}
+
+    def _store(self, text: str) -> str:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        self.files[file_id] = text
+        return file_id
+
+    def upload_file(self, path: str) -> str:
+        with open(path, "r", encoding="utf-8") as f:
+            return self._store(f.read())
+
+    def create_batch(self, input_file_id: str, endpoint: str) -> Dict[str, Any]:
+        batch_id = f"batch-{uuid.uuid4().hex[:12]}"
+        self.batches[batch_id] = {"id": batch_id, "status": "in_progress", "endpoint": endpoint,
+                                  "input_file_id": input_file_id, "output_file_id": None, "error_file_id": None}
+        self.polls[batch_id] = 0
+        return dict(self.batches[batch_id])
+
+    def _complete(self, batch: Dict[str, Any]):
+        output, errors = [], []
+        for line in self.files[batch["input_file_id"]].splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                content = self.handler(request["body"])
+                output.append({"id": f"response-{uuid.uuid4().hex[:8]}", "custom_id": request["custom_id"], "error": None,
+                               "response": {"status_code": 200,
+                                            "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}}})
+            except Exception as e:
+                errors.append({"id": f"response-{uuid.uuid4().hex[:8]}", "custom_id": request["custom_id"], "response": None,
+                               "error": {"code": "server_error", "message": str(e)}})
+        batch["output_file_id"] = self._store("\n".join(json.dumps(r) for r in output)) if output else None
+        batch["error_file_id"] = self._store("\n".join(json.dumps(r) for r in errors)) if errors else None
+        batch["status"] = "completed"
+
+    def retrieve_batch(self, batch_id: str) -> Dict[str, Any]:
+        batch = self.batches[batch_id]
+        self.polls[batch_id] += 1
+        if batch["status"] == "in_progress" and self.polls[batch_id] > self.polls_until_done:
+            self._complete(batch)
+        return dict(batch)
+
+    def download_file(self, file_id: str) -> str:
+        return self.files[file_id]
+
+
+def create_batch_client(settings: Dict[str, Any]) -> OpenAIBatchClient:
+    return OpenAIBatchClient(settings.get('base_url'), settings['completion_window'])
+
+
+class BatchBackfill:
+    """
+    Re-analyzes jobs through a batch inference API instead of one live request per job.
+
+    prepare() routes each job the way the analyzer would: cached and confidently
+    rule-extracted analyses are written straight away, the rest become chat-completion
+    requests (full or free-text prompt) in JSONL files of at most `requests_per_file`
+    lines, each with a routes file holding what apply() needs to finish the result.
+    submit() uploads them and starts a batch for each, wait() polls until every batch
+    has finished, and apply() writes the parsed analyses back in bulk and caches them. Progress is kept in `<work_dir>/state.json` after every
+    step, so an interrupted run picks up where it stopped: files are not rewritten,
+    batches are not resubmitted and applied results are not applied twice.
+    A finished run is not resumed: the next prepare() starts a new backfill. An
+    unfinished one made with another model, prompt or job selection is an error.
+    Jobs whose response failed or did not parse, or whose batch failed or expired,
+    are listed in the state and keep their current analysis; the live processor
+    picks them up if they have none.
+    """
+    ENDPOINT = "/v1/chat/completions"
+
+    def __init__(self, storage, analyzer, client, work_dir: str, requests_per_file: int = 20000,
+                 poll_interval: float = 60.0):
+        self.storage = storage
+        self.analyzer = analyzer
+        self.client = client
+        self.work_dir = work_dir
+        self.requests_per_file = requests_per_file
+        self.poll_interval = poll_interval
+        self.state_path = os.path.join(work_dir, "state.json")
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return self._new_state()
+
+    @staticmethod
+    def _new_state() -> Dict[str, Any]:
+        return {"batches": [], "applied": 0, "failed": []}
+
+    def _run_settings(self, all_jobs: bool) -> Dict[str, Any]:
+        """What a resumed run must share with the one that wrote the request files."""
+        return {"model": self.analyzer.model_name, "prompt_version": self.analyzer.prompt_version, "all_jobs": all_jobs}
+
+    def _save_state(self):
+        os.makedirs(self.work_dir, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def request_line(self, job_id: str, description: str, route: str = "full") -> Dict[str, Any]:
+        """The batch request for a prepared description, with the prompt for its route."""
+        prompt = self.analyzer.free_text_prompt if route == "free_text" else self.analyzer.prompt
+        messages = prompt.format_messages(description=description)
+        return {
+            "custom_id": str(job_id),
+            "method": "POST",
+            "url": self.ENDPOINT,
+            "body": {"model": self.analyzer.model_name, "messages": [{"role": "user", "content": m.content} for m in messages]},
+        }
+
+    def _jobs(self, all_jobs: bool) -> Iterable[Dict[str, Any]]:
+        for job in self.storage.iter_jobs(columns=ANALYSIS_COLUMNS + ("llm_analysis",)):
+            if job.get("description") and (all_jobs or not job.get("llm_analysis")):
+                yield job
+
+    def prepare(self, all_jobs: bool = False) -> int:
+        """
+        Writes the request files (all jobs, or only unanalyzed ones) unless an
+        unfinished run with the same settings already did. Returns the number of requests written.
+        """
+        settings = self._run_settings(all_jobs)
+        if self.state["batches"]:
+            previous = {key: self.state.get(key) for key in settings}
+            if not all(entry["applied"] for entry in self.state["batches"]):
+                if previous != settings:
+                    raise ValueError(
+                        f"{self.work_dir} holds an unfinished backfill with {previous}, not {settings}; "
+                        "let it finish or use another work dir."
+                    )
+                logger.info(f"Resuming backfill in {self.work_dir} ({len(self.state['batches'])} batch files).")
+                return 0
+            logger.info(f"Previous backfill in {self.work_dir} is complete; starting a new one.")
+            for entry in self.state["batches"]:
+                for path in (entry["file"], entry["routes"]):
+                    if os.path.exists(path):
+                        os.remove(path)
+            self.state = self._new_state()
+        self.state.update(settings)
+        os.makedirs(self.work_dir, exist_ok=True)
+        count, lines, routes, direct = 0, [], [], []
+
+        def flush():
+            path = os.path.join(self.work_dir, f"requests_{len(self.state['batches']):04d}.jsonl")
+            routes_path = os.path.join(self.work_dir, f"routes_{len(self.state['batches']):04d}.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(line) + "\n" for line in lines)
+            with open(routes_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(route) + "\n" for route in routes)
+            self.state["batches"].append({"file": path, "routes": routes_path, "requests": len(lines),
+                                          "input_file_id": None, "batch_id": None, "status": None, "applied": False})
+
+        for job in self._jobs(all_jobs):
+            description = self.analyzer.prepare_description(job["description"])
+            key = self.analyzer._cache_key(description)
+            cached = self.analyzer._cache_get(key, description)
+            if cached is not None:
+                direct.append((str(job["id"]), cached))
+                continue
+            route, rules = self.analyzer._route(description)
+            if route == "rules":
+                self.analyzer._cache_put(key, rules)
+                direct.append((str(job["id"]), rules))
+                continue
+            lines.append(self.request_line(job["id"], description, route))
+            routes.append({"custom_id": str(job["id"]), "route": route, "rules": rules, "cache_key": key})
+            count += 1
+            if len(lines) >= self.requests_per_file:
+                flush()
+                lines, routes = [], []
+        if lines:
+            flush()
+        # Cache hits and rule-extracted analyses need no request
+        if direct:
+            self.state["applied"] += self.storage.update_llm_analyses(direct)
+        self._save_state()
+        logger.info(f"Wrote {count} requests into {len(self.state['batches'])} batch files; "
+                    f"{len(direct)} jobs were answered from the cache or the skill extractor.")
+        return count
+
+    def submit(self):
+        for entry in self.state["batches"]:
+            if entry["batch_id"]:
+                continue
+            if not entry["input_file_id"]:
+                entry["input_file_id"] = self.client.upload_file(entry["file"])
+                self._save_state()
+            batch = self.client.create_batch(entry["input_file_id"], self.ENDPOINT)
+            entry["batch_id"], entry["status"] = batch["id"], batch["status"]
+            self._save_state()
+            logger.info(f"Submitted {entry['file']} as batch {entry['batch_id']} ({entry['requests']} requests).")
+
+    def wait(self):
+        """Polls every unfinished batch until all of them reach a terminal status."""
+        while True:
+            pending = [e for e in self.state["batches"] if e["batch_id"] and e["status"] not in TERMINAL_STATUSES]
+            for entry in pending:
+                batch = self.client.retrieve_batch(entry["batch_id"])
+                entry.update(status=batch["status"], output_file_id=batch.get("output_file_id"),
+                             error_file_id=batch.get("error_file_id"))
+            self._save_state()
+            if not any(e["status"] not in TERMINAL_STATUSES for e in pending):
+                return
+            logger.info(f"{len(pending)} batches still running; checking again in {self.poll_interval}s.")
+            time.sleep(self.poll_interval)
+
+    def parse_output(self, text: str) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[str]]:
+        """Splits a batch output file into (job id, analysis) pairs and the ids that failed."""
+        analyses, failed = [], []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            job_id = result["custom_id"]
+            try:
+                response = result.get("response") or {}
+                if result.get("error") or response.get("status_code") != 200:
+                    raise ValueError(result.get("error") or f"status {response.get('status_code')}")
+                analysis = self.analyzer.parser.parse(response["body"]["choices"][0]["message"]["content"])
+                if not self.analyzer.valid_analysis(analysis):
+                    raise ValueError("unexpected analysis format")
+                analyses.append((job_id, analysis))
+            except Exception as e:
+                logger.warning(f"Batch result for job {job_id} failed: {e}")
+                failed.append(job_id)
+        return analyses, failed
+
+    def apply(self) -> int:
+        """Writes the results of every finished, not yet applied batch. Returns the jobs updated."""
+        updated = 0
+        for entry in self.state["batches"]:
+            if entry["applied"] or entry["status"] not in TERMINAL_STATUSES:
+                continue
+            with open(entry["routes"], "r", encoding="utf-8") as f:
+                routes = {route["custom_id"]: route for route in map(json.loads, f) if route}
+            analyses, failed = [], []
+            for key in ("output_file_id", "error_file_id"):
+                if entry.get(key):
+                    ok, bad = self.parse_output(self.client.download_file(entry[key]))
+                    analyses += ok
+                    failed += bad
+            # Free-text results get the extractor's skills, as in the live path, and every result is cached
+            finished = []
+            for job_id, analysis in analyses:
+                route = routes.get(job_id, {})
+                if route.get("route") == "free_text":
+                    analysis = self.analyzer._with_rule_skills(analysis, route["rules"])
+                if route.get("cache_key"):
+                    self.analyzer._cache_put(route["cache_key"], analysis)
+                finished.append((job_id, analysis))
+            answered = {job_id for job_id, _ in analyses}.union(failed)
+            missing = [job_id for job_id in routes if job_id not in answered]
+            if missing:
+                logger.error(f"Batch {entry['batch_id']} ended as {entry['status']}; {len(missing)} jobs got no result.")
+                failed += missing
+            count = self.storage.update_llm_analyses(finished)
+            updated += count
+            entry["applied"] = True
+            self.state["applied"] += count
+            self.state["failed"] += failed
+            self._save_state()
+            logger.info(f"Applied batch {entry['batch_id']}: {count} jobs updated, {len(failed)} failed.")
+        return updated
+
+    def run(self, all_jobs: bool = False) -> Dict[str, int]:
+        self.prepare(all_jobs)
+        self.submit()
+        self.wait()
+        self.apply()
+        return {"requests": sum(e["requests"] for e in self.state["batches"]),
+                "applied": self.state["applied"], "failed": len(self.state["failed"])}
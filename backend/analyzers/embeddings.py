@@ -0,0 +1,62 @@
+import os
+import re
+import hashlib
+import logging
+from typing import Any, Dict, List
+import numpy as np
+
+logger = logging.getLogger("Embeddings")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder: hashed word and word-bigram counts,
+    log-scaled and L2-normalized. No network or model download, so offline runs
+    and tests get stable vectors; similar wording gives similar vectors.
+    """
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN_RE.findall((text or "").lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                index = int.from_bytes(digest[:4], "little") % self.dimensions
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vectors[row, index] += sign
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings through langchain, sent in batches of `batch_size` texts."""
+    def __init__(self, model: str = "text-embedding-3-small", dimensions: int = 256, batch_size: int = 64):
+        from langchain_openai import OpenAIEmbeddings
+
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            logger.warning("OPENAI_API_KEY not found. OpenAI embeddings may fail.")
+        self.dimensions = dimensions
+        self.name = f"{model}-{dimensions}"
+        self.client = OpenAIEmbeddings(model=model, dimensions=dimensions, chunk_size=batch_size, api_key=api_key)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.asarray(self.client.embed_documents(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+def create_embedder(settings: Dict[str, Any]):
+    """Builds the embedder named by settings['model'] ("local" for HashingEmbedder)."""
+    if settings['model'] == "local":
+        return HashingEmbedder(settings['dimensions'])
+    return OpenAIEmbedder(settings['model'], settings['dimensions'], settings['batch_size'])
@@ -1,31 +1,74 @@
 import os
 import json
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, Optional, Literal
+from typing import Dict, Any, List, Optional, Literal, Tuple
 
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
 
+from analyzers.analysis_cache import AnalysisCache
+from analyzers.llm_limiter import LLMLimiter
+from analyzers.preprocessing import DescriptionPreprocessor
+from analyzers.skill_extractor import SkillExtractor
+from config import ANALYSIS_CACHE_SETTINGS, PREPROCESS_SETTINGS, PROCESSOR_SETTINGS, SKILL_EXTRACTOR_SETTINGS
+
+# Top-level keys an analysis may contain (see the output format in the prompt)
+ANALYSIS_KEYS = {"skills", "responsibilities", "employer_focus"}
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("JobAnalyzer")
 
 class JobAnalyzer:
-    def __init__(self, model_name: Optional[str] = None):
+    def __init__(self, model_name: Optional[str] = None, cache: Optional[AnalysisCache] = None,
+                 extractor: Optional[SkillExtractor] = None, extractor_mode: Optional[str] = None,
+                 preprocessor: Optional[DescriptionPreprocessor] = None, limiter: Optional[LLMLimiter] = None):
+        self.model_name = model_name or "gpt-5-nano"
         self.llm = self._initialize_llm(model_name)
         self.parser = JsonOutputParser()
         self.prompt = self._create_prompt()
+        self.free_text_prompt = self._create_free_text_prompt()
+        self.batch_prompt = self._create_batch_prompt(self.prompt_template)
+        self.free_text_batch_prompt = self._create_batch_prompt(self.free_text_template)
+        # "off", "hybrid" (rules for dictionary fields, LLM for the rest) or "rules" (no LLM when confident)
+        self.extractor_mode = extractor_mode or SKILL_EXTRACTOR_SETTINGS['mode']
+        if extractor is None and self.extractor_mode != "off":
+            extractor = SkillExtractor.from_file(SKILL_EXTRACTOR_SETTINGS['taxonomy_path'])
+        self.extractor = extractor if self.extractor_mode != "off" else None
+        self.min_confidence = SKILL_EXTRACTOR_SETTINGS['min_confidence']
+        self.route_stats = {"rules": 0, "free_text": 0, "full": 0}
+        # Changing the prompt text or the taxonomy changes the version, so stale analyses are never served
+        version_source = self.prompt_template
+        if self.extractor is not None:
+            version_source += f"\0{self.extractor_mode}\0{self.extractor.version}\0{self.min_confidence}"
+        self.prompt_version = hashlib.sha256(version_source.encode("utf-8")).hexdigest()[:12]
+        if cache is None and ANALYSIS_CACHE_SETTINGS['enabled']:
+            cache = AnalysisCache.from_settings(ANALYSIS_CACHE_SETTINGS)
+        self.cache = cache
+        if preprocessor is None and PREPROCESS_SETTINGS['enabled']:
+            preprocessor = DescriptionPreprocessor.from_settings(
+                PREPROCESS_SETTINGS, ANALYSIS_CACHE_SETTINGS['input_cost_per_million'])
+        self.preprocessor = preprocessor
+        # Concurrency, rate budgets and retries for every async LLM call
+        self.limiter = limiter or LLMLimiter.from_settings(PROCESSOR_SETTINGS['llm_limits'])
+        # Identical descriptions being analyzed right now, so concurrent duplicates share one call
+        self._inflight: Dict[str, asyncio.Future] = {}
 
     def _initialize_llm(self, model_name: Optional[str]):
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
             logger.warning("OPENAI_API_KEY not found. OpenAI model may fail.")
+        # Retries are left to the LLMLimiter, which needs to see 429s to adapt
         return ChatOpenAI(
             model=model_name or "gpt-5-nano",
             temperature=1,
-            api_key=api_key
+            api_key=api_key,
+            max_retries=0,
+            timeout=PROCESSOR_SETTINGS['llm_timeout']
         )
 
     def _create_prompt(self):
@@ -120,18 +163,148 @@ Make all lists contain unique items.
 Job Description:
 {description}
 """
+        self.prompt_template = template
         return ChatPromptTemplate.from_template(template)
 
+    def _create_free_text_prompt(self):
+        """
+        The prompt without the dictionary fields (technical skills, tools, experience,
+        degrees), for postings where the SkillExtractor already covers those.
+        """
+        template = self.prompt_template
+        soft_skills = template[template.index("soft_skills\nCommunication"):template.index("tools_and_technologies\nFrameworks")]
+        template = template[:template.index("Output format:")] + """Output format:
+Return valid JSON using the structure below:
+
+{{
+  "skills": {{
+    "soft_skills": []
+  }},
+  "responsibilities": [],
+  "employer_focus": {{
+    "values": [],
+    "collaboration_expectations": [],
+    "domain_knowledge": []
+  }}
+}}
+
+Field Definitions:
+""" + soft_skills + template[template.index("responsibilities\nSummarize"):]
+        self.free_text_template = template
+        return ChatPromptTemplate.from_template(template)
+
+    def _create_batch_prompt(self, single_template: str):
+        """
+        Same instructions as the single-job prompt, for several ID-tagged jobs at once,
+        so the long instruction block is sent once per request instead of once per job.
+        """
+        instructions = single_template.split("Job Description:")[0]
+        template = instructions + """Batch mode:
+You will receive several job descriptions, each wrapped in <job id="..."> tags.
+Analyze each one independently, following all the rules above.
+Return a JSON array with exactly one element per job, in any order:
+[{{"id": "<the job id>", "analysis": <the JSON object described above for that job>}}]
+
+Jobs:
+{jobs}
+"""
+        return ChatPromptTemplate.from_template(template)
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return len(text) // 4
+
+    @property
+    def _output_tokens(self) -> int:
+        return ANALYSIS_CACHE_SETTINGS['estimated_output_tokens']
+
+    def _prompt_tokens(self, description: str) -> int:
+        # Rough estimate (~4 characters per token), only used for the savings report
+        return (len(self.prompt_template) + len(description)) // 4
+
+    def _route(self, description: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Decides how a description is analyzed: "full" (whole prompt), "free_text"
+        (LLM only for the free-text fields, dictionary fields from the extractor) or
+        "rules" (extractor only). Returns the route and the extractor's analysis.
+        """
+        if self.extractor is None:
+            return "full", {}
+        rules, confidence = self.extractor.extract(description)
+        if confidence < self.min_confidence:
+            return "full", rules
+        return ("rules" if self.extractor_mode == "rules" else "free_text"), rules
+
+    @staticmethod
+    def _with_rule_skills(result: Dict[str, Any], rules: Dict[str, Any]) -> Dict[str, Any]:
+        """Combines a free-text LLM result with the extractor's skills ({} if the LLM call failed)."""
+        if not result:
+            return {}
+        skills = dict(rules.get("skills", {}))
+        soft_skills = (result.get("skills") or {}).get("soft_skills")
+        if soft_skills:
+            skills["soft_skills"] = soft_skills
+        merged = {"skills": skills} if skills else {}
+        merged.update((k, v) for k, v in result.items() if k != "skills")
+        return merged
+
+    def prepare_description(self, description: str) -> str:
+        """Strips boilerplate and applies the token cap before a description is analyzed."""
+        if self.preprocessor is None or not description:
+            return description
+        prepared, stats = self.preprocessor.prepare(description)
+        saved = stats["tokens_before"] - stats["tokens_after"]
+        if saved:
+            logger.info(f"Preprocessed description: {stats['tokens_before']} -> {stats['tokens_after']} tokens "
+                        f"({saved} saved, {stats['dropped']} boilerplate paragraphs dropped)")
+        return prepared
+
+    def _cache_key(self, description: str) -> str:
+        return AnalysisCache.key(self.model_name, self.prompt_version, description)
+
+    def _cache_get(self, key: str, description: str) -> Optional[Dict[str, Any]]:
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(key, self._prompt_tokens(description))
+        except Exception as e:
+            logger.error(f"Analysis cache read failed: {e}")
+            return None
+
+    def _cache_put(self, key: str, result: Dict[str, Any]):
+        # Failed analyses come back empty and are not cached
+        if self.cache is None or not result:
+            return
+        try:
+            self.cache.put(key, result)
+        except Exception as e:
+            logger.error(f"Analysis cache write failed: {e}")
+
     def analyze_job_description(self, description: str) -> Dict[str, Any]:
         """
         Analyzes the job description and returns structured data.
         """
+        description = self.prepare_description(description)
         if not description:
             return {}
 
+        key = self._cache_key(description)
+        cached = self._cache_get(key, description)
+        if cached is not None:
+            return cached
+
+        route, rules = self._route(description)
+        self.route_stats[route] += 1
+        if route == "rules":
+            self._cache_put(key, rules)
+            return rules
+
         try:
-            chain = self.prompt | self.llm | self.parser
+            chain = (self.free_text_prompt if route == "free_text" else self.prompt) | self.llm | self.parser
             result = chain.invoke({"description": description})
+            if route == "free_text":
+                result = self._with_rule_skills(result, rules)
+            self._cache_put(key, result)
             return result
         except OutputParserException as e:
             logger.error(f"Error parsing LLM output: {e}")
@@ -143,20 +316,173 @@ Job Description:
     async def analyze_job_description_async(self, description: str) -> Dict[str, Any]:
         """
         Analyzes the job description asynchronously and returns structured data.
+        Unlike the sync version, a failed LLM call raises (after the limiter's retries),
+        so callers can record the real error.
         """
+        return await self._analyze_prepared_async(self.prepare_description(description))
+
+    async def _analyze_prepared_async(self, description: str) -> Dict[str, Any]:
         if not description:
             return {}
 
+        key = self._cache_key(description)
+        if key in self._inflight:
+            if self.cache is not None:
+                self.cache.record_hit(self._prompt_tokens(description))
+            return await asyncio.shield(self._inflight[key])
+        cached = self._cache_get(key, description)
+        if cached is not None:
+            return cached
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        result: Dict[str, Any] = {}
         try:
-            chain = self.prompt | self.llm | self.parser
-            result = await chain.ainvoke({"description": description})
-            return result
+            result = await self._invoke_async(description)
+            self._cache_put(key, result)
+        except Exception as e:
+            # Waiters share the failure; retrieving it here keeps asyncio quiet when there are none
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+            # Waiters share the result ({} if this call was cancelled)
+            if not future.done():
+                future.set_result(result)
+        return result
+
+    async def _invoke_async(self, description: str) -> Dict[str, Any]:
+        route, rules = self._route(description)
+        self.route_stats[route] += 1
+        if route == "rules":
+            return rules
+        chain = (self.free_text_prompt if route == "free_text" else self.prompt) | self.llm | self.parser
+        try:
+            result = await self.limiter.call(lambda: chain.ainvoke({"description": description}),
+                                             self._prompt_tokens(description) + self._output_tokens)
         except OutputParserException as e:
             logger.error(f"Error parsing LLM output: {e}")
-            return {}
+            raise
         except Exception as e:
             logger.error(f"Error during async LLM analysis: {e}")
+            raise
+        if route == "free_text":
+            result = self._with_rule_skills(result, rules)
+        return result
+
+    @staticmethod
+    def valid_analysis(analysis: Any) -> bool:
+        return isinstance(analysis, dict) and bool(analysis) and set(analysis) <= ANALYSIS_KEYS
+
+    def pack(self, items: List[Tuple[str, str]], max_items: int, token_budget: int) -> List[List[Tuple[str, str]]]:
+        """
+        Greedily groups (id, description) pairs into requests of at most `max_items`
+        jobs whose descriptions fit in `token_budget` estimated tokens.
+        A description larger than the budget gets a request of its own.
+        """
+        packs, current, current_tokens = [], [], 0
+        for item in items:
+            tokens = self._estimate_tokens(item[1])
+            if current and (len(current) >= max_items or current_tokens + tokens > token_budget):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(item)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    async def _analyze_pack(self, pack: List[Tuple[str, str]], free_text: bool = False) -> Dict[str, Dict[str, Any]]:
+        """One LLM call for a pack; returns only the items whose result validated."""
+        jobs = "\n".join(f'<job id="{item_id}">\n{description}\n</job>' for item_id, description in pack)
+        try:
+            chain = (self.free_text_batch_prompt if free_text else self.batch_prompt) | self.llm | self.parser
+            tokens = self._estimate_tokens(self.prompt_template + jobs) + self._output_tokens * len(pack)
+            output = await self.limiter.call(lambda: chain.ainvoke({"jobs": jobs}), tokens)
+        except Exception as e:
+            logger.error(f"Batch analysis of {len(pack)} jobs failed, re-running them one by one: {e}")
             return {}
+        
+        ids = {item_id for item_id, _ in pack}
+        results = {}
+        for element in output if isinstance(output, list) else []:
+            if not isinstance(element, dict):
+                continue
+            item_id = str(element.get("id"))
+            if item_id in ids and self.valid_analysis(element.get("analysis")):
+                results[item_id] = element["analysis"]
+        return results
+
+    async def analyze_job_descriptions_async(self, items: List[Tuple[str, str]], max_items: Optional[int] = None,
+                                             token_budget: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyzes several (id, description) pairs, packing up to `max_items` descriptions
+        into each LLM call within a token budget. Cached descriptions are served from the
+        cache, identical descriptions are sent once, and items whose result is missing or
+        invalid are re-run individually. Returns {id: analysis}, with {} for an empty result
+        and the exception for an item whose individual LLM call failed.
+        """
+        max_items = max_items or PROCESSOR_SETTINGS['pack_size']
+        token_budget = token_budget or PROCESSOR_SETTINGS['pack_token_budget']
+        results: Dict[str, Dict[str, Any]] = {item_id: {} for item_id, _ in items}
+        
+        # Cache lookups, and one representative item per distinct description
+        owners: Dict[str, List[str]] = {}
+        keys: Dict[str, str] = {}
+        to_send: List[Tuple[str, str]] = []
+        for item_id, description in items:
+            description = self.prepare_description(description)
+            if not description:
+                continue
+            key = self._cache_key(description)
+            if key in owners:
+                owners[key].append(item_id)
+                if self.cache is not None:
+                    self.cache.record_hit(self._prompt_tokens(description))
+                continue
+            cached = self._cache_get(key, description)
+            if cached is not None:
+                results[item_id] = cached
+                continue
+            owners[key] = [item_id]
+            keys[item_id] = key
+            to_send.append((item_id, description))
+        
+        # Confident extractor results skip the LLM or use the shorter free-text prompt
+        analyses: Dict[str, Dict[str, Any]] = {}
+        routed: Dict[str, List[Tuple[str, str]]] = {"full": [], "free_text": []}
+        rules: Dict[str, Dict[str, Any]] = {}
+        for item_id, description in to_send:
+            route, rules[item_id] = self._route(description)
+            if route == "rules":
+                self.route_stats["rules"] += 1
+                analyses[item_id] = rules[item_id]
+            else:
+                routed[route].append((item_id, description))
+        
+        jobs = [(route, pack) for route, group in routed.items() for pack in self.pack(group, max_items, token_budget)]
+        packed = await asyncio.gather(*(self._analyze_pack(pack, route == "free_text") for route, pack in jobs if len(pack) > 1))
+        for (route, _), pack_results in zip([job for job in jobs if len(job[1]) > 1], packed):
+            self.route_stats[route] += len(pack_results)
+            for item_id, analysis in pack_results.items():
+                analyses[item_id] = self._with_rule_skills(analysis, rules[item_id]) if route == "free_text" else analysis
+        for item_id, analysis in analyses.items():
+            self._cache_put(keys[item_id], analysis)
+        
+        # Single-job packs and items the batch call didn't return go through the single-job path
+        retry = [(item_id, description) for item_id, description in to_send if item_id not in analyses]
+        if retry:
+            if len(retry) < len(to_send):
+                logger.info(f"Re-running {len(retry)} of {len(to_send)} packed jobs individually.")
+            single = await asyncio.gather(*(self._analyze_prepared_async(description) for _, description in retry),
+                                          return_exceptions=True)
+            analyses.update(zip((item_id for item_id, _ in retry), single))
+        
+        for item_id, key in keys.items():
+            for owner in owners[key]:
+                results[owner] = analyses.get(item_id, {})
+        return results
 
 if __name__ == "__main__":
     # Simple test
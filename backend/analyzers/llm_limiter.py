@@ -0,0 +1,171 @@
+import asyncio
+import random
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import openai
+
+logger = logging.getLogger("LLMLimiter")
+
+T = TypeVar("T")
+
+# Status codes worth retrying; 429 and 408 also mean "slow down"
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {408, 429}
+
+
+class MinuteBudget:
+    """Token bucket holding at most `per_minute` units, refilled continuously."""
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.available = per_minute
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def take(self, amount: float):
+        amount = min(amount, self.per_minute)
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.available = min(self.per_minute, self.available + (now - self.updated) * self.per_minute / 60)
+                self.updated = now
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) * 60 / self.per_minute)
+
+
+def _status_of(error: Exception) -> Optional[int]:
+    if isinstance(error, (openai.APITimeoutError, asyncio.TimeoutError, TimeoutError)):
+        return 408
+    return getattr(error, "status_code", None)
+
+
+def is_permanent(error: Exception) -> bool:
+    """A client error (4xx other than the retried ones, e.g. a bad request or auth failure) that no retry will fix."""
+    status = _status_of(error)
+    return isinstance(status, int) and 400 <= status < 500 and status not in RETRY_STATUSES
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after")) if response is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMLimiter:
+    """
+    Gates every LLM call through three limits:
+    - a concurrency window that adapts with AIMD: each fast success widens it by
+      `increase / window` (so by `increase` per full window), while a 429 or timeout
+      multiplies it by `decrease` (at most once per `cooldown` seconds, so a burst
+      of 429s from one window counts once). Slow successes hold it steady;
+    - per-minute request and token budgets matching the provider's rate limits;
+    - retries of 429s, timeouts, connection and 5xx errors with jittered
+      exponential backoff, honouring Retry-After.
+    Other errors are raised immediately.
+    """
+    def __init__(self, initial_concurrency: float = 4, min_concurrency: float = 1, max_concurrency: float = 32,
+                 increase: float = 1.0, decrease: float = 0.5, slow_call: float = 30.0, cooldown: float = 5.0,
+                 requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.limit = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_call = slow_call
+        self.cooldown = cooldown
+        self.requests = MinuteBudget(requests_per_minute) if requests_per_minute else None
+        self.tokens = MinuteBudget(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self.last_decrease = float("-inf")
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "failed": 0}
+        self._loop = None
+        self._slot_freed = None
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "LLMLimiter":
+        return cls(**settings)
+
+    def _bind(self):
+        # asyncio primitives belong to one event loop; a new asyncio.run() gets fresh ones
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slot_freed = asyncio.Event()
+            self.in_flight = 0
+            for budget in (self.requests, self.tokens):
+                if budget is not None:
+                    budget.lock = asyncio.Lock()
+
+    async def _acquire(self, tokens: int):
+        self._bind()
+        if self.requests is not None:
+            await self.requests.take(1)
+        if self.tokens is not None:
+            await self.tokens.take(tokens)
+        while self.in_flight >= int(self.limit):
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self._slot_freed.set()
+
+    def _record_success(self, latency: float):
+        if latency < self.slow_call:
+            self.limit = min(self.max_concurrency, self.limit + self.increase / max(self.limit, 1))
+
+    def _record_throttle(self):
+        self.stats["throttled"] += 1
+        now = time.monotonic()
+        if now - self.last_decrease >= self.cooldown:
+            self.limit = max(self.min_concurrency, self.limit * self.decrease)
+            self.last_decrease = now
+            logger.warning(f"LLM provider is throttling; concurrency limit lowered to {int(self.limit)}.")
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential delay, never shorter than the provider's Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    async def call(self, func: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """Runs `func()` (one LLM request of about `tokens` tokens) within the limits."""
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(tokens)
+            start = time.monotonic()
+            try:
+                result = await func()
+            except Exception as e:
+                status = _status_of(e)
+                retryable = status in RETRY_STATUSES or isinstance(e, openai.APIConnectionError)
+                if status in THROTTLE_STATUSES:
+                    self._record_throttle()
+                if not retryable or attempt == self.max_retries:
+                    self.stats["failed"] += 1
+                    raise
+                delay = self.backoff(attempt, _retry_after(e))
+                logger.info(f"LLM call failed ({status or type(e).__name__}); retry {attempt + 1} in {delay:.1f}s.")
+            else:
+                self.stats["calls"] += 1
+                self._record_success(time.monotonic() - start)
+                return result
+            finally:
+                self._release()
+            # Back off without holding a slot
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    def report(self) -> str:
+        return (
+            f"LLM limiter: {self.stats['calls']} calls, {self.stats['retries']} retries, "
+            f"{self.stats['throttled']} throttled, {self.stats['failed']} failed, concurrency limit {int(self.limit)}"
+        )
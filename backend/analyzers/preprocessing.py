@@ -0,0 +1,184 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from analyzers.analysis_cache import normalize_description
+
+logger = logging.getLogger("Preprocessing")
+
+
+def paragraph_fingerprint(paragraph: str) -> str:
+    """Case- and whitespace-insensitive hash of one paragraph."""
+    return hashlib.blake2b(normalize_description(paragraph).lower().encode("utf-8"), digest_size=8).hexdigest()
+
+
+def split_paragraphs(description: str):
+    """Scraped descriptions keep one text block per line, so paragraphs are non-empty lines."""
+    return [line for line in (description or "").splitlines() if line.strip()]
+
+
+class BoilerplateStore:
+    """
+    Document frequency of paragraph fingerprints across the stored postings.
+    A paragraph of at least `min_chars` characters that appears in `min_jobs` or
+    more postings (EEO statements, "how to apply" blocks, benefits lists, agency
+    footers) is boilerplate. Shorter lines such as headings or single skills are
+    never dropped, however common.
+    Counts live in a local SQLite file and are rebuilt from the corpus with build().
+    """
+    def __init__(self, path: str = ":memory:", min_jobs: int = 5, min_chars: int = 60):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.min_jobs = min_jobs
+        self.min_chars = min_chars
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "create table if not exists boilerplate_paragraphs ("
+                "fingerprint text primary key, jobs integer not null, sample text not null"
+                ") without rowid"
+            )
+        self.fingerprints = self._load()
+
+    def _load(self) -> set:
+        with self._lock:
+            rows = self.conn.execute(
+                "select fingerprint from boilerplate_paragraphs where jobs >= ?", (self.min_jobs,)).fetchall()
+        return {row[0] for row in rows}
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def build(self, descriptions: Iterable[str]) -> int:
+        """
+        Replaces the counts with those of `descriptions` (each posting counts a
+        paragraph once). Returns the number of boilerplate paragraphs found.
+        """
+        counts: Counter = Counter()
+        samples: Dict[str, str] = {}
+        jobs = 0
+        for description in descriptions:
+            jobs += 1
+            seen = set()
+            for paragraph in split_paragraphs(description):
+                if len(paragraph) < self.min_chars:
+                    continue
+                fingerprint = paragraph_fingerprint(paragraph)
+                if fingerprint not in seen:
+                    seen.add(fingerprint)
+                    counts[fingerprint] += 1
+                    samples.setdefault(fingerprint, paragraph[:200])
+        with self._lock, self.conn:
+            self.conn.execute("delete from boilerplate_paragraphs")
+            # Paragraphs seen once can never be boilerplate; keep the file small
+            self.conn.executemany(
+                "insert into boilerplate_paragraphs (fingerprint, jobs, sample) values (?, ?, ?)",
+                [(fp, count, samples[fp]) for fp, count in counts.items() if count > 1],
+            )
+        self.fingerprints = self._load()
+        logger.info(f"Scanned {jobs} descriptions: {len(self.fingerprints)} boilerplate paragraphs.")
+        return len(self.fingerprints)
+
+    def is_boilerplate(self, paragraph: str) -> bool:
+        return len(paragraph) >= self.min_chars and paragraph_fingerprint(paragraph) in self.fingerprints
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class TokenCounter:
+    """
+    Counts and truncates by model tokens with tiktoken. When the encoding
+    can't be loaded (not installed, or no network to fetch it) it falls back to
+    ~4 characters per token.
+    """
+    _encodings: Dict[str, Any] = {}
+
+    def __init__(self, encoding_name: Optional[str] = "o200k_base"):
+        self.encoding = self._load(encoding_name) if encoding_name else None
+
+    @classmethod
+    def _load(cls, name: str):
+        if name not in cls._encodings:
+            try:
+                import tiktoken
+                cls._encodings[name] = tiktoken.get_encoding(name)
+            except Exception as e:
+                logger.warning(f"Tokenizer {name} unavailable, estimating ~4 characters per token: {e}")
+                cls._encodings[name] = None
+        return cls._encodings[name]
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self.encoding.decode(tokens[:max_tokens])
+        limit = max_tokens * 4
+        if len(text) <= limit:
+            return text
+        cut = text.rfind(" ", 0, limit)
+        return text[:cut if cut > limit // 2 else limit]
+
+
+class DescriptionPreprocessor:
+    """
+    Shrinks a description before it is sent to the LLM: drops boilerplate
+    paragraphs and paragraphs repeated within the posting, then caps the result
+    at `max_tokens` (keeping the start, where the role itself is described).
+    Tokens before and after are counted per job and in total.
+    """
+    def __init__(self, store: Optional[BoilerplateStore] = None, counter: Optional[TokenCounter] = None,
+                 max_tokens: int = 1500, input_cost_per_million: float = 0.0):
+        self.store = store or BoilerplateStore()
+        self.counter = counter or TokenCounter(None)
+        self.max_tokens = max_tokens
+        self.input_cost_per_million = input_cost_per_million
+        self.stats = {"jobs": 0, "tokens_before": 0, "tokens_after": 0, "dropped_paragraphs": 0, "truncated": 0}
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any], input_cost_per_million: float = 0.0) -> "DescriptionPreprocessor":
+        store = BoilerplateStore(settings['store_path'], settings['min_jobs'], settings['min_chars'])
+        return cls(store, TokenCounter(settings['tokenizer']), settings['max_tokens'], input_cost_per_million)
+
+    def prepare(self, description: str) -> Tuple[str, Dict[str, int]]:
+        """Returns the cleaned description and {"tokens_before", "tokens_after", "dropped"}."""
+        kept, seen, dropped = [], set(), 0
+        for paragraph in split_paragraphs(description):
+            fingerprint = paragraph_fingerprint(paragraph) if len(paragraph) >= self.store.min_chars else None
+            if fingerprint is not None and (fingerprint in self.store.fingerprints or fingerprint in seen):
+                dropped += 1
+                continue
+            if fingerprint is not None:
+                seen.add(fingerprint)
+            kept.append(paragraph)
+        text = "\n".join(kept)
+        capped = self.counter.truncate(text, self.max_tokens)
+
+        result = {"tokens_before": self.counter.count(description or ""), "tokens_after": self.counter.count(capped),
+                  "dropped": dropped}
+        self.stats["jobs"] += 1
+        self.stats["tokens_before"] += result["tokens_before"]
+        self.stats["tokens_after"] += result["tokens_after"]
+        self.stats["dropped_paragraphs"] += dropped
+        self.stats["truncated"] += capped != text
+        return capped, result
+
+    def report(self) -> str:
+        saved = self.stats["tokens_before"] - self.stats["tokens_after"]
+        share = saved / self.stats["tokens_before"] if self.stats["tokens_before"] else 0.0
+        return (
+            f"Preprocessing: {self.stats['jobs']} descriptions, {self.stats['tokens_before']} -> "
+            f"{self.stats['tokens_after']} tokens ({share:.0%} saved, ~${saved * self.input_cost_per_million / 1_000_000:.4f}), "
+            f"{self.stats['dropped_paragraphs']} boilerplate paragraphs dropped, {self.stats['truncated']} capped"
+        )
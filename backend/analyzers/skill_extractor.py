@@ -0,0 +1,209 @@
+import bisect
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json")
+
+# Dictionary-driven fields of the analysis, in output order
+TAXONOMY_FIELDS = ("technical_skills", "tools_and_technologies", "degrees_and_certifications")
+
+# "3+ years experience", "minimum 2 years of industry experience", "5 years in data engineering"
+_EXPERIENCE_RE = re.compile(
+    r"\b(?:(?:minimum|min\.?|at least|over|more than)\s+(?:of\s+)?)?"
+    r"\d{1,2}\s*(?:\+|(?:-|–|to)\s*\d{1,2}\s*\+?)?\s*\+?\s*(?:years?|yrs?)['’]?"
+    r"(?:\s+(?:of\s+)?[^.;,\n()]{0,50}?\bexperience\b(?:\s+(?:in|with)\s+[^.;,\n()]{1,40})?"
+    r"|\s+(?:in|of)\s+[^.;,\n()]{1,40})",
+    re.IGNORECASE,
+)
+
+# Tokens that look like technology names: Node.js, C++, PyTorch, GraphQL, AWS, S3
+_TECH_TOKEN_RE = re.compile(
+    r"(?<![\w.])(?:[A-Za-z][A-Za-z0-9]*(?:\.[A-Za-z0-9]{2,}|[+#]+)+"
+    r"|[A-Za-z]*[a-z][A-Z][A-Za-z0-9]*"
+    r"|[A-Z]{2,5}[0-9]*s?|[A-Z][0-9]+)(?![\w+#])"
+)
+
+# Capitalized words and acronyms common in postings that are not skills
+_NON_SKILL_TOKENS = {
+    "AU", "NSW", "VIC", "QLD", "SA", "WA", "TAS", "ACT", "NT", "NZ", "UK", "USA", "APAC", "ANZ", "AUD", "CBD",
+    "WFH", "EOI", "CEO", "CTO", "CFO", "COO", "HR", "IT", "PR", "EEO", "FTE", "KPI", "KPIs", "ASAP", "FAQ",
+    "PTY", "LTD", "OK", "ID", "DEI", "ESG", "TBC", "AM", "PM", "NB", "RSVP", "LGBTQI", "LGBTQ", "CV", "CVs",
+    "API", "APIs", "OR", "AND", "NOT", "THE", "WE", "YOU", "OUR", "TO", "IN", "OF", "ON", "AT", "BY",
+    "YouTube", "LinkedIn", "iPhone",
+}
+
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher: after build(), iter_matches() reports every
+    occurrence of every pattern in a single left-to-right pass over the text,
+    however many patterns there are.
+    """
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[Tuple[int, Any]]] = [[]]
+
+    def add(self, pattern: str, value: Any):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append((len(pattern), value))
+
+    def build(self):
+        """Computes failure links breadth-first and folds each state's suffix outputs into it."""
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+                queue.append(child)
+        self.delta = [dict(transitions) for transitions in self.goto]
+
+    def _step(self, state: int, char: str) -> int:
+        while state and char not in self.goto[state]:
+            state = self.fail[state]
+        return self.goto[state].get(char, 0)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yields (start, end, value) for every pattern occurrence."""
+        # Transitions resolved through failure links are memoized per state, so
+        # after warm-up each character costs a single dict lookup
+        delta, outputs, step = self.delta, self.outputs, self._step
+        state = 0
+        for end, char in enumerate(text, 1):
+            next_state = delta[state].get(char)
+            if next_state is None:
+                next_state = delta[state][char] = step(state, char)
+            state = next_state
+            if outputs[state]:
+                for length, value in outputs[state]:
+                    yield end - length, end, value
+
+
+class SkillExtractor:
+    """
+    Rule-based extraction of the dictionary fields of an analysis.
+
+    Every alias of every term in the taxonomy is compiled into one Aho-Corasick
+    automaton, so a description is scanned once however large the taxonomy is.
+    Aliases written in lowercase match in any case; aliases containing capitals
+    ("AWS", "Spark", "Excel") match only as written, which keeps common words out.
+    Matches must sit on word boundaries and overlapping matches keep the longest.
+    "N+ years" experience statements come from a regex, as written.
+
+    extract() also returns a confidence: the share of technology-looking tokens
+    in the description (Node.js, PyTorch, acronyms, ...) that the taxonomy
+    recognised. A low value means the taxonomy is likely missing terms.
+    """
+    def __init__(self, taxonomy: Dict[str, Any]):
+        self.version = hashlib.sha256(json.dumps(taxonomy, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        self.automaton = AhoCorasick()
+        self.size = 0
+        for field in TAXONOMY_FIELDS:
+            for canonical, aliases in taxonomy.get(field, {}).items():
+                for alias in aliases:
+                    case_sensitive = alias != alias.lower()
+                    self.automaton.add(alias.lower(), (field, canonical, alias if case_sensitive else None))
+                    self.size += 1
+        self.automaton.build()
+
+    @classmethod
+    def from_file(cls, path: Optional[str] = None) -> "SkillExtractor":
+        with open(path or DEFAULT_TAXONOMY_PATH, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _lower(text: str) -> str:
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered
+        # A few characters lowercase to two; keep those as-is so offsets still line up
+        return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+    @staticmethod
+    def _on_boundary(text: str, start: int, end: int) -> bool:
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        # "React." can end a sentence, but "React" inside "React.js" is not a match
+        if after == "." and end + 1 < len(text) and text[end + 1].isalnum():
+            return False
+        return not (before.isalnum() or before in "_") and not (after.isalnum() or after in "_+#")
+
+    def find_terms(self, description: str) -> List[Tuple[int, int, str, str]]:
+        """(start, end, field, canonical term) for each non-overlapping match, in text order."""
+        matches = []
+        for start, end, (field, canonical, exact) in self.automaton.iter_matches(self._lower(description)):
+            if exact is not None and description[start:end] != exact:
+                continue
+            if self._on_boundary(description, start, end):
+                matches.append((start, end, field, canonical))
+        # Leftmost-longest: "React Native" wins over "React", "Power BI" over "BI"
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        kept, covered_until = [], 0
+        for match in matches:
+            if match[0] >= covered_until:
+                kept.append(match)
+                covered_until = match[1]
+        return kept
+
+    @staticmethod
+    def experience_years(description: str) -> List[str]:
+        found = []
+        for match in _EXPERIENCE_RE.finditer(description):
+            text = match.group(0)
+            end = match.end()
+            if end < len(description) and description[end].isalnum() and " " in text:
+                text = text.rsplit(" ", 1)[0]  # drop a word cut off by the length cap
+            text = " ".join(text.split())
+            if text not in found:
+                found.append(text)
+        return found
+
+    def confidence(self, description: str, terms: List[Tuple[int, int, str, str]]) -> float:
+        starts = [start for start, _, _, _ in terms]
+        recognised = len({canonical for _, _, _, canonical in terms})
+        unknown = set()
+        for match in _TECH_TOKEN_RE.finditer(description):
+            token = match.group(0)
+            if token in _NON_SKILL_TOKENS:
+                continue
+            # Terms are sorted and don't overlap: only the last one starting before the token can cover it
+            i = bisect.bisect_right(starts, match.start()) - 1
+            if i >= 0 and match.start() < terms[i][1]:
+                continue
+            unknown.add(token)
+        if not recognised:
+            return 0.0
+        return recognised / (recognised + len(unknown))
+
+    def extract(self, description: str) -> Tuple[Dict[str, Any], float]:
+        """
+        Returns ({"skills": {...}}, confidence) in the LLM's output shape, with
+        empty fields omitted and terms in order of first appearance.
+        """
+        terms = self.find_terms(description or "")
+        skills: Dict[str, List[str]] = {}
+        for _, _, field, canonical in terms:
+            values = skills.setdefault(field, [])
+            if canonical not in values:
+                values.append(canonical)
+        experience = self.experience_years(description or "")
+        if experience:
+            skills["experience_years"] = experience
+        ordered = {field: skills[field] for field in ("technical_skills", "tools_and_technologies",
+                                                      "experience_years", "degrees_and_certifications") if field in skills}
+        return ({"skills": ordered} if ordered else {}), self.confidence(description or "", terms)
@@ -9,12 +9,125 @@ SEARCH_TERMS = [
 # Scraper Settings
 SCRAPER_SETTINGS = {
     "page_limit": 3,
-    "days_ago": 2,
-    "initial_days_ago": 31
+    "days_ago": 2,  # Used when a term has no recorded successful run
+    "initial_days_ago": 31,
+    "incremental": True,  # Stop at already-seen listings and derive days_ago from the last run
+    "term_workers": 2,  # Browser contexts crawling search terms in parallel
+    "concurrency": 4,  # Pages per context fetching job details in parallel
+    # Adaptive per-host rate limit (requests per second), shared by every fetch
+    "rate_limit": {
+        "initial_rate": 1.0,
+        "min_rate": 0.2,
+        "max_rate": 4.0,
+        "increase": 0.1,  # Added after each fast successful response
+        "decrease": 0.5,  # Multiplier applied on 403/429/5xx or timeouts
+        "slow_response": 3.0  # Seconds; slower successes don't raise the rate
+    },
+    "block_resources": False,  # Abort images, fonts, CSS and tracker requests
+    "fetch_engine": "http_first",  # "http_first" or "playwright" for job detail pages
+    "crawl_mode": "streaming",  # "streaming" (per page) or "planned" (collect all listings, dedupe, then fetch)
+    "save_batch_size": 25,  # Jobs per batched DB write (1 saves each job immediately)
+    "save_flush_interval": 5.0,  # Seconds before a partial batch is written anyway
+    "seen_index": True  # Preload known URLs/fingerprints so dedup checks stay local
 }
 
 # Job Processor Settings
 PROCESSOR_SETTINGS = {
     "batch_size": 10,
-    "model": "gpt-5-nano"
+    "model": "gpt-5-nano",
+    "db_connections": 10,  # Pooled HTTP connections shared by async DB calls
+    "pack_size": 8,  # Max job descriptions analyzed per LLM call (1 = one call per job)
+    "pack_token_budget": 6000,  # Estimated description tokens per packed call
+    "llm_timeout": 120,  # Seconds per LLM request before it is retried
+    "max_attempts": 5,  # Failed analyses before a job is dead-lettered
+    "retry_base_delay": 300,  # Seconds before the first retry of a failed job; doubles per attempt
+    "retry_max_delay": 86400,
+    "lease_seconds": 1800,  # How long a claimed job is reserved for one processor instance
+    "worker_id": None,  # Name of this processor instance in job claims (default: host:pid)
+    # Shared by every async LLM call; set the budgets to the provider's rate limits for the model
+    "llm_limits": {
+        "initial_concurrency": 4,
+        "min_concurrency": 1,
+        "max_concurrency": 32,
+        "increase": 1.0,  # Concurrency added per window of fast successes
+        "decrease": 0.5,  # Multiplier on 429s and timeouts
+        "slow_call": 30.0,  # Seconds; slower successes don't raise concurrency
+        "cooldown": 5.0,  # Seconds between two decreases
+        "requests_per_minute": 500,
+        "tokens_per_minute": 200000,
+        "max_retries": 5,
+        "base_delay": 1.0,  # Seconds; jittered and doubled per retry
+        "max_delay": 60.0
+    }
+}
+
+# Bulk re-analysis through the batch inference API (job_processor --backfill)
+BATCH_SETTINGS = {
+    "base_url": None,  # None = OpenAI; any endpoint implementing the Batch API works
+    "completion_window": "24h",
+    "work_dir": "data/batch_backfill",  # Request files and resume state
+    "requests_per_file": 20000,  # Batch API limit is 50,000 requests / 200 MB per file
+    "poll_interval": 60  # Seconds between batch status checks
+}
+
+# Description preprocessing before LLM analysis (build the boilerplate store with scripts/build_boilerplate.py)
+PREPROCESS_SETTINGS = {
+    "enabled": True,
+    "store_path": "data/boilerplate.db",
+    "min_jobs": 5,  # A paragraph found in this many postings (EEO statements, agency footers, ...) is dropped
+    "min_chars": 60,  # Shorter lines (headings, single skills) are always kept
+    "max_tokens": 1500,  # Hard cap per description, counted with the tokenizer below
+    "tokenizer": "o200k_base"  # tiktoken encoding; falls back to ~4 chars/token if unavailable
+}
+
+# Rule-based skill extraction (Aho-Corasick over analyzers/skill_taxonomy.json)
+SKILL_EXTRACTOR_SETTINGS = {
+    "mode": "hybrid",  # "off", "hybrid" (LLM only for free-text fields when confident) or "rules" (no LLM when confident)
+    "min_confidence": 0.6,  # Share of technology-looking terms the taxonomy must recognise; below it the full prompt runs
+    "taxonomy_path": None  # None = the bundled taxonomy
+}
+
+# Persistent cache of LLM analyses, keyed by normalized description + prompt version + model
+ANALYSIS_CACHE_SETTINGS = {
+    "enabled": True,
+    "path": "data/analysis_cache.db",
+    "max_entries": 50000,  # Least recently used entries are evicted beyond this
+    # Used only to estimate the savings in the per-run report (USD per million tokens)
+    "input_cost_per_million": 0.05,
+    "output_cost_per_million": 0.40,
+    "estimated_output_tokens": 500
+}
+
+# Streaming scrape -> analyze pipeline settings
+PIPELINE_SETTINGS = {
+    "enabled": True,  # Scheduler runs the pipeline instead of scraper then processor
+    "workers": 5,  # Concurrent analyzer workers
+    "queue_size": 20,  # Max jobs waiting for analysis before the scraper is paused
+    "backlog_limit": 200  # Unanalyzed jobs from earlier runs picked up per pipeline run
+}
+
+# Near-duplicate detection over job descriptions (MinHash + LSH)
+NEAR_DUPLICATE_SETTINGS = {
+    "enabled": True,
+    "threshold": 0.8,  # Estimated Jaccard similarity of description shingles to count as the same job
+    "shingle_size": 5,  # Words per shingle
+    "bands": 16,  # LSH bands x rows = signature length; 16 x 8 catches ~0.7+ similarity
+    "rows": 8,
+    "same_company": True  # Only merge postings from the same company
+}
+
+# Embeddings for search_similar_jobs
+EMBEDDING_SETTINGS = {
+    "model": "local",  # "local" = deterministic hashing embedder, or an OpenAI model such as "text-embedding-3-small"
+    "dimensions": 256,
+    "batch_size": 64,  # Descriptions per embedding request
+    "cache_path": "data/embeddings.npz",  # Content-addressed cache, so unchanged jobs are never re-embedded
+    "sync_interval": 300,  # Seconds between background syncs of the index with the DB
+    "rebuild_interval": 86400  # Seconds between full rebuilds, which drop jobs deleted by other processes
+}
+
+# Storage Settings
+STORAGE_SETTINGS = {
+    "backend": "supabase",  # "supabase" or "sqlite"; the JOB_STORAGE env var overrides this
+    "sqlite_path": "data/jobs.db"
 }
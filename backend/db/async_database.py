@@ -0,0 +1,135 @@
+import asyncio
+import os
+from typing import Dict, Any, List, Optional, Sequence
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, create_async_client
+from dotenv import load_dotenv
+from db.database import FINGERPRINT_CHUNK_SIZE, claim_by_id_params, claim_params, due_for_analysis, project
+from db.storage import JobStorage, ANALYSIS_COLUMNS
+
+# Load environment variables
+load_dotenv()
+
+class AsyncJobDatabase:
+    """
+    Async counterpart of JobDatabase for code running on an event loop.
+    All requests share one pooled HTTP/2 session, so concurrent writes reuse
+    connections instead of blocking the loop or opening a socket each.
+    Create with `await AsyncJobDatabase.create()` and `await db.close()` when done.
+    """
+    def __init__(self, supabase: AsyncClient, http_client: httpx.AsyncClient):
+        self.supabase = supabase
+        self.http_client = http_client
+
+    @classmethod
+    async def create(cls, max_connections: int = 10, timeout: float = 30.0) -> "AsyncJobDatabase":
+        url: str = os.environ.get("SUPABASE_URL")
+        key: str = os.environ.get("SUPABASE_KEY")
+        
+        if not url or not key:
+            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in the .env file")
+        
+        http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        supabase = await create_async_client(url, key, options=AsyncClientOptions(httpx_client=http_client))
+        return cls(supabase, http_client)
+
+    async def close(self):
+        await self.http_client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def get_unanalyzed_jobs(self, limit: int, columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        """Returns up to `limit` jobs that are due for LLM analysis, oldest first."""
+        query = due_for_analysis(self.supabase.table("job_postings").select(JobStorage._select_list(columns)))
+        response = await query.limit(limit).execute()
+        return response.data
+
+    async def claim_jobs(self, worker_id: str, limit: int, lease_seconds: Optional[int] = None,
+                         columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        """Atomically leases up to `limit` due jobs to `worker_id`; see JobStorage.claim_jobs."""
+        response = await self.supabase.rpc("claim_jobs", claim_params(worker_id, limit, lease_seconds)).execute()
+        return project(response.data or [], columns)
+
+    async def claim_jobs_by_id(self, worker_id: str, job_ids: List[str], lease_seconds: Optional[int] = None,
+                               columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        """Leases the given jobs if they are due and not leased by another worker."""
+        if not job_ids:
+            return []
+        params = claim_by_id_params(worker_id, job_ids, lease_seconds)
+        response = await self.supabase.rpc("claim_jobs_by_id", params).execute()
+        return project(response.data or [], columns)
+
+    async def release_jobs(self, worker_id: str, job_ids: List[str]) -> int:
+        """Gives up `worker_id`'s leases on jobs it won't process."""
+        released = 0
+        for i in range(0, len(job_ids), FINGERPRINT_CHUNK_SIZE):
+            response = await self.supabase.table("job_postings").update({"claimed_by": None, "lease_expires_at": None}) \
+                .eq("claimed_by", worker_id).in_("id", job_ids[i:i + FINGERPRINT_CHUNK_SIZE]).execute()
+            released += len(response.data)
+        return released
+
+    async def update_llm_analysis(self, job_id: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Updates the llm_analysis field for a specific job, marks it done and releases its lease.
+        """
+        payload = JobStorage._analysis_payload(analysis)
+        response = await self.supabase.table("job_postings").update(payload).eq("id", job_id).execute()
+        return response.data[0] if response.data else {}
+
+    async def record_analysis_failure(self, job_id: str, error: str, retryable: bool = True) -> Dict[str, Any]:
+        """Counts a failed analysis; see JobStorage.record_analysis_failure."""
+        rows = (await self.supabase.table("job_postings").select("attempts").eq("id", job_id)
+                .is_("llm_analysis", "null").execute()).data
+        if not rows:
+            return {}
+        payload = JobStorage._failure_payload((rows[0].get("attempts") or 0) + 1, error, retryable)
+        response = await self.supabase.table("job_postings").update(payload).eq("id", job_id) \
+            .is_("llm_analysis", "null").execute()
+        return response.data[0] if response.data else {}
+
+
+class AsyncStorageAdapter:
+    """
+    Gives a synchronous JobStorage (e.g. SQLiteJobDatabase) the AsyncJobDatabase
+    interface by running each call in a worker thread.
+    """
+    def __init__(self, storage):
+        self.storage = storage
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def get_unanalyzed_jobs(self, limit: int, columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.storage.get_unanalyzed_jobs, limit, columns)
+
+    async def claim_jobs(self, worker_id: str, limit: int, lease_seconds: Optional[int] = None,
+                         columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.storage.claim_jobs, worker_id, limit, lease_seconds, columns)
+
+    async def claim_jobs_by_id(self, worker_id: str, job_ids: List[str], lease_seconds: Optional[int] = None,
+                               columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.storage.claim_jobs_by_id, worker_id, job_ids, lease_seconds, columns)
+
+    async def release_jobs(self, worker_id: str, job_ids: List[str]) -> int:
+        return await asyncio.to_thread(self.storage.release_jobs, worker_id, job_ids)
+
+    async def update_llm_analysis(self, job_id: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.storage.update_llm_analysis, job_id, analysis)
+
+    async def record_analysis_failure(self, job_id: str, error: str, retryable: bool = True) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.storage.record_analysis_failure, job_id, error, retryable)
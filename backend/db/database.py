@@ -1,13 +1,58 @@
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
 from supabase import create_client, Client
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+from db.seen_index import SeenIndex
+from db.storage import (
+    JobStorage, JOB_COLUMNS, MERGE_COLUMNS, CLUSTER_COLUMNS, ANALYSIS_COLUMNS, DEAD_LETTER_COLUMNS, ITER_PAGE_SIZE,
+    PENDING, RETRY, near_duplicate_tools,
+)
+from config import PROCESSOR_SETTINGS
 
 # Load environment variables
 load_dotenv()
 
-class JobDatabase:
+# Max values per `in` filter so request URLs stay well under server limits
+FINGERPRINT_CHUNK_SIZE = 100
+
+# Rows per request when preloading the seen index
+SEEN_INDEX_PAGE_SIZE = 1000
+
+# Hashes per `in` filter on job_urls (64 hex chars each)
+URL_HASH_CHUNK_SIZE = 100
+
+# Analyses per update_llm_analyses call (each is a few KB of JSON in the request body)
+ANALYSIS_UPDATE_CHUNK_SIZE = 500
+
+def due_for_analysis(query):
+    """Narrows a job_postings query to jobs awaiting analysis whose retry backoff has elapsed, oldest first."""
+    now = datetime.now(timezone.utc).isoformat()
+    return query \
+        .is_("llm_analysis", "null") \
+        .in_("processing_status", [PENDING, RETRY]) \
+        .or_(f'next_eligible_at.is.null,next_eligible_at.lte."{now}"') \
+        .order("created_at")
+
+def lease_length(lease_seconds: Optional[int] = None) -> int:
+    return int(PROCESSOR_SETTINGS['lease_seconds'] if lease_seconds is None else lease_seconds)
+
+def claim_params(worker_id: str, limit: int, lease_seconds: Optional[int] = None) -> Dict[str, Any]:
+    """Arguments of the claim_jobs database function (migration 006)."""
+    return {"worker": worker_id, "batch_limit": limit, "lease_seconds": lease_length(lease_seconds)}
+
+def claim_by_id_params(worker_id: str, job_ids: List[str], lease_seconds: Optional[int] = None) -> Dict[str, Any]:
+    """Arguments of the claim_jobs_by_id database function (migration 007)."""
+    return {"worker": worker_id, "job_ids": list(job_ids), "lease_seconds": lease_length(lease_seconds)}
+
+def project(rows: List[Dict[str, Any]], columns: Sequence[str]) -> List[Dict[str, Any]]:
+    """claim_jobs returns whole rows; keep the requested columns."""
+    JobStorage._select_list(columns)  # rejects unknown columns, as a select would
+    return [{column: row.get(column) for column in columns} for row in rows]
+
+
+class JobDatabase(JobStorage):
+    """Supabase (Postgres) storage backend."""
     def __init__(self):
         url: str = os.environ.get("SUPABASE_URL")
         key: str = os.environ.get("SUPABASE_KEY")
@@ -16,14 +61,8 @@ class JobDatabase:
             raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in the .env file")
             
         self.supabase: Client = create_client(url, key)
-
-    @staticmethod
-    def _generate_fingerprint(company: str, title: str) -> str:
-        """Generates a simple fingerprint for deduplication."""
-        # Normalize: lowercase, strip whitespace
-        c = (company or "").lower().strip()
-        t = (title or "").lower().strip()
-        return f"{c}|{t}"
+        # Optional local index of stored URLs/fingerprints, see load_seen_index()
+        self.seen_index: Optional[SeenIndex] = None
 
     def upsert_job(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -38,75 +77,300 @@ class JobDatabase:
         title = job_data.get("job_title", "") # Changed from title to job_title
         fingerprint = self._generate_fingerprint(company, title)
         
-        # Prepare list fields (ensure they are lists)
-        new_locs = job_data.get("locations", [])
-        if isinstance(new_locs, str): new_locs = [new_locs]
-        
-        new_platforms = job_data.get("platforms", [])
-        if isinstance(new_platforms, str): new_platforms = [new_platforms]
-        
-        new_urls = job_data.get("source_urls", [])
-        if isinstance(new_urls, str): new_urls = [new_urls]
-        
-        # Handle legacy single fields if passed
-        if "location" in job_data and not new_locs:
-            new_locs = [job_data["location"]]
-        if "platform" in job_data and not new_platforms:
-            new_platforms = [job_data["platform"]]
-        if "source_url" in job_data and not new_urls:
-            new_urls = [job_data["source_url"]]
-
-        # 2. Check for existing record
-        existing = self.supabase.table("job_postings").select("*").eq("fingerprint", fingerprint).execute()
+        new_locs, new_platforms, new_urls = self._list_fields(job_data)
+
+        signature = self._signature(job_data)
+
+        # 2. Check for existing record, by fingerprint, then by any known URL, then by near-duplicate description
+        existing = self.supabase.table("job_postings").select(self._select_list(MERGE_COLUMNS)).eq("fingerprint", fingerprint).execute()
+        record = existing.data[0] if existing.data else self._get_job_by_urls(new_urls)
+        if not record and signature:
+            duplicate_id = self._find_near_duplicates([(company, signature)])[0]
+            if duplicate_id:
+                record = self._get_job(duplicate_id)
+                print(f"Found near-duplicate of {title} ({company}): {duplicate_id}")
         
-        if existing.data:
+        if record:
             # --- MERGE ---
-            record = existing.data[0]
             record_id = record['id']
             
-            # Merge lists and remove duplicates
-            merged_locs = list(set(record.get('locations', []) + new_locs))
-            merged_platforms = list(set(record.get('platforms', []) + new_platforms))
-            merged_urls = list(set(record.get('source_urls', []) + new_urls))
-            
-            update_payload = {
-                "locations": merged_locs,
-                "platforms": merged_platforms,
-                "source_urls": merged_urls,
-                "updated_at": datetime.now().isoformat(),
-                # Update other fields if the new one is "fresher" or just overwrite
-                "description": job_data.get("description", record.get("description")),
-                "salary": job_data.get("salary", record.get("salary")),
-                "seniority": job_data.get("seniority", record.get("seniority"))
-            }
+            update_payload = self._merge_payload(record, job_data, new_locs, new_platforms, new_urls)
+            if signature:
+                update_payload["minhash"] = signature
             
             response = self.supabase.table("job_postings").update(update_payload).eq("id", record_id).execute()
             print(f"Merged duplicate job: {title} ({company})")
-            return response.data[0]
             
         else:
             # --- INSERT ---
-            insert_payload = {
-                "fingerprint": fingerprint,
-                "job_title": title,
-                "company": company,
-                "locations": new_locs,
-                "platforms": new_platforms,
-                "source_urls": new_urls,
-                "description": job_data.get("description"),
-                "salary": job_data.get("salary"),
-                "seniority": job_data.get("seniority"),
-                "llm_analysis": job_data.get("llm_analysis")
-            }
+            insert_payload = self._insert_payload(fingerprint, job_data, new_locs, new_platforms, new_urls)
+            if signature:
+                insert_payload["minhash"] = signature
             
             response = self.supabase.table("job_postings").insert(insert_payload).execute()
             print(f"Inserted new job: {title} ({company})")
-            return response.data[0]
+            
+        self._record_urls(response.data)
+        self._index_saved(response.data)
+        if signature:
+            self._save_lsh_buckets([(response.data[0]["id"], signature)])
+        return response.data[0]
 
-    def get_job_by_fingerprint(self, company: str, title: str) -> Optional[Dict[str, Any]]:
+    def upsert_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Batched upsert_job with the same merge semantics.
+        Looks up every fingerprint in one query, and the source URLs of jobs with
+        no fingerprint match in another, merges in memory, then writes
+        all inserts in one request and all merges in another.
+        Near-duplicates are folded within the batch and matched against the
+        stored LSH buckets with one more lookup.
+        """
+        if not jobs:
+            return []
+        
+        # Fold jobs that share a fingerprint, as consecutive upsert_job calls would
+        pending: Dict[str, Dict[str, Any]] = {}
+        for job_data in jobs:
+            fingerprint = self._generate_fingerprint(job_data.get("company", ""), job_data.get("job_title", ""))
+            new_locs, new_platforms, new_urls = self._list_fields(job_data)
+            if fingerprint in pending:
+                self._fold(pending[fingerprint], job_data, new_locs, new_platforms, new_urls)
+            else:
+                pending[fingerprint] = {"job": job_data, "locations": new_locs, "platforms": new_platforms, "source_urls": new_urls}
+        
+        # One lookup for all fingerprints (chunked to keep the query string short)
+        existing: Dict[str, Dict[str, Any]] = {}
+        fingerprints = list(pending)
+        for i in range(0, len(fingerprints), FINGERPRINT_CHUNK_SIZE):
+            response = self.supabase.table("job_postings") \
+                .select(self._select_list(MERGE_COLUMNS)) \
+                .in_("fingerprint", fingerprints[i:i + FINGERPRINT_CHUNK_SIZE]) \
+                .execute()
+            for row in response.data:
+                existing[row["fingerprint"]] = row
+        
+        # Then by any known URL, as upsert_job does, so a re-scraped listing with an edited title merges
+        by_url = [fp for fp in pending if fp not in existing and pending[fp]["source_urls"]]
+        if by_url:
+            try:
+                owners = self._lookup_urls([url for fp in by_url for url in pending[fp]["source_urls"]])
+            except Exception as e:
+                print(f"Error looking up job URLs: {e}")
+                owners = {}
+            owner_ids = {}
+            for fp in by_url:
+                job_id = next((owners[url]["job_id"] for url in pending[fp]["source_urls"] if url in owners), None)
+                if job_id:
+                    owner_ids[fp] = job_id
+            if owner_ids:
+                records = {row["id"]: row for row in self._get_jobs(sorted(set(owner_ids.values())))}
+                for fp, job_id in owner_ids.items():
+                    if job_id in records:
+                        existing[fp] = records[job_id]
+        
+        # Near-duplicates: fold within the batch, then match the rest against stored jobs
+        for item in pending.values():
+            item["minhash"] = self._signature(item["job"])
+        unmatched = [fp for fp in pending if fp not in existing and pending[fp]["minhash"]]
+        unmatched = self._fold_near_duplicates(pending, unmatched)
+        duplicate_ids = self._find_near_duplicates([(pending[fp]["job"].get("company", ""), pending[fp]["minhash"]) for fp in unmatched])
+        duplicates = {fp: job_id for fp, job_id in zip(unmatched, duplicate_ids) if job_id}
+        if duplicates:
+            records = {row["id"]: row for row in self._get_jobs(list(set(duplicates.values())))}
+            for fp, job_id in duplicates.items():
+                if job_id in records:
+                    existing[fp] = records[job_id]
+        
+        # Two batch items may resolve to the same stored job; fold them so it is written once
+        targets: Dict[str, str] = {}
+        for fingerprint in list(pending):
+            record = existing.get(fingerprint)
+            if not record:
+                continue
+            if record["id"] in targets:
+                item = pending.pop(fingerprint)
+                self._fold(pending[targets[record["id"]]], item["job"], item["locations"], item["platforms"], item["source_urls"])
+            else:
+                targets[record["id"]] = fingerprint
+        
+        inserts, updates = [], []
+        for fingerprint, item in pending.items():
+            args = (item["job"], item["locations"], item["platforms"], item["source_urls"])
+            record = existing.get(fingerprint)
+            if record:
+                update_payload = self._merge_payload(record, *args)
+                # Upsert on id needs the NOT NULL columns; llm_analysis is left untouched
+                update_payload.update({
+                    "id": record["id"],
+                    "fingerprint": record["fingerprint"],
+                    "job_title": record.get("job_title"),
+                    "company": record.get("company"),
+                })
+                payload = update_payload
+                updates.append(update_payload)
+            else:
+                payload = self._insert_payload(fingerprint, *args)
+                inserts.append(payload)
+            if item["minhash"]:
+                payload["minhash"] = item["minhash"]
+        
+        saved = []
+        if inserts:
+            response = self.supabase.table("job_postings").insert(inserts).execute()
+            saved.extend(response.data)
+        # A bulk upsert nulls any key a row lacks, so rows are sent in groups with the same keys:
+        # a merge without a new minhash, or without a processing-state reset, must keep the stored one
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for update in updates:
+            groups.setdefault(frozenset(update), []).append(update)
+        for group in groups.values():
+            response = self.supabase.table("job_postings").upsert(group, on_conflict="id").execute()
+            saved.extend(response.data)
+            
+        print(f"Upserted batch of {len(jobs)} jobs: {len(inserts)} inserted, {len(updates)} merged")
+        self._record_urls(saved)
+        self._index_saved(saved)
+        self._save_lsh_buckets([(row["id"], row["minhash"]) for row in saved if row.get("minhash")])
+        return saved
+
+    def load_seen_index(self, page_size: int = SEEN_INDEX_PAGE_SIZE) -> SeenIndex:
+        """
+        Loads every stored fingerprint and source URL into a local SeenIndex.
+        Pages through the table by id with a projected query, so only the
+        columns needed for dedup are transferred.
+        Once loaded, URL checks are answered locally and saves keep it current.
+        """
+        count_response = self.supabase.table("job_postings").select("id", count="exact").limit(1).execute()
+        expected = (count_response.count or 0) + 10000  # Headroom for jobs saved during the run
+        index = SeenIndex(expected_jobs=expected)
+        
+        last_id = None
+        while True:
+            query = self.supabase.table("job_postings").select("id, fingerprint, source_urls").order("id").limit(page_size)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            rows = query.execute().data
+            index.add_jobs(rows)
+            if len(rows) < page_size:
+                break
+            last_id = rows[-1]["id"]
+        
+        self.seen_index = index
+        print(f"Loaded seen index: {index.stats()}")
+        return index
+
+    def _index_saved(self, records: List[Dict[str, Any]]):
+        if self.seen_index is not None and records:
+            self.seen_index.add_jobs(records)
+
+    def _lookup_urls(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Looks URLs up in the job_urls table by hash.
+        Returns {url: {"url_hash", "url", "job_id"}} for the URLs that are stored.
+        Batches of any size are split into chunked `in` queries on the unique index.
+        """
+        hashes = {self._url_hash(url): url for url in urls}
+        hash_list = list(hashes)
+        found = {}
+        for i in range(0, len(hash_list), URL_HASH_CHUNK_SIZE):
+            response = self.supabase.table("job_urls") \
+                .select("url_hash, url, job_id") \
+                .in_("url_hash", hash_list[i:i + URL_HASH_CHUNK_SIZE]) \
+                .execute()
+            for row in response.data:
+                url = hashes.get(row["url_hash"])
+                if url is not None:
+                    found[url] = row
+        return found
+
+    def _get_job_by_urls(self, urls: List[str]) -> Optional[Dict[str, Any]]:
+        """Returns the job that already owns one of these URLs, if any."""
+        if not urls:
+            return None
+        try:
+            found = self._lookup_urls(urls)
+        except Exception as e:
+            print(f"Error looking up job URLs: {e}")
+            return None
+        if not found:
+            return None
+        return self._get_job(next(iter(found.values()))["job_id"])
+
+    def _get_job(self, job_id: str, columns: Sequence[str] = MERGE_COLUMNS) -> Optional[Dict[str, Any]]:
+        response = self.supabase.table("job_postings").select(self._select_list(columns)).eq("id", job_id).execute()
+        return response.data[0] if response.data else None
+
+    def _get_jobs(self, job_ids: List[str], columns: Sequence[str] = MERGE_COLUMNS) -> List[Dict[str, Any]]:
+        rows = []
+        for i in range(0, len(job_ids), FINGERPRINT_CHUNK_SIZE):
+            response = self.supabase.table("job_postings") \
+                .select(self._select_list(columns)) \
+                .in_("id", job_ids[i:i + FINGERPRINT_CHUNK_SIZE]) \
+                .execute()
+            rows.extend(response.data)
+        return rows
+
+    def _lsh_candidates(self, keys: List[str]) -> List[Dict[str, Any]]:
+        job_ids = set()
+        for i in range(0, len(keys), URL_HASH_CHUNK_SIZE):
+            response = self.supabase.table("job_lsh_buckets") \
+                .select("job_id") \
+                .in_("bucket", keys[i:i + URL_HASH_CHUNK_SIZE]) \
+                .execute()
+            job_ids.update(row["job_id"] for row in response.data)
+        return self._get_jobs(sorted(job_ids), columns=("id", "company", "minhash")) if job_ids else []
+
+    def _save_lsh_buckets(self, signatures: List[tuple]):
+        _, lsh = near_duplicate_tools()
+        rows = [{"bucket": key, "job_id": job_id} for job_id, signature in signatures for key in lsh.keys(signature)]
+        if not rows:
+            return
+        try:
+            self.supabase.table("job_lsh_buckets").upsert(rows, on_conflict="bucket,job_id", ignore_duplicates=True).execute()
+        except Exception as e:
+            print(f"Error saving near-duplicate buckets: {e}")
+
+    def save_minhashes(self, signatures: List[tuple]):
+        for job_id, signature in signatures:
+            self.supabase.table("job_postings").update({"minhash": signature}).eq("id", job_id).execute()
+        self._save_lsh_buckets(signatures)
+
+    def merge_duplicate_jobs(self, canonical_id: str, duplicate_ids: List[str]) -> Dict[str, Any]:
+        """
+        Merges duplicate jobs into the canonical one, moves their URLs over and
+        deletes them. Used by the near-duplicate clustering script.
+        """
+        rows = {row["id"]: row for row in self._get_jobs([canonical_id] + list(duplicate_ids), columns=CLUSTER_COLUMNS)}
+        canonical = rows[canonical_id]
+        payload = self._cluster_payload(canonical, [rows[job_id] for job_id in duplicate_ids if job_id in rows])
+        
+        response = self.supabase.table("job_postings").update(payload).eq("id", canonical["id"]).execute()
+        self.supabase.table("job_postings").delete().in_("id", list(duplicate_ids)).execute()
+        self._forget_similar_jobs(list(duplicate_ids))
+        # Deleting cascades to job_urls; register the moved URLs under the canonical job
+        self._record_urls(response.data)
+        return response.data[0] if response.data else {}
+
+    def _record_urls(self, records: List[Dict[str, Any]]):
+        """Registers the source URLs of saved rows in job_urls."""
+        rows = {}
+        for record in records or []:
+            for url in record.get("source_urls") or []:
+                rows[self._url_hash(url)] = {"url_hash": self._url_hash(url), "url": url, "job_id": record["id"]}
+        if not rows:
+            return
+        try:
+            # A URL keeps pointing at the job that first claimed it
+            self.supabase.table("job_urls").upsert(list(rows.values()), on_conflict="url_hash", ignore_duplicates=True).execute()
+        except Exception as e:
+            print(f"Error recording job URLs: {e}")
+
+    def get_job_by_fingerprint(self, company: str, title: str, columns: Sequence[str] = JOB_COLUMNS) -> Optional[Dict[str, Any]]:
         """Retrieves a job by its fingerprint."""
         fp = self._generate_fingerprint(company, title)
-        response = self.supabase.table("job_postings").select("*").eq("fingerprint", fp).execute()
+        if self.seen_index is not None and not self.seen_index.has_fingerprint(fp):
+            return None
+        response = self.supabase.table("job_postings").select(self._select_list(columns)).eq("fingerprint", fp).execute()
         return response.data[0] if response.data else None
 
     def check_existing_urls(self, urls: List[str]) -> List[str]:
@@ -116,33 +380,29 @@ class JobDatabase:
         if not urls:
             return []
             
-        # Supabase/PostgREST 'cs' operator means 'contains' for array columns.
-        # However, we want to check if any of the rows have a source_url that matches one of our input urls.
-        # Since source_urls is an array column in DB, and we have a list of URLs to check.
-        
-        # Efficient approach:
-        # We want to find rows where source_urls && ARRAY[urls].
-        # The 'overlaps' operator in PostgREST is 'ov'.
-        
-        try:
-            # We can't easily pass a massive list to the query string if it's too long.
-            # But for a page of results (20-30 items), it's fine.
+        # Answer locally when the seen index is loaded
+        if self.seen_index is not None:
+            return [url for url in dict.fromkeys(urls) if self.seen_index.has_url(url)]
             
-            # Format for Postgres array literal: {url1,url2}
-            # But the python client might handle list conversion.
+        try:
+            # Exact membership via the unique url_hash index on job_urls
+            return list(self._lookup_urls(urls))
+        except Exception as e:
+            print(f"Error checking job_urls, falling back to source_urls overlap: {e}")
             
-            response = self.supabase.table("job_postings") \
-                .select("source_urls") \
-                .ov("source_urls", urls) \
-                .execute()
-                
+        # Fallback for databases without job_urls: the 'ov' (overlaps) operator on source_urls
+        try:
+            url_set = set(urls)
             existing_urls = set()
-            if response.data:
-                for row in response.data:
-                    # Each row has a list of source_urls.
-                    # We check which of OUR input urls are in this row's list.
+            for i in range(0, len(urls), URL_HASH_CHUNK_SIZE):
+                response = self.supabase.table("job_postings") \
+                    .select("source_urls") \
+                    .ov("source_urls", urls[i:i + URL_HASH_CHUNK_SIZE]) \
+                    .execute()
+                for row in response.data or []:
+                    # Each row has a list of source_urls; keep the ones we asked about
                     for db_url in row.get('source_urls', []):
-                        if db_url in urls:
+                        if db_url in url_set:
                             existing_urls.add(db_url)
                             
             return list(existing_urls)
@@ -151,34 +411,135 @@ class JobDatabase:
             print(f"Error checking existing URLs: {e}")
             return []
 
+    def get_crawl_state(self, platform: str, term: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the crawl watermark for a search term, or None if it has never completed a run.
+        """
+        try:
+            response = self.supabase.table("crawl_state") \
+                .select("*") \
+                .eq("platform", platform) \
+                .eq("term", term) \
+                .execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            print(f"Error fetching crawl state: {e}")
+            return None
+
+    def save_crawl_state(self, platform: str, term: str, newest_listing_id: Optional[int], last_success_at: str) -> Dict[str, Any]:
+        """
+        Records the newest listing seen and the start time of the last successful run for a term.
+        """
+        payload = {
+            "platform": platform,
+            "term": term,
+            "newest_listing_id": newest_listing_id,
+            "last_success_at": last_success_at,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+        response = self.supabase.table("crawl_state").upsert(payload, on_conflict="platform,term").execute()
+        return response.data[0] if response.data else {}
+
     def update_llm_analysis(self, job_id: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Updates the llm_analysis field for a specific job.
+        Updates the llm_analysis field for a specific job, marks it done and releases its lease.
         """
-        response = self.supabase.table("job_postings").update({"llm_analysis": analysis}).eq("id", job_id).execute()
+        response = self.supabase.table("job_postings").update(self._analysis_payload(analysis)).eq("id", job_id).execute()
+        return response.data[0] if response.data else {}
+
+    def update_llm_analyses(self, updates: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Writes the analyses through the update_llm_analyses function, one request per chunk."""
+        written = 0
+        for i in range(0, len(updates), ANALYSIS_UPDATE_CHUNK_SIZE):
+            chunk = [{"id": job_id, "analysis": analysis} for job_id, analysis in updates[i:i + ANALYSIS_UPDATE_CHUNK_SIZE]]
+            response = self.supabase.rpc("update_llm_analyses", {"updates": chunk}).execute()
+            written += response.data or 0
+        return written
+
+    def record_analysis_failure(self, job_id: str, error: str, retryable: bool = True) -> Dict[str, Any]:
+        rows = self.supabase.table("job_postings").select("attempts").eq("id", job_id) \
+            .is_("llm_analysis", "null").execute().data
+        if not rows:
+            return {}
+        payload = self._failure_payload((rows[0].get("attempts") or 0) + 1, error, retryable)
+        response = self.supabase.table("job_postings").update(payload).eq("id", job_id) \
+            .is_("llm_analysis", "null").execute()
         return response.data[0] if response.data else {}
 
-    def get_all_jobs(self, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_dead_letter_jobs(self, limit: int = 100) -> List[Dict[str, Any]]:
+        response = self.supabase.table("job_processing_dead_letter") \
+            .select(", ".join(DEAD_LETTER_COLUMNS)) \
+            .order("created_at", desc=True) \
+            .limit(limit) \
+            .execute()
+        return response.data
+
+    def requeue_jobs(self, job_ids: List[str]) -> int:
+        payload = {"processing_status": PENDING, "attempts": 0, "last_error": None, "next_eligible_at": None,
+                   "claimed_by": None, "lease_expires_at": None}
+        requeued = 0
+        for i in range(0, len(job_ids), FINGERPRINT_CHUNK_SIZE):
+            response = self.supabase.table("job_postings").update(payload) \
+                .in_("id", job_ids[i:i + FINGERPRINT_CHUNK_SIZE]).execute()
+            requeued += len(response.data)
+        return requeued
+
+    def get_unanalyzed_jobs(self, limit: int, columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        """Returns up to `limit` jobs that are due for LLM analysis, oldest first."""
+        query = due_for_analysis(self.supabase.table("job_postings").select(self._select_list(columns)))
+        response = query.limit(limit).execute()
+        return response.data
+
+    def claim_jobs(self, worker_id: str, limit: int, lease_seconds: Optional[int] = None,
+                   columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        """Leases due jobs through the claim_jobs function: one atomic UPDATE ... RETURNING with SKIP LOCKED."""
+        response = self.supabase.rpc("claim_jobs", claim_params(worker_id, limit, lease_seconds)).execute()
+        return project(response.data or [], columns)
+
+    def claim_jobs_by_id(self, worker_id: str, job_ids: List[str], lease_seconds: Optional[int] = None,
+                         columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        if not job_ids:
+            return []
+        response = self.supabase.rpc("claim_jobs_by_id", claim_by_id_params(worker_id, job_ids, lease_seconds)).execute()
+        return project(response.data or [], columns)
+
+    def release_jobs(self, worker_id: str, job_ids: List[str]) -> int:
+        released = 0
+        for i in range(0, len(job_ids), FINGERPRINT_CHUNK_SIZE):
+            response = self.supabase.table("job_postings").update({"claimed_by": None, "lease_expires_at": None}) \
+                .eq("claimed_by", worker_id).in_("id", job_ids[i:i + FINGERPRINT_CHUNK_SIZE]).execute()
+            released += len(response.data)
+        return released
+
+    def get_all_jobs(self, limit: int = 100, columns: Sequence[str] = JOB_COLUMNS) -> List[Dict[str, Any]]:
         """Retrieves the most recent jobs."""
-        response = self.supabase.table("job_postings").select("*").order("created_at", desc=True).limit(limit).execute()
+        response = self.supabase.table("job_postings").select(self._select_list(columns)).order("created_at", desc=True).limit(limit).execute()
         return response.data
 
-    # Placeholder for vector search
-    def search_similar_jobs(self, embedding: List[float], threshold: float = 0.7, limit: int = 5):
+    def iter_jobs(self, columns: Sequence[str] = JOB_COLUMNS, page_size: int = ITER_PAGE_SIZE,
+                  updated_since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
         """
-        Finds jobs with similar embeddings.
-        Requires the 'match_documents' or similar RPC function to be set up in Supabase if using pgvector directly via RPC,
-        or standard vector filtering if supported by the client library version.
-        
-        For now, this is a placeholder.
-        """
-        # Example RPC call if you set up a postgres function for vector search
-        # response = self.supabase.rpc(
-        #     "match_jobs", 
-        #     {"query_embedding": embedding, "match_threshold": threshold, "match_count": limit}
-        # ).execute()
-        # return response.data
-        pass
+        Streams every job ordered by (created_at, id) using keyset pagination.
+        Only `columns` are transferred; created_at and id are added for the cursor.
+        """
+        selected = list(dict.fromkeys(list(columns) + ["created_at", "id"]))
+        cursor = None
+        while True:
+            query = self.supabase.table("job_postings") \
+                .select(self._select_list(selected)) \
+                .order("created_at") \
+                .order("id") \
+                .limit(page_size)
+            if updated_since is not None:
+                query = query.gte("updated_at", updated_since)
+            if cursor is not None:
+                created_at, last_id = cursor
+                query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{last_id})')
+            rows = query.execute().data
+            yield from rows
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1]["created_at"], rows[-1]["id"])
 
 if __name__ == "__main__":
     # Simple test to check connection (will fail if env vars are not set)
@@ -0,0 +1,7 @@
+-- Listing metadata read from SEEK's embedded page state.
+-- Columns already exist in schema.sql; this brings older databases up to date.
+alter table public.job_postings add column if not exists posted_at timestamptz;
+alter table public.job_postings add column if not exists job_type text;
+
+comment on column public.job_postings.posted_at is 'When the listing was published on the source platform.';
+comment on column public.job_postings.job_type is 'Work type as listed (Full time, Contract, ...).';
@@ -0,0 +1,12 @@
+-- Per-term crawl watermark used for incremental scraping.
+create table if not exists public.crawl_state (
+  platform text not null,
+  term text not null,
+  newest_listing_id bigint, -- Highest listing ID seen in the last successful run
+  last_success_at timestamptz, -- Start time of the last successful run
+  updated_at timestamptz not null default now(),
+
+  constraint crawl_state_pkey primary key (platform, term)
+);
+
+comment on table public.crawl_state is 'High-water marks per search term so scheduled runs only page through new listings.';
@@ -0,0 +1,22 @@
+-- Normalized URL lookup table for deduplication.
+-- One row per source URL, keyed by the SHA-256 of the URL so membership checks
+-- hit a fixed-width unique index instead of scanning source_urls arrays.
+create table if not exists public.job_urls (
+  url_hash text not null, -- encode(sha256(convert_to(url, 'UTF8')), 'hex')
+  url text not null,
+  job_id uuid not null references public.job_postings (id) on delete cascade,
+  created_at timestamptz not null default now(),
+
+  constraint job_urls_pkey primary key (url_hash)
+);
+
+create index if not exists idx_job_urls_job_id on public.job_urls (job_id);
+
+comment on table public.job_urls is 'Source URL -> job index used for exact, index-backed dedup lookups.';
+
+-- Backfill from existing postings
+insert into public.job_urls (url_hash, url, job_id)
+select encode(sha256(convert_to(u.url, 'UTF8')), 'hex'), u.url, p.id
+from public.job_postings p
+cross join lateral unnest(p.source_urls) as u (url)
+on conflict (url_hash) do nothing;
@@ -0,0 +1,16 @@
+-- Near-duplicate detection: MinHash signature per job plus its LSH buckets.
+alter table public.job_postings add column if not exists minhash bigint[];
+
+comment on column public.job_postings.minhash is 'MinHash signature of the description word shingles.';
+
+create table if not exists public.job_lsh_buckets (
+  bucket text not null, -- '<band>:<hash of the band''s signature values>'
+  job_id uuid not null references public.job_postings (id) on delete cascade,
+
+  constraint job_lsh_buckets_pkey primary key (bucket, job_id)
+);
+
+create index if not exists idx_job_lsh_buckets_job_id on public.job_lsh_buckets (job_id);
+
+comment on table public.job_lsh_buckets is 'LSH bands of job minhash signatures; jobs sharing a bucket are near-duplicate candidates.';
+-- Existing rows get signatures with: python -m scripts.cluster_duplicates --backfill
@@ -0,0 +1,28 @@
+-- LLM analysis processing state, so failing jobs back off and poison jobs stop being retried.
+alter table public.job_postings add column if not exists processing_status text not null default 'pending';
+alter table public.job_postings add column if not exists attempts integer not null default 0;
+alter table public.job_postings add column if not exists last_error text;
+alter table public.job_postings add column if not exists next_eligible_at timestamptz;
+
+alter table public.job_postings drop constraint if exists job_postings_processing_status_check;
+alter table public.job_postings add constraint job_postings_processing_status_check
+  check (processing_status in ('pending', 'retry', 'done', 'dead'));
+
+comment on column public.job_postings.processing_status is 'pending -> done, or retry (backing off) -> dead after too many failed analyses.';
+comment on column public.job_postings.attempts is 'Failed LLM analysis attempts.';
+comment on column public.job_postings.last_error is 'Error of the most recent failed analysis.';
+comment on column public.job_postings.next_eligible_at is 'A job in retry is not picked up again before this time.';
+
+-- Jobs analyzed before this migration
+update public.job_postings set processing_status = 'done'
+where llm_analysis is not null and processing_status = 'pending';
+
+-- What the processor polls: jobs still to analyze, oldest first
+create index if not exists idx_job_postings_eligible on public.job_postings (created_at)
+  where llm_analysis is null and processing_status in ('pending', 'retry');
+
+-- Jobs the processor gave up on; requeue with: python -m scripts.dead_letter --requeue
+create or replace view public.job_processing_dead_letter as
+select id, job_title, company, attempts, last_error, created_at
+from public.job_postings
+where processing_status = 'dead';
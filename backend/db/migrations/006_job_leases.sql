@@ -0,0 +1,29 @@
+-- Lease-based claiming, so several processor instances can share the analysis backlog.
+alter table public.job_postings add column if not exists claimed_by text;
+alter table public.job_postings add column if not exists lease_expires_at timestamptz;
+
+comment on column public.job_postings.claimed_by is 'Processor instance currently analyzing the job.';
+comment on column public.job_postings.lease_expires_at is 'The claim lapses at this time and the job can be claimed again.';
+
+-- Atomically leases up to batch_limit due jobs to one worker. Jobs whose lease
+-- has expired (their worker died or stalled) are reclaimed; rows being claimed
+-- by a concurrent call are skipped rather than waited on.
+create or replace function public.claim_jobs(worker text, batch_limit integer, lease_seconds integer)
+returns setof public.job_postings
+language sql
+as $$
+  update public.job_postings p
+  set claimed_by = worker,
+      lease_expires_at = now() + make_interval(secs => lease_seconds)
+  where p.id in (
+    select id from public.job_postings
+    where llm_analysis is null
+      and processing_status in ('pending', 'retry')
+      and (next_eligible_at is null or next_eligible_at <= now())
+      and (lease_expires_at is null or lease_expires_at <= now())
+    order by created_at
+    limit batch_limit
+    for update skip locked
+  )
+  returning p.*;
+$$;
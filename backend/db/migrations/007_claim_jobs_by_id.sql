@@ -0,0 +1,16 @@
+-- Leases specific jobs (e.g. ones the pipeline just scraped) if they are due and
+-- not leased by another worker, so a processor instance can't pick them up too.
+create or replace function public.claim_jobs_by_id(worker text, job_ids uuid[], lease_seconds integer)
+returns setof public.job_postings
+language sql
+as $$
+  update public.job_postings
+  set claimed_by = worker,
+      lease_expires_at = now() + make_interval(secs => lease_seconds)
+  where id = any (job_ids)
+    and llm_analysis is null
+    and processing_status in ('pending', 'retry')
+    and (next_eligible_at is null or next_eligible_at <= now())
+    and (claimed_by is null or claimed_by = worker or lease_expires_at <= now())
+  returning *;
+$$;
@@ -0,0 +1,19 @@
+-- Writes many analyses in one statement (batch backfill results), marking each job done.
+create or replace function public.update_llm_analyses(updates jsonb)
+returns integer
+language sql
+as $$
+  with updated as (
+    update public.job_postings p
+    set llm_analysis = u.analysis,
+        processing_status = 'done',
+        last_error = null,
+        next_eligible_at = null,
+        claimed_by = null,
+        lease_expires_at = null
+    from jsonb_to_recordset(updates) as u (id uuid, analysis jsonb)
+    where p.id = u.id
+    returning p.id
+  )
+  select count(*)::integer from updated;
+$$;
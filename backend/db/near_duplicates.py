@@ -0,0 +1,130 @@
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+import numpy as np
+
+# Largest prime below 2**32: a * x + b stays inside uint64 for 32-bit a, b and x
+_PRIME = np.uint64(4294967291)
+_WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int) -> Set[str]:
+    """Lowercased word `size`-grams of a text; short texts become a single shingle."""
+    words = _WORD_RE.findall((text or "").lower())
+    if not words:
+        return set()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles.
+    The fraction of equal positions in two signatures estimates the Jaccard
+    similarity of the two shingle sets.
+    """
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams),
+            dtype=np.uint64, count=len(grams),
+        ) % _PRIME
+        return ((hashes[:, None] * self.a + self.b) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    a, b = np.asarray(a, dtype=np.uint32), np.asarray(b, dtype=np.uint32)
+    if a.shape != b.shape:
+        return 0.0
+    return float(np.mean(a == b))
+
+
+class LSHIndex:
+    """
+    Banded LSH over MinHash signatures. Two signatures share a bucket when any
+    band of `rows` values is identical, which happens with probability
+    1 - (1 - s**rows)**bands for Jaccard similarity s.
+    Bucket keys are strings so they can be stored alongside the jobs.
+    """
+    def __init__(self, bands: int = 16, rows: int = 8):
+        self.bands = bands
+        self.rows = rows
+        self.buckets: Dict[str, Set[str]] = {}
+
+    def keys(self, signature: Sequence[int]) -> List[str]:
+        signature = np.asarray(signature, dtype="<u4")
+        if len(signature) < self.bands * self.rows:
+            raise ValueError(f"Signature has {len(signature)} values, LSH needs {self.bands * self.rows}")
+        return [
+            f"{band}:{hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).hexdigest()}"
+            for band in range(self.bands)
+        ]
+
+    def add(self, item_id: str, signature: Sequence[int]):
+        for key in self.keys(signature):
+            self.buckets.setdefault(key, set()).add(item_id)
+
+    def candidates(self, signature: Sequence[int]) -> Set[str]:
+        found = set()
+        for key in self.keys(signature):
+            found |= self.buckets.get(key, set())
+        return found
+
+
+def cluster(signatures: Dict[str, Sequence[int]], lsh: LSHIndex, threshold: float,
+            groups: Optional[Dict[str, str]] = None) -> List[List[str]]:
+    """
+    Groups ids whose signatures are at least `threshold` similar (transitively).
+    When `groups` is given (e.g. id -> normalized company) only ids in the same group match.
+    Returns the clusters with more than one member.
+    """
+    parent = {item_id: item_id for item_id in signatures}
+
+    def find(item_id):
+        while parent[item_id] != item_id:
+            parent[item_id] = parent[parent[item_id]]
+            item_id = parent[item_id]
+        return item_id
+
+    for item_id, signature in signatures.items():
+        for other in lsh.candidates(signature):
+            if groups is not None and groups.get(other) != groups.get(item_id):
+                continue
+            if similarity(signature, signatures[other]) >= threshold:
+                parent[find(other)] = find(item_id)
+        lsh.add(item_id, signature)
+
+    clusters: Dict[str, List[str]] = {}
+    for item_id in signatures:
+        clusters.setdefault(find(item_id), []).append(item_id)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def normalize_company(company: Optional[str]) -> str:
+    return (company or "").lower().strip()
+
+
+def best_match(signature: Sequence[int], company: Optional[str], candidates: Iterable[Dict], threshold: float,
+               same_company: bool = True) -> Optional[Dict]:
+    """Returns the most similar candidate row (with `minhash`) at or above the threshold."""
+    best, best_score = None, threshold
+    for row in candidates:
+        if not row.get("minhash"):
+            continue
+        if same_company and normalize_company(row.get("company")) != normalize_company(company):
+            continue
+        score = similarity(signature, row["minhash"])
+        if score >= best_score:
+            best, best_score = row, score
+    return best
@@ -17,7 +17,7 @@ create table public.job_postings (
   locations text[] not null,   -- List of locations
   
   -- Standard fields
-  title text not null,
+  job_title text not null,
   company text,
   posted_at timestamptz,
   raw_content text, -- Content from the most recent scrape
@@ -28,6 +28,17 @@ create table public.job_postings (
   -- The core LLM output stored as flexible JSON
   llm_analysis jsonb,
   
+  -- MinHash signature of the description, for near-duplicate detection
+  minhash bigint[],
+
+  -- LLM analysis processing state: pending -> done, or retry -> dead
+  processing_status text not null default 'pending',
+  attempts integer not null default 0, -- Failed analysis attempts
+  last_error text,
+  next_eligible_at timestamptz, -- Not retried before this time
+  claimed_by text, -- Processor instance holding the lease
+  lease_expires_at timestamptz, -- Lease lapses (and the job can be reclaimed) at this time
+  
   -- Embedding for semantic search
   embedding vector (1536),
   
@@ -35,7 +46,8 @@ create table public.job_postings (
   updated_at timestamptz not null default now(),
   
   constraint job_postings_pkey primary key (id),
-  constraint job_postings_fingerprint_key unique (fingerprint)
+  constraint job_postings_fingerprint_key unique (fingerprint),
+  constraint job_postings_processing_status_check check (processing_status in ('pending', 'retry', 'done', 'dead'))
 );
 
 -- Create an index on the JSONB column
@@ -44,3 +56,104 @@ create index idx_job_postings_llm_analysis on public.job_postings using gin (llm
 -- Comment on table and columns
 comment on table public.job_postings is 'Stores job descriptions and LLM-extracted insights. Handles deduplication via fingerprint.';
 comment on column public.job_postings.fingerprint is 'Unique identifier derived from Company + Title to detect duplicates.';
+
+-- Per-term crawl watermark used for incremental scraping
+create table if not exists public.crawl_state (
+  platform text not null,
+  term text not null,
+  newest_listing_id bigint, -- Highest listing ID seen in the last successful run
+  last_success_at timestamptz, -- Start time of the last successful run
+  updated_at timestamptz not null default now(),
+
+  constraint crawl_state_pkey primary key (platform, term)
+);
+
+-- Source URL -> job index for dedup lookups (keyed by SHA-256 of the URL)
+create table if not exists public.job_urls (
+  url_hash text not null, -- encode(sha256(convert_to(url, 'UTF8')), 'hex')
+  url text not null,
+  job_id uuid not null references public.job_postings (id) on delete cascade,
+  created_at timestamptz not null default now(),
+
+  constraint job_urls_pkey primary key (url_hash)
+);
+
+create index if not exists idx_job_urls_job_id on public.job_urls (job_id);
+
+-- LSH bands of job minhash signatures; jobs sharing a bucket are near-duplicate candidates
+create table if not exists public.job_lsh_buckets (
+  bucket text not null, -- '<band>:<hash of the band''s signature values>'
+  job_id uuid not null references public.job_postings (id) on delete cascade,
+
+  constraint job_lsh_buckets_pkey primary key (bucket, job_id)
+);
+
+create index if not exists idx_job_lsh_buckets_job_id on public.job_lsh_buckets (job_id);
+
+-- Jobs still to analyze, oldest first
+create index if not exists idx_job_postings_eligible on public.job_postings (created_at)
+  where llm_analysis is null and processing_status in ('pending', 'retry');
+
+-- Jobs the processor gave up on; requeue with: python -m scripts.dead_letter --requeue
+create or replace view public.job_processing_dead_letter as
+select id, job_title, company, attempts, last_error, created_at
+from public.job_postings
+where processing_status = 'dead';
+
+-- Atomically leases up to batch_limit due jobs to one processor instance,
+-- reclaiming expired leases and skipping rows a concurrent claim has locked
+create or replace function public.claim_jobs(worker text, batch_limit integer, lease_seconds integer)
+returns setof public.job_postings
+language sql
+as $$
+  update public.job_postings p
+  set claimed_by = worker,
+      lease_expires_at = now() + make_interval(secs => lease_seconds)
+  where p.id in (
+    select id from public.job_postings
+    where llm_analysis is null
+      and processing_status in ('pending', 'retry')
+      and (next_eligible_at is null or next_eligible_at <= now())
+      and (lease_expires_at is null or lease_expires_at <= now())
+    order by created_at
+    limit batch_limit
+    for update skip locked
+  )
+  returning p.*;
+$$;
+
+-- Leases specific jobs if they are due and not leased by another worker
+create or replace function public.claim_jobs_by_id(worker text, job_ids uuid[], lease_seconds integer)
+returns setof public.job_postings
+language sql
+as $$
+  update public.job_postings
+  set claimed_by = worker,
+      lease_expires_at = now() + make_interval(secs => lease_seconds)
+  where id = any (job_ids)
+    and llm_analysis is null
+    and processing_status in ('pending', 'retry')
+    and (next_eligible_at is null or next_eligible_at <= now())
+    and (claimed_by is null or claimed_by = worker or lease_expires_at <= now())
+  returning *;
+$$;
+
+-- Writes many analyses in one statement (batch backfill results), marking each job done
+create or replace function public.update_llm_analyses(updates jsonb)
+returns integer
+language sql
+as $$
+  with updated as (
+    update public.job_postings p
+    set llm_analysis = u.analysis,
+        processing_status = 'done',
+        last_error = null,
+        next_eligible_at = null,
+        claimed_by = null,
+        lease_expires_at = null
+    from jsonb_to_recordset(updates) as u (id uuid, analysis jsonb)
+    where p.id = u.id
+    returning p.id
+  )
+  select count(*)::integer from updated;
+$$;
@@ -0,0 +1,82 @@
+import hashlib
+import math
+from typing import Any, Dict, Iterable
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter using double hashing over a 128-bit blake2b digest.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add_digest(self, digest: bytes):
+        for pos in self._positions(digest):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def contains_digest(self, digest: bytes) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+
+class _KeySet:
+    """
+    Bloom filter in front of an exact set of 64-bit key hashes.
+    Misses are answered by the filter alone; hits are confirmed against the set.
+    """
+    def __init__(self, capacity: int, error_rate: float):
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.exact = set()
+
+    def add(self, key: str):
+        digest = _digest(key)
+        self.bloom.add_digest(digest)
+        self.exact.add(digest[:8])
+
+    def __contains__(self, key: str) -> bool:
+        digest = _digest(key)
+        return self.bloom.contains_digest(digest) and digest[:8] in self.exact
+
+    def __len__(self):
+        return len(self.exact)
+
+
+class SeenIndex:
+    """
+    In-memory index of the source URLs and fingerprints already stored,
+    so dedup checks during a scrape need no database round trip.
+    """
+    def __init__(self, expected_jobs: int = 10000, error_rate: float = 0.001):
+        # Jobs often carry more than one URL once duplicates are merged
+        self.urls = _KeySet(expected_jobs * 2, error_rate)
+        self.fingerprints = _KeySet(expected_jobs, error_rate)
+
+    def add_job(self, record: Dict[str, Any]):
+        if record.get("fingerprint"):
+            self.fingerprints.add(record["fingerprint"])
+        for url in record.get("source_urls") or []:
+            self.urls.add(url)
+
+    def add_jobs(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.add_job(record)
+
+    def has_url(self, url: str) -> bool:
+        return url in self.urls
+
+    def has_fingerprint(self, fingerprint: str) -> bool:
+        return fingerprint in self.fingerprints
+
+    def stats(self) -> Dict[str, int]:
+        return {"urls": len(self.urls), "fingerprints": len(self.fingerprints)}
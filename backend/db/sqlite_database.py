@@ -0,0 +1,443 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+from config import PROCESSOR_SETTINGS
+from db.storage import (
+    JobStorage, JOB_COLUMNS, MERGE_COLUMNS, CLUSTER_COLUMNS, ANALYSIS_COLUMNS, DEAD_LETTER_COLUMNS, PROCESSING_COLUMNS, ITER_PAGE_SIZE,
+    PENDING, near_duplicate_tools,
+)
+
+# Host parameters per `IN (...)` lookup
+SQLITE_CHUNK_SIZE = 500
+
+# Columns stored as JSON text
+JSON_COLUMNS = ("locations", "platforms", "source_urls", "llm_analysis", "minhash")
+
+SCHEMA = """
+create table if not exists job_postings (
+  id text primary key,
+  fingerprint text not null unique,
+  job_title text not null default '',
+  company text,
+  locations text not null default '[]' check (json_valid(locations)),
+  platforms text not null default '[]' check (json_valid(platforms)),
+  source_urls text not null default '[]' check (json_valid(source_urls)),
+  description text,
+  salary text,
+  seniority text,
+  posted_at text,
+  job_type text,
+  llm_analysis text check (llm_analysis is null or json_valid(llm_analysis)),
+  minhash text, -- JSON array, MinHash signature of the description
+  processing_status text not null default 'pending'
+    check (processing_status in ('pending', 'retry', 'done', 'dead')),
+  attempts integer not null default 0, -- Failed analysis attempts
+  last_error text,
+  next_eligible_at text, -- Not retried before this time
+  claimed_by text, -- Processor instance holding the lease
+  lease_expires_at text, -- Lease lapses (and the job can be reclaimed) at this time
+  created_at text not null,
+  updated_at text not null
+);
+
+create index if not exists idx_job_postings_created_at on job_postings (created_at, id);
+create index if not exists idx_job_postings_unanalyzed on job_postings (created_at) where llm_analysis is null;
+
+create table if not exists job_urls (
+  url_hash text primary key,
+  url text not null,
+  job_id text not null references job_postings (id) on delete cascade
+) without rowid;
+
+create index if not exists idx_job_urls_job_id on job_urls (job_id);
+
+create table if not exists job_lsh_buckets (
+  bucket text not null, -- "<band>:<hash of the band's signature values>"
+  job_id text not null references job_postings (id) on delete cascade,
+  primary key (bucket, job_id)
+) without rowid;
+
+create table if not exists crawl_state (
+  platform text not null,
+  term text not null,
+  newest_listing_id integer,
+  last_success_at text,
+  updated_at text not null,
+  primary key (platform, term)
+);
+"""
+
+# Needs the processing-state columns, which older databases only get after the alter below
+PROCESSING_SCHEMA = """
+create index if not exists idx_job_postings_eligible on job_postings (created_at)
+  where llm_analysis is null and processing_status in ('pending', 'retry');
+
+create view if not exists job_processing_dead_letter as
+select id, job_title, company, attempts, last_error, created_at
+from job_postings
+where processing_status = 'dead';
+"""
+
+# Columns added since the first release, with their definitions
+ADDED_COLUMNS = {
+    "minhash": "minhash text",
+    "processing_status": "processing_status text not null default 'pending'",
+    "attempts": "attempts integer not null default 0",
+    "last_error": "last_error text",
+    "next_eligible_at": "next_eligible_at text",
+    "claimed_by": "claimed_by text",
+    "lease_expires_at": "lease_expires_at text",
+}
+
+# Jobs awaiting analysis whose retry backoff has elapsed (named parameter :now)
+DUE_FOR_ANALYSIS = (
+    "llm_analysis is null and processing_status in ('pending', 'retry') "
+    "and (next_eligible_at is null or next_eligible_at <= :now)"
+)
+
+
+class SQLiteJobDatabase(JobStorage):
+    """
+    Local SQLite storage backend with the same dedup and merge rules as JobDatabase.
+    Runs in WAL mode so readers don't block the writer; list fields and
+    llm_analysis are JSON columns. Safe to share across threads.
+    Use ":memory:" for a throwaway database.
+    """
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock:
+            self.conn.execute("pragma journal_mode = wal")
+            self.conn.execute("pragma synchronous = normal")
+            self.conn.execute("pragma foreign_keys = on")
+            self.conn.executescript(SCHEMA)
+            # Databases created by older versions lack the signature and processing-state columns
+            columns = {row["name"] for row in self.conn.execute("pragma table_info(job_postings)")}
+            for column, definition in ADDED_COLUMNS.items():
+                if column not in columns:
+                    self.conn.execute(f"alter table job_postings add column {definition}")
+            if "processing_status" not in columns:
+                self.conn.execute("update job_postings set processing_status = 'done' where llm_analysis is not null")
+                self.conn.commit()
+            self.conn.executescript(PROCESSING_SCHEMA)
+
+    def close(self):
+        index = getattr(self, "_similar_jobs", None)
+        if index is not None:
+            index.stop()
+        with self._lock:
+            self.conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        for column in JSON_COLUMNS:
+            if column in record and record[column] is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+    @staticmethod
+    def _to_row(record: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(record)
+        for column in JSON_COLUMNS:
+            if column in row and row[column] is not None:
+                row[column] = json.dumps(row[column])
+        return row
+
+    def _select(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._to_dict(row) for row in self.conn.execute(sql, params)]
+
+    def _lookup_urls(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Returns {url: job_urls row} for the URLs that are stored."""
+        hashes = {self._url_hash(url): url for url in urls}
+        hash_list = list(hashes)
+        found = {}
+        for i in range(0, len(hash_list), SQLITE_CHUNK_SIZE):
+            chunk = hash_list[i:i + SQLITE_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self._select(f"select url_hash, url, job_id from job_urls where url_hash in ({placeholders})", chunk):
+                found[hashes[row["url_hash"]]] = row
+        return found
+
+    def _save(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        """upsert_job without the transaction, so batches can share one."""
+        fingerprint = self._generate_fingerprint(job_data.get("company", ""), job_data.get("job_title", ""))
+        new_locs, new_platforms, new_urls = self._list_fields(job_data)
+
+        merge_columns = self._select_list(MERGE_COLUMNS)
+        existing = self._select(f"select {merge_columns} from job_postings where fingerprint = ?", (fingerprint,))
+        record = existing[0] if existing else None
+        if record is None and new_urls:
+            owners = self._lookup_urls(new_urls)
+            if owners:
+                owned = self._select(f"select {merge_columns} from job_postings where id = ?", (next(iter(owners.values()))["job_id"],))
+                record = owned[0] if owned else None
+        signature = self._signature(job_data)
+        if record is None and signature:
+            duplicate_id = self._find_near_duplicates([(job_data.get("company", ""), signature)])[0]
+            if duplicate_id:
+                owned = self._select(f"select {merge_columns} from job_postings where id = ?", (duplicate_id,))
+                record = owned[0] if owned else None
+
+        if record:
+            payload = self._merge_payload(record, job_data, new_locs, new_platforms, new_urls)
+            if signature:
+                payload["minhash"] = signature
+            payload = self._to_row(payload)
+            assignments = ", ".join(f"{column} = :{column}" for column in payload)
+            self.conn.execute(f"update job_postings set {assignments} where id = :id", {**payload, "id": record["id"]})
+            job_id = record["id"]
+        else:
+            # UTC, like the server-side now() on Supabase, so updated_at watermarks compare across writers
+            now = datetime.now(timezone.utc).isoformat()
+            payload = self._insert_payload(fingerprint, job_data, new_locs, new_platforms, new_urls)
+            payload.update({"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, "minhash": signature})
+            payload = self._to_row(payload)
+            columns = ", ".join(payload)
+            values = ", ".join(f":{column}" for column in payload)
+            self.conn.execute(f"insert into job_postings ({columns}) values ({values})", payload)
+            job_id = payload["id"]
+
+        saved = self._select(f"select {self._select_list(JOB_COLUMNS)} from job_postings where id = ?", (job_id,))[0]
+        # A URL keeps pointing at the job that first claimed it
+        self.conn.executemany(
+            "insert or ignore into job_urls (url_hash, url, job_id) values (?, ?, ?)",
+            [(self._url_hash(url), url, job_id) for url in saved["source_urls"]],
+        )
+        if signature:
+            self._save_lsh_buckets([(job_id, signature)])
+        return saved
+
+    def _lsh_candidates(self, keys: List[str]) -> List[Dict[str, Any]]:
+        found = {}
+        for i in range(0, len(keys), SQLITE_CHUNK_SIZE):
+            chunk = keys[i:i + SQLITE_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self._select(
+                "select distinct p.id, p.company, p.minhash from job_lsh_buckets b "
+                f"join job_postings p on p.id = b.job_id where b.bucket in ({placeholders})", chunk
+            ):
+                found[row["id"]] = row
+        return list(found.values())
+
+    def _save_lsh_buckets(self, signatures: List[tuple]):
+        """Writes within the caller's transaction (upsert or save_minhashes), which commits it."""
+        _, lsh = near_duplicate_tools()
+        with self._lock:
+            self.conn.executemany(
+                "insert or ignore into job_lsh_buckets (bucket, job_id) values (?, ?)",
+                [(key, job_id) for job_id, signature in signatures for key in lsh.keys(signature)],
+            )
+
+    def save_minhashes(self, signatures: List[tuple]):
+        with self._lock, self.conn:
+            self.conn.executemany("update job_postings set minhash = ? where id = ?",
+                                  [(json.dumps(signature), job_id) for job_id, signature in signatures])
+            self._save_lsh_buckets(signatures)
+
+    def merge_duplicate_jobs(self, canonical_id: str, duplicate_ids: List[str]) -> Dict[str, Any]:
+        ids = [canonical_id] + list(duplicate_ids)
+        placeholders = ",".join("?" * len(ids))
+        with self._lock, self.conn:
+            rows = {row["id"]: row for row in self._select(
+                f"select {self._select_list(CLUSTER_COLUMNS)} from job_postings where id in ({placeholders})", ids)}
+            payload = self._cluster_payload(rows[canonical_id], [rows[job_id] for job_id in duplicate_ids if job_id in rows])
+            payload = self._to_row(payload)
+            assignments = ", ".join(f"{column} = :{column}" for column in payload)
+            self.conn.execute(f"update job_postings set {assignments} where id = :id", {**payload, "id": canonical_id})
+            self.conn.execute(f"delete from job_postings where id in ({','.join('?' * len(duplicate_ids))})", list(duplicate_ids))
+            # Deleting cascades to job_urls; register the moved URLs under the canonical job
+            self.conn.executemany(
+                "insert or ignore into job_urls (url_hash, url, job_id) values (?, ?, ?)",
+                [(self._url_hash(url), url, canonical_id) for url in json.loads(payload["source_urls"])],
+            )
+        self._forget_similar_jobs(list(duplicate_ids))
+        rows = self._select(f"select {self._select_list(JOB_COLUMNS)} from job_postings where id = ?", (canonical_id,))
+        return rows[0] if rows else {}
+
+    def upsert_job(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock, self.conn:
+            return self._save(job_data)
+
+    def upsert_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Saves a batch in one transaction; jobs sharing a fingerprint come back as one row."""
+        saved: Dict[str, Dict[str, Any]] = {}
+        with self._lock, self.conn:
+            for job_data in jobs:
+                record = self._save(job_data)
+                saved[record["id"]] = record
+        return list(saved.values())
+
+    def get_job_by_fingerprint(self, company: str, title: str, columns: Sequence[str] = JOB_COLUMNS) -> Optional[Dict[str, Any]]:
+        rows = self._select(f"select {self._select_list(columns)} from job_postings where fingerprint = ?",
+                            (self._generate_fingerprint(company, title),))
+        return rows[0] if rows else None
+
+    def check_existing_urls(self, urls: List[str]) -> List[str]:
+        if not urls:
+            return []
+        return list(self._lookup_urls(urls))
+
+    def update_llm_analysis(self, job_id: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        payload = self._analysis_payload(json.dumps(analysis) if analysis is not None else None)
+        if analysis is None:
+            payload["processing_status"] = PENDING
+        return self._update(job_id, payload)
+
+    def update_llm_analyses(self, updates: List[Tuple[str, Dict[str, Any]]]) -> int:
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "update job_postings set llm_analysis = ?, processing_status = 'done', last_error = null, "
+                "next_eligible_at = null, claimed_by = null, lease_expires_at = null where id = ?",
+                [(json.dumps(analysis), job_id) for job_id, analysis in updates],
+            )
+        return len(updates)
+
+    def _update(self, job_id: str, payload: Dict[str, Any], columns: Sequence[str] = JOB_COLUMNS) -> Dict[str, Any]:
+        assignments = ", ".join(f"{column} = :{column}" for column in payload)
+        with self._lock, self.conn:
+            self.conn.execute(f"update job_postings set {assignments} where id = :id", {**payload, "id": job_id})
+        rows = self._select(f"select {self._select_list(columns)} from job_postings where id = ?", (job_id,))
+        return rows[0] if rows else {}
+
+    def record_analysis_failure(self, job_id: str, error: str, retryable: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            with self.conn:
+                # Take the write lock before reading, so another process can't interleave its increment
+                self.conn.execute("begin immediate")
+                row = self.conn.execute(
+                    "select attempts from job_postings where id = ? and llm_analysis is null", (job_id,)).fetchone()
+                if row is None:
+                    return {}
+                payload = self._failure_payload(row["attempts"] + 1, error, retryable)
+                assignments = ", ".join(f"{column} = :{column}" for column in payload)
+                self.conn.execute(f"update job_postings set {assignments} where id = :id", {**payload, "id": job_id})
+            rows = self._select(f"select {self._select_list(('id',) + PROCESSING_COLUMNS)} from job_postings where id = ?",
+                                (job_id,))
+            return rows[0] if rows else {}
+
+    def get_dead_letter_jobs(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return self._select(
+            f"select {', '.join(DEAD_LETTER_COLUMNS)} from job_processing_dead_letter order by created_at desc limit ?", (limit,)
+        )
+
+    def requeue_jobs(self, job_ids: List[str]) -> int:
+        requeued = 0
+        with self._lock, self.conn:
+            for i in range(0, len(job_ids), SQLITE_CHUNK_SIZE):
+                chunk = job_ids[i:i + SQLITE_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                requeued += self.conn.execute(
+                    "update job_postings set processing_status = 'pending', attempts = 0, last_error = null, "
+                    f"next_eligible_at = null, claimed_by = null, lease_expires_at = null where id in ({placeholders})", chunk,
+                ).rowcount
+        return requeued
+
+    def get_all_jobs(self, limit: int = 100, columns: Sequence[str] = JOB_COLUMNS) -> List[Dict[str, Any]]:
+        return self._select(f"select {self._select_list(columns)} from job_postings order by created_at desc, id desc limit ?", (limit,))
+
+    def iter_jobs(self, columns: Sequence[str] = JOB_COLUMNS, page_size: int = ITER_PAGE_SIZE,
+                  updated_since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        selected = self._select_list(list(dict.fromkeys(list(columns) + ["created_at", "id"])))
+        since = "updated_at >= ? and " if updated_since is not None else ""
+        since_params = (updated_since,) if updated_since is not None else ()
+        rows = self._select(f"select {selected} from job_postings where {since}1 order by created_at, id limit ?",
+                            since_params + (page_size,))
+        while rows:
+            yield from rows
+            if len(rows) < page_size:
+                return
+            # The lock is released between pages, so writers are never held up by a long export
+            rows = self._select(
+                f"select {selected} from job_postings where {since}(created_at, id) > (?, ?) order by created_at, id limit ?",
+                since_params + (rows[-1]["created_at"], rows[-1]["id"], page_size),
+            )
+
+    def get_unanalyzed_jobs(self, limit: int, columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        return self._select(
+            f"select {self._select_list(columns)} from job_postings where {DUE_FOR_ANALYSIS} order by created_at limit :limit",
+            {"now": datetime.now(timezone.utc).isoformat(), "limit": limit},
+        )
+
+    def claim_jobs(self, worker_id: str, limit: int, lease_seconds: Optional[int] = None,
+                   columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        # A single UPDATE ... RETURNING holds the database write lock throughout,
+        # so concurrent claims, from threads or other processes, never overlap.
+        # Times are UTC, like next_eligible_at, whatever the host timezone.
+        now = datetime.now(timezone.utc)
+        if lease_seconds is None:
+            lease_seconds = PROCESSOR_SETTINGS['lease_seconds']
+        expires = now + timedelta(seconds=lease_seconds)
+        with self._lock, self.conn:
+            rows = self.conn.execute(
+                "update job_postings set claimed_by = :worker, lease_expires_at = :expires where id in ("
+                f"select id from job_postings where {DUE_FOR_ANALYSIS} "
+                "and (lease_expires_at is null or lease_expires_at <= :now) order by created_at limit :limit"
+                f") returning {self._select_list(columns)}",
+                {"worker": worker_id, "expires": expires.isoformat(), "now": now.isoformat(), "limit": limit},
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def claim_jobs_by_id(self, worker_id: str, job_ids: List[str], lease_seconds: Optional[int] = None,
+                         columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        if lease_seconds is None:
+            lease_seconds = PROCESSOR_SETTINGS['lease_seconds']
+        params = {"worker": worker_id, "expires": (now + timedelta(seconds=lease_seconds)).isoformat(),
+                  "now": now.isoformat()}
+        claimed = []
+        with self._lock, self.conn:
+            for i in range(0, len(job_ids), SQLITE_CHUNK_SIZE):
+                chunk = {f"id{j}": job_id for j, job_id in enumerate(job_ids[i:i + SQLITE_CHUNK_SIZE])}
+                placeholders = ",".join(f":{name}" for name in chunk)
+                claimed += self.conn.execute(
+                    "update job_postings set claimed_by = :worker, lease_expires_at = :expires "
+                    f"where id in ({placeholders}) and {DUE_FOR_ANALYSIS} "
+                    "and (claimed_by is null or claimed_by = :worker or lease_expires_at <= :now) "
+                    f"returning {self._select_list(columns)}",
+                    {**params, **chunk},
+                ).fetchall()
+        return [self._to_dict(row) for row in claimed]
+
+    def release_jobs(self, worker_id: str, job_ids: List[str]) -> int:
+        released = 0
+        with self._lock, self.conn:
+            for i in range(0, len(job_ids), SQLITE_CHUNK_SIZE):
+                chunk = job_ids[i:i + SQLITE_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                released += self.conn.execute(
+                    "update job_postings set claimed_by = null, lease_expires_at = null "
+                    f"where claimed_by = ? and id in ({placeholders})", [worker_id] + chunk,
+                ).rowcount
+        return released
+
+    def get_crawl_state(self, platform: str, term: str) -> Optional[Dict[str, Any]]:
+        rows = self._select("select * from crawl_state where platform = ? and term = ?", (platform, term))
+        return rows[0] if rows else None
+
+    def save_crawl_state(self, platform: str, term: str, newest_listing_id: Optional[int], last_success_at: str) -> Dict[str, Any]:
+        payload = {
+            "platform": platform,
+            "term": term,
+            "newest_listing_id": newest_listing_id,
+            "last_success_at": last_success_at,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+        with self._lock, self.conn:
+            self.conn.execute(
+                "insert into crawl_state (platform, term, newest_listing_id, last_success_at, updated_at) "
+                "values (:platform, :term, :newest_listing_id, :last_success_at, :updated_at) "
+                "on conflict (platform, term) do update set newest_listing_id = excluded.newest_listing_id, "
+                "last_success_at = excluded.last_success_at, updated_at = excluded.updated_at",
+                payload,
+            )
+        return payload
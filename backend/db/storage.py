@@ -0,0 +1,451 @@
+import hashlib
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+from config import EMBEDDING_SETTINGS, NEAR_DUPLICATE_SETTINGS, PROCESSOR_SETTINGS, STORAGE_SETTINGS
+from db.near_duplicates import MinHasher, LSHIndex, best_match, similarity, normalize_company
+
+# Column sets for projected reads. The embedding column is never read back, and
+# llm_analysis only where it is needed.
+JOB_COLUMNS = (
+    "id", "fingerprint", "job_title", "company", "locations", "platforms", "source_urls",
+    "description", "salary", "seniority", "posted_at", "job_type", "llm_analysis",
+    "created_at", "updated_at",
+)
+# What the merge rules read from an existing row
+MERGE_COLUMNS = tuple(c for c in JOB_COLUMNS if c != "llm_analysis") + ("processing_status",)
+# What merge_duplicate_jobs reads from each job in a cluster
+CLUSTER_COLUMNS = ("id", "locations", "platforms", "source_urls", "description", "llm_analysis",
+                   "processing_status", "attempts", "last_error", "next_eligible_at")
+# What the analyzer needs for an unanalyzed job
+ANALYSIS_COLUMNS = ("id", "job_title", "description")
+# Listing metadata without the large text/JSON fields
+SUMMARY_COLUMNS = tuple(c for c in JOB_COLUMNS if c not in ("description", "llm_analysis"))
+
+# Internal columns that can be selected explicitly but are never read by default
+INDEX_COLUMNS = ("minhash",)
+
+# LLM analysis processing state: pending -> done, or retry (backing off) -> dead.
+# A processor instance leases the jobs it works on with claimed_by/lease_expires_at.
+PROCESSING_COLUMNS = ("processing_status", "attempts", "last_error", "next_eligible_at", "claimed_by", "lease_expires_at")
+PENDING, RETRY, DONE, DEAD = "pending", "retry", "done", "dead"
+# What the dead-letter view shows
+DEAD_LETTER_COLUMNS = ("id", "job_title", "company", "attempts", "last_error", "created_at")
+
+# Rows per page when streaming the table with iter_jobs
+ITER_PAGE_SIZE = 500
+
+_minhasher: Optional[MinHasher] = None
+
+
+def default_worker_id() -> str:
+    """Identifies this processor instance in job claims: PROCESSOR_SETTINGS['worker_id'], or host:pid."""
+    return PROCESSOR_SETTINGS['worker_id'] or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def near_duplicate_tools() -> Tuple[MinHasher, LSHIndex]:
+    """The MinHasher (shared) and a fresh LSHIndex configured by NEAR_DUPLICATE_SETTINGS."""
+    global _minhasher
+    settings = NEAR_DUPLICATE_SETTINGS
+    if _minhasher is None:
+        _minhasher = MinHasher(num_perm=settings['bands'] * settings['rows'], shingle_size=settings['shingle_size'])
+    return _minhasher, LSHIndex(bands=settings['bands'], rows=settings['rows'])
+
+
+class JobStorage:
+    """
+    Interface shared by the job storage backends (Supabase, SQLite).
+    Also holds the fingerprint and merge rules so every backend deduplicates the same way.
+    """
+    # Optional local index of stored URLs/fingerprints (see JobDatabase.load_seen_index)
+    seen_index = None
+
+    @staticmethod
+    def _generate_fingerprint(company: str, title: str) -> str:
+        """Generates a simple fingerprint for deduplication."""
+        # Normalize: lowercase, strip whitespace
+        c = (company or "").lower().strip()
+        t = (title or "").lower().strip()
+        return f"{c}|{t}"
+
+    @staticmethod
+    def _select_list(columns: Sequence[str]) -> str:
+        """Joins a column set for a select, rejecting anything that isn't a job_postings column."""
+        unknown = [c for c in columns if c not in JOB_COLUMNS and c not in INDEX_COLUMNS and c not in PROCESSING_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown job_postings columns: {unknown}")
+        return ", ".join(columns)
+
+    @staticmethod
+    def _url_hash(url: str) -> str:
+        """SHA-256 hex digest of a URL, matching encode(sha256(convert_to(url, 'UTF8')), 'hex') in Postgres."""
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _list_fields(job_data: Dict[str, Any]):
+        """Returns (locations, platforms, source_urls) as lists, accepting legacy single fields."""
+        # Prepare list fields (ensure they are lists)
+        new_locs = job_data.get("locations", [])
+        if isinstance(new_locs, str): new_locs = [new_locs]
+        
+        new_platforms = job_data.get("platforms", [])
+        if isinstance(new_platforms, str): new_platforms = [new_platforms]
+        
+        new_urls = job_data.get("source_urls", [])
+        if isinstance(new_urls, str): new_urls = [new_urls]
+        
+        # Handle legacy single fields if passed
+        if "location" in job_data and not new_locs:
+            new_locs = [job_data["location"]]
+        if "platform" in job_data and not new_platforms:
+            new_platforms = [job_data["platform"]]
+        if "source_url" in job_data and not new_urls:
+            new_urls = [job_data["source_url"]]
+            
+        return new_locs, new_platforms, new_urls
+
+    @staticmethod
+    def _merge_payload(record: Dict[str, Any], job_data: Dict[str, Any], new_locs: list, new_platforms: list, new_urls: list) -> Dict[str, Any]:
+        """
+        Builds the update for an existing record that the new job duplicates.
+        A retry or dead job whose description changed gets a fresh start, since
+        its failures were against the old text.
+        """
+        payload = {
+            # Merge lists and remove duplicates
+            "locations": list(set(record.get('locations', []) + new_locs)),
+            "platforms": list(set(record.get('platforms', []) + new_platforms)),
+            "source_urls": list(set(record.get('source_urls', []) + new_urls)),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            # Update other fields if the new one is "fresher" or just overwrite
+            "description": job_data.get("description", record.get("description")),
+            "salary": job_data.get("salary", record.get("salary")),
+            "seniority": job_data.get("seniority", record.get("seniority")),
+            "posted_at": job_data.get("posted_at", record.get("posted_at")),
+            "job_type": job_data.get("job_type", record.get("job_type"))
+        }
+        if record.get("processing_status") in (RETRY, DEAD) and payload["description"] != record.get("description"):
+            payload.update({"processing_status": PENDING, "attempts": 0, "last_error": None, "next_eligible_at": None})
+        return payload
+
+    @staticmethod
+    def _cluster_payload(canonical: Dict[str, Any], duplicates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Builds the update folding duplicates (oldest first) into the canonical job.
+        List fields are unioned; a description or LLM analysis the canonical job lacks
+        comes from the first duplicate that has one, with its processing state, so a
+        merge never throws away a paid analysis.
+        """
+        rows = [canonical] + duplicates
+        payload = {"updated_at": datetime.now(timezone.utc).isoformat()}
+        for field in ("locations", "platforms", "source_urls"):
+            payload[field] = list(set(sum((row.get(field) or [] for row in rows), [])))
+        if not canonical.get("description"):
+            donor = next((row for row in duplicates if row.get("description")), None)
+            if donor:
+                payload["description"] = donor["description"]
+        if canonical.get("llm_analysis") is None:
+            donor = next((row for row in duplicates if row.get("llm_analysis") is not None), None)
+            if donor:
+                payload["llm_analysis"] = donor["llm_analysis"]
+                payload.update((column, donor.get(column)) for column in ("processing_status", "attempts", "last_error", "next_eligible_at"))
+        return payload
+
+    @staticmethod
+    def _insert_payload(fingerprint: str, job_data: Dict[str, Any], new_locs: list, new_platforms: list, new_urls: list) -> Dict[str, Any]:
+        return {
+            "fingerprint": fingerprint,
+            "job_title": job_data.get("job_title", ""),
+            "company": job_data.get("company", ""),
+            "locations": new_locs,
+            "platforms": new_platforms,
+            "source_urls": new_urls,
+            "description": job_data.get("description"),
+            "salary": job_data.get("salary"),
+            "seniority": job_data.get("seniority"),
+            "posted_at": job_data.get("posted_at"),
+            "job_type": job_data.get("job_type"),
+            "llm_analysis": job_data.get("llm_analysis")
+        }
+
+    @staticmethod
+    def _fold(prev: Dict[str, Any], job_data: Dict[str, Any], new_locs: list, new_platforms: list, new_urls: list):
+        """Folds a job into a pending batch item, as consecutive upsert_job calls would merge them."""
+        merged = {**prev["job"], **job_data}
+        merged["company"], merged["job_title"] = prev["job"].get("company", ""), prev["job"].get("job_title", "")
+        prev["job"] = merged
+        prev["locations"] = list(set(prev["locations"] + new_locs))
+        prev["platforms"] = list(set(prev["platforms"] + new_platforms))
+        prev["source_urls"] = list(set(prev["source_urls"] + new_urls))
+
+    @staticmethod
+    def _failure_payload(attempts: int, error: str, retryable: bool = True) -> Dict[str, Any]:
+        """
+        Processing state after a failed analysis, `attempts` counting this one.
+        A retryable failure waits retry_base_delay * 2^(attempts - 1) seconds (capped
+        at retry_max_delay); a permanent one, or the max_attempts-th, is dead-lettered.
+        """
+        settings = PROCESSOR_SETTINGS
+        if not retryable or attempts >= settings['max_attempts']:
+            status, next_eligible_at = DEAD, None
+        else:
+            delay = min(settings['retry_max_delay'], settings['retry_base_delay'] * 2 ** (attempts - 1))
+            # UTC with its offset: Postgres compares it against now() in a timestamptz column
+            status, next_eligible_at = RETRY, (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat()
+        return {
+            "processing_status": status,
+            "attempts": attempts,
+            "last_error": (error or "")[:1000],
+            "next_eligible_at": next_eligible_at,
+            "claimed_by": None,
+            "lease_expires_at": None,
+        }
+
+    @staticmethod
+    def _analysis_payload(analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Stores an analysis, marks the job done and releases its lease."""
+        return {
+            "llm_analysis": analysis,
+            "processing_status": DONE,
+            "last_error": None,
+            "next_eligible_at": None,
+            "claimed_by": None,
+            "lease_expires_at": None,
+        }
+
+    @staticmethod
+    def _signature(job_data: Dict[str, Any]) -> Optional[List[int]]:
+        """MinHash signature of the job description, or None when near-duplicate detection is off."""
+        if not NEAR_DUPLICATE_SETTINGS['enabled']:
+            return None
+        hasher, _ = near_duplicate_tools()
+        signature = hasher.signature(job_data.get("description") or "")
+        return signature.tolist() if signature is not None else None
+
+    def _find_near_duplicates(self, items: List[Tuple[str, List[int]]]) -> List[Optional[str]]:
+        """
+        For each (company, signature) returns the id of the stored job it nearly
+        duplicates, or None. All LSH buckets are looked up in one go.
+        """
+        if not items:
+            return []
+        _, lsh = near_duplicate_tools()
+        keys_per_item = [lsh.keys(signature) for _, signature in items]
+        try:
+            candidates = self._lsh_candidates(sorted({key for keys in keys_per_item for key in keys}))
+        except Exception as e:
+            print(f"Error looking up near-duplicate candidates: {e}")
+            return [None] * len(items)
+        
+        matches = []
+        for company, signature in items:
+            match = best_match(signature, company, candidates, NEAR_DUPLICATE_SETTINGS['threshold'],
+                               NEAR_DUPLICATE_SETTINGS['same_company'])
+            matches.append(match["id"] if match else None)
+        return matches
+
+    def _fold_near_duplicates(self, pending: Dict[str, Dict[str, Any]], fingerprints: List[str]) -> List[str]:
+        """
+        Folds near-duplicates inside a batch into the first of them.
+        Returns the fingerprints that are left.
+        """
+        _, lsh = near_duplicate_tools()
+        kept = []
+        for fingerprint in fingerprints:
+            item = pending[fingerprint]
+            signature = item["minhash"]
+            match = next((
+                other for other in lsh.candidates(signature)
+                if (not NEAR_DUPLICATE_SETTINGS['same_company']
+                    or normalize_company(pending[other]["job"].get("company")) == normalize_company(item["job"].get("company")))
+                and similarity(signature, pending[other]["minhash"]) >= NEAR_DUPLICATE_SETTINGS['threshold']
+            ), None)
+            if match:
+                self._fold(pending[match], item["job"], item["locations"], item["platforms"], item["source_urls"])
+                del pending[fingerprint]
+            else:
+                lsh.add(fingerprint, signature)
+                kept.append(fingerprint)
+        return kept
+
+    def _lsh_candidates(self, keys: List[str]) -> List[Dict[str, Any]]:
+        """Returns {id, company, minhash} for jobs in any of the LSH buckets."""
+        raise NotImplementedError
+
+    def _save_lsh_buckets(self, signatures: List[Tuple[str, List[int]]]):
+        """Registers (job_id, signature) pairs in the persisted LSH buckets."""
+        raise NotImplementedError
+
+    def save_minhashes(self, signatures: List[Tuple[str, List[int]]]):
+        """Stores signatures for existing jobs (and their LSH buckets), e.g. when backfilling."""
+        raise NotImplementedError
+
+    def merge_duplicate_jobs(self, canonical_id: str, duplicate_ids: List[str]) -> Dict[str, Any]:
+        """
+        Merges duplicate jobs into the canonical one (see _cluster_payload) and deletes the duplicates.
+        """
+        raise NotImplementedError
+
+    def upsert_job(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Inserts a job, or merges it into the stored job with the same fingerprint or URL."""
+        raise NotImplementedError
+
+    def upsert_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Batched upsert_job with the same merge semantics."""
+        raise NotImplementedError
+
+    def get_job_by_fingerprint(self, company: str, title: str, columns: Sequence[str] = JOB_COLUMNS) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def check_existing_urls(self, urls: List[str]) -> List[str]:
+        """Returns the URLs that are already stored."""
+        raise NotImplementedError
+
+    def update_llm_analysis(self, job_id: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Stores a job's analysis, marks it done and releases any lease on it."""
+        raise NotImplementedError
+
+    def record_analysis_failure(self, job_id: str, error: str, retryable: bool = True) -> Dict[str, Any]:
+        """
+        Counts a failed analysis of a job: it is retried after a backoff, or
+        dead-lettered once it is out of attempts (or straight away if not retryable).
+        Releases any lease on the job. Ignored once the job has an analysis, so a
+        worker whose lease lapsed can't undo another worker's result.
+        """
+        raise NotImplementedError
+
+    def get_dead_letter_jobs(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Returns jobs the processor gave up on, with their last error."""
+        raise NotImplementedError
+
+    def requeue_jobs(self, job_ids: List[str]) -> int:
+        """Resets failed or dead jobs to pending with no attempts. Returns how many were reset."""
+        raise NotImplementedError
+
+    def update_llm_analyses(self, updates: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Writes many (job id, analysis) pairs. Returns how many were written."""
+        for job_id, analysis in updates:
+            self.update_llm_analysis(job_id, analysis)
+        return len(updates)
+
+    def get_all_jobs(self, limit: int = 100, columns: Sequence[str] = JOB_COLUMNS) -> List[Dict[str, Any]]:
+        """Returns the most recent jobs."""
+        raise NotImplementedError
+
+    def iter_jobs(self, columns: Sequence[str] = JOB_COLUMNS, page_size: int = ITER_PAGE_SIZE,
+                  updated_since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streams every job, oldest first, one page in memory at a time.
+        Pages are keyed on (created_at, id) rather than offsets, so each page
+        is an index seek no matter how deep into the table it is.
+        With updated_since, only jobs updated at or after that timestamp are returned.
+        """
+        raise NotImplementedError
+
+    def similar_jobs_index(self):
+        """
+        The in-process SimilarJobIndex for this storage, built on first use.
+        A background thread syncs it every EMBEDDING_SETTINGS['sync_interval'] seconds
+        (from scratch every 'rebuild_interval'), so queries never wait on the database.
+        """
+        from analyzers.embeddings import create_embedder
+        from db.vector_index import EmbeddingCache, SimilarJobIndex
+
+        index = getattr(self, "_similar_jobs", None)
+        if index is None:
+            index = SimilarJobIndex(
+                self,
+                create_embedder(EMBEDDING_SETTINGS),
+                EmbeddingCache(EMBEDDING_SETTINGS['cache_path']),
+                batch_size=EMBEDDING_SETTINGS['batch_size'],
+            )
+            self._similar_jobs = index
+            index.start(EMBEDDING_SETTINGS['sync_interval'], EMBEDDING_SETTINGS['rebuild_interval'])
+        return index
+
+    def _forget_similar_jobs(self, job_ids: List[str]):
+        """Drops deleted jobs from this process's similar-jobs index, if one is running."""
+        index = getattr(self, "_similar_jobs", None)
+        if index is not None:
+            index.remove(job_ids)
+
+    def search_similar_jobs(self, embedding: List[float], threshold: float = 0.7, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Finds the jobs whose description embeddings are most similar (cosine) to `embedding`.
+        Answered from the local vector index; the embedding must come from the
+        configured embedder (see similar_jobs_index().search_text for text queries).
+        """
+        return self.similar_jobs_index().search(embedding, threshold, limit)
+
+    def get_unanalyzed_jobs(self, limit: int, columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` jobs that have no LLM analysis yet and are due:
+        pending, or in retry with their backoff elapsed. Oldest first.
+        This is a read-only peek: processors share the backlog through claim_jobs.
+        """
+        raise NotImplementedError
+
+    def claim_jobs(self, worker_id: str, limit: int, lease_seconds: Optional[int] = None,
+                   columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        """
+        Atomically leases up to `limit` due jobs (see get_unanalyzed_jobs) to
+        `worker_id` for `lease_seconds` (default PROCESSOR_SETTINGS['lease_seconds']).
+        Jobs leased by another worker are skipped until the lease expires, after
+        which they can be claimed again. Storing the analysis or recording a
+        failure releases the lease.
+        """
+        raise NotImplementedError
+
+    def claim_jobs_by_id(self, worker_id: str, job_ids: List[str], lease_seconds: Optional[int] = None,
+                         columns: Sequence[str] = ANALYSIS_COLUMNS) -> List[Dict[str, Any]]:
+        """
+        Leases the given jobs to `worker_id`, like claim_jobs, skipping any that are
+        not due or are leased by another worker. Returns the jobs now leased.
+        """
+        raise NotImplementedError
+
+    def release_jobs(self, worker_id: str, job_ids: List[str]) -> int:
+        """Gives up `worker_id`'s leases on jobs it won't process. Returns how many were released."""
+        raise NotImplementedError
+
+    def get_crawl_state(self, platform: str, term: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def save_crawl_state(self, platform: str, term: str, newest_listing_id: Optional[int], last_success_at: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def load_seen_index(self):
+        """Preloads a local dedup index. Backends whose lookups are already local skip this."""
+        return None
+
+
+def storage_backend(backend: Optional[str] = None) -> str:
+    return (backend or os.environ.get("JOB_STORAGE") or STORAGE_SETTINGS['backend']).lower()
+
+
+def create_storage(backend: Optional[str] = None) -> JobStorage:
+    """
+    Returns the configured storage backend: "supabase" (default) or "sqlite".
+    """
+    backend = storage_backend(backend)
+    if backend == "sqlite":
+        from db.sqlite_database import SQLiteJobDatabase
+        return SQLiteJobDatabase(os.environ.get("JOB_STORAGE_PATH") or STORAGE_SETTINGS['sqlite_path'])
+    if backend == "supabase":
+        from db.database import JobDatabase
+        return JobDatabase()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+async def create_async_storage(backend: Optional[str] = None, max_connections: int = 10, storage: Optional[JobStorage] = None):
+    """
+    Async counterpart of create_storage for the processor and pipeline.
+    Supabase gets the pooled AsyncJobDatabase; other backends are wrapped in
+    AsyncStorageAdapter (reusing `storage` when given, e.g. the scraper's).
+    """
+    from db.async_database import AsyncJobDatabase, AsyncStorageAdapter
+    backend = storage_backend(backend)
+    if backend == "supabase":
+        return await AsyncJobDatabase.create(max_connections=max_connections)
+    return AsyncStorageAdapter(storage if storage is not None else create_storage(backend))
@@ -0,0 +1,253 @@
+import hashlib
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger("VectorIndex")
+
+
+class VectorIndex:
+    """
+    In-memory brute-force cosine index over L2-normalized float32 vectors.
+    One matrix-vector product scores every job; argpartition picks the top k
+    without sorting the whole array. The matrix grows by doubling, so
+    incremental adds are amortized O(1).
+    """
+    def __init__(self, dimensions: int, capacity: int = 1024):
+        self.dimensions = dimensions
+        self.matrix = np.zeros((capacity, dimensions), dtype=np.float32)
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.rows: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _grow(self, needed: int):
+        if needed <= len(self.matrix):
+            return
+        capacity = max(needed, len(self.matrix) * 2)
+        matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        matrix[:len(self.ids)] = self.matrix[:len(self.ids)]
+        self.matrix = matrix
+
+    def upsert(self, ids: Sequence[str], vectors: np.ndarray, metadata: Optional[Sequence[Dict[str, Any]]] = None):
+        """Adds vectors, replacing the vector (and metadata) of ids already indexed."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dimensions)
+        self._grow(len(self.ids) + len(ids))
+        for i, item_id in enumerate(ids):
+            meta = metadata[i] if metadata is not None else {}
+            row = self.rows.get(item_id)
+            if row is None:
+                row = len(self.ids)
+                self.rows[item_id] = row
+                self.ids.append(item_id)
+                self.metadata.append(meta)
+            else:
+                self.metadata[row] = meta
+            self.matrix[row] = vectors[i]
+
+    def remove(self, ids: Iterable[str]):
+        """Removes ids by moving the last row into each freed slot."""
+        for item_id in ids:
+            row = self.rows.pop(item_id, None)
+            if row is None:
+                continue
+            last = len(self.ids) - 1
+            if row != last:
+                self.matrix[row] = self.matrix[last]
+                self.ids[row] = self.ids[last]
+                self.metadata[row] = self.metadata[last]
+                self.rows[self.ids[row]] = row
+            self.ids.pop()
+            self.metadata.pop()
+
+    def search(self, vector: Sequence[float], k: int = 5, threshold: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Returns up to k (id, cosine similarity) pairs, best first."""
+        size = len(self.ids)
+        if size == 0 or k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = self.matrix[:size] @ (query / norm)
+        if k < size:
+            top = np.argpartition(scores, size - k)[size - k:]
+        else:
+            top = np.arange(size)
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(self.ids[i], float(scores[i])) for i in top if threshold is None or scores[i] >= threshold]
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding store: sha256(model name + text) -> vector.
+    Unchanged descriptions are never re-embedded, even across runs, since
+    the cache is persisted to an .npz file.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.vectors: Dict[str, np.ndarray] = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            with np.load(path) as data:
+                self.vectors = dict(zip(data["keys"].tolist(), data["vectors"]))
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        return self.vectors.get(key)
+
+    def put(self, key: str, vector: np.ndarray):
+        self.vectors[key] = np.asarray(vector, dtype=np.float32)
+        self.dirty = True
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        keys = list(self.vectors)
+        vectors = np.stack([self.vectors[k] for k in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
+        tmp_path = f"{self.path}.tmp.npz"
+        np.savez(tmp_path, keys=np.array(keys), vectors=vectors)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+class SimilarJobIndex:
+    """
+    Keeps a VectorIndex of job embeddings in sync with a JobStorage.
+    sync() reads only jobs updated since the last sync, embeds the texts the
+    cache has not seen in batches, and updates the index in place.
+    Queries are answered in-process and never sync: start() runs sync() in a
+    background thread, and the storage calls remove() for the jobs it deletes.
+    """
+    SYNC_COLUMNS = ("job_title", "company", "description", "updated_at")
+
+    def __init__(self, storage, embedder, cache: Optional[EmbeddingCache] = None, batch_size: int = 64):
+        self.storage = storage
+        self.embedder = embedder
+        self.cache = cache or EmbeddingCache()
+        self.batch_size = batch_size
+        self.index = VectorIndex(embedder.dimensions)
+        self.synced_until: Optional[str] = None
+        self.last_sync: Optional[float] = None
+        self.stats = {"embedded": 0, "cached": 0}
+        # Ids are never reused, so a deleted job is kept out even if a sync read it before the delete
+        self.deleted = set()
+        self.synced = threading.Event()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def job_text(job: Dict[str, Any]) -> str:
+        return f"{job.get('job_title') or ''}\n{job.get('description') or ''}"
+
+    def _flush(self, index: VectorIndex, batch: List[Tuple[Dict[str, Any], str]]):
+        missing = [(job, key) for job, key in batch if self.cache.get(key) is None]
+        if missing:
+            vectors = self.embedder.embed([self.job_text(job) for job, _ in missing])
+            for (_, key), vector in zip(missing, vectors):
+                self.cache.put(key, vector)
+        self.stats["embedded"] += len(missing)
+        self.stats["cached"] += len(batch) - len(missing)
+        with self._lock:
+            batch = [(job, key) for job, key in batch if job["id"] not in self.deleted]
+            if batch:
+                index.upsert(
+                    [job["id"] for job, _ in batch],
+                    np.stack([self.cache.get(key) for _, key in batch]),
+                    [{"job_title": job.get("job_title"), "company": job.get("company")} for job, _ in batch],
+                )
+
+    def remove(self, job_ids: Iterable[str]):
+        """Drops deleted jobs (e.g. merged duplicates) from the index."""
+        job_ids = list(job_ids)
+        with self._lock:
+            self.deleted.update(job_ids)
+            self.index.remove(job_ids)
+
+    def sync(self, full: bool = False) -> int:
+        """
+        Brings the index up to date and returns how many jobs were (re)indexed.
+        full=True rebuilds from scratch, which also drops jobs deleted by other processes;
+        queries keep using the old index until the new one is complete.
+        """
+        index = VectorIndex(self.embedder.dimensions) if full else self.index
+        since = None if full else self.synced_until
+        count = 0
+        batch: List[Tuple[Dict[str, Any], str]] = []
+        newest = since
+        for job in self.storage.iter_jobs(columns=self.SYNC_COLUMNS, updated_since=since):
+            if not job.get("description"):
+                continue
+            batch.append((job, EmbeddingCache.key(self.embedder.name, self.job_text(job))))
+            if newest is None or (job.get("updated_at") and job["updated_at"] > newest):
+                newest = job["updated_at"]
+            if len(batch) >= self.batch_size:
+                self._flush(index, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self._flush(index, batch)
+            count += len(batch)
+        with self._lock:
+            self.index = index
+        self.synced_until = newest
+        self.last_sync = time.monotonic()
+        self.synced.set()
+        self.cache.save()
+        logger.info(f"Synced {count} jobs into the vector index ({len(self.index)} total, {self.stats})")
+        return count
+
+    def start(self, interval: float, rebuild_interval: float):
+        """
+        Syncs in a daemon thread now and every `interval` seconds, rebuilding from
+        scratch every `rebuild_interval` seconds. Until the first sync finishes
+        (see `synced`), searches see an empty index.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sync_periodically, args=(interval, rebuild_interval),
+                                        name="SimilarJobIndexSync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background sync, waiting for a sync in progress to finish."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _sync_periodically(self, interval: float, rebuild_interval: float):
+        last_rebuild = time.monotonic()
+        while True:
+            full = time.monotonic() - last_rebuild >= rebuild_interval
+            try:
+                self.sync(full=full)
+                if full:
+                    last_rebuild = time.monotonic()
+            except Exception as e:
+                logger.error(f"Vector index sync failed: {e}")
+            if self._stop.wait(interval):
+                return
+
+    def search(self, embedding: Sequence[float], threshold: float = 0.7, limit: int = 5) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"id": job_id, "similarity": score, **self.index.metadata[self.index.rows[job_id]]}
+                for job_id, score in self.index.search(embedding, k=limit, threshold=threshold)
+            ]
+
+    def search_text(self, text: str, threshold: float = 0.7, limit: int = 5) -> List[Dict[str, Any]]:
+        return self.search(self.embedder.embed([text])[0], threshold, limit)
@@ -1,6 +1,7 @@
 import logging
 from typing import List, Dict, Any, Optional
-from db.database import JobDatabase
+from db.storage import JobStorage, create_storage
+from scrapers.job_buffer import JobBuffer
 
 # Configure logging
 logging.basicConfig(
@@ -9,10 +10,49 @@ logging.basicConfig(
 )
 
 class BaseScraper:
-    def __init__(self, platform_name: str):
+    def __init__(self, platform_name: str, db: Optional[JobStorage] = None):
         self.platform = platform_name
-        self.db = JobDatabase()
+        self.db = db if db is not None else create_storage()
         self.logger = logging.getLogger(f"Scraper-{platform_name}")
+        # Async callbacks awaited with each saved job (e.g. to feed the analysis pipeline)
+        self.saved_job_handlers = []
+        # Set while a scrape is running with batched saves enabled
+        self.buffer: Optional[JobBuffer] = None
+
+    async def notify_saved(self, saved_job: Dict[str, Any]):
+        """
+        Passes a saved job to every registered handler.
+        Handlers may block (e.g. on a full queue), which slows the scraper down.
+        A failing handler is logged; the job is still saved and the other handlers still run.
+        """
+        for handler in self.saved_job_handlers:
+            try:
+                await handler(saved_job)
+            except Exception as e:
+                self.logger.error(f"Saved-job handler failed for job {saved_job.get('id')}: {e}")
+
+    def _add_platform(self, job_data: Dict[str, Any]):
+        # Ensure platform is set
+        if "platforms" not in job_data:
+            job_data["platforms"] = [self.platform]
+        elif self.platform not in job_data["platforms"]:
+            job_data["platforms"].append(self.platform)
+
+    async def submit_job(self, job_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Saves a job, through the batch buffer when one is active.
+        Buffered jobs are written (and handlers notified) when the buffer flushes,
+        so the job data itself is returned as an acknowledgement.
+        """
+        if self.buffer:
+            self._add_platform(job_data)
+            await self.buffer.add(job_data)
+            return job_data
+        
+        saved_job = self.save_job(job_data)
+        if saved_job:
+            await self.notify_saved(saved_job)
+        return saved_job
 
     def save_job(self, job_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -20,11 +60,7 @@ class BaseScraper:
         Automatically adds the platform to the job data.
         """
         try:
-            # Ensure platform is set
-            if "platforms" not in job_data:
-                job_data["platforms"] = [self.platform]
-            elif self.platform not in job_data["platforms"]:
-                job_data["platforms"].append(self.platform)
+            self._add_platform(job_data)
                 
             result = self.db.upsert_job(job_data)
             title = job_data.get('job_title') or job_data.get('title')
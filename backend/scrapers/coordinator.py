@@ -0,0 +1,36 @@
+from typing import Dict, List
+
+
+class CrawlCoordinator:
+    """
+    Shared state for shards crawling search terms in parallel.
+    Hands out each job URL to exactly one shard and merges per-term results.
+    """
+    def __init__(self):
+        self.claimed_urls = set()
+        self.results: Dict[str, Dict[str, int]] = {}
+
+    def claim(self, urls: List[str]) -> List[str]:
+        """
+        Returns the URLs not yet claimed by any shard and marks them as claimed.
+        """
+        new_urls = []
+        for url in urls:
+            if url not in self.claimed_urls:
+                self.claimed_urls.add(url)
+                new_urls.append(url)
+        return new_urls
+
+    def record(self, term: str, found: int = 0, claimed: int = 0, saved: int = 0):
+        """Accumulates counters for a search term."""
+        stats = self.results.setdefault(term, {"found": 0, "claimed": 0, "saved": 0})
+        stats["found"] += found
+        stats["claimed"] += claimed
+        stats["saved"] += saved
+
+    def totals(self) -> Dict[str, int]:
+        totals = {"found": 0, "claimed": 0, "saved": 0}
+        for stats in self.results.values():
+            for key in totals:
+                totals[key] += stats[key]
+        return totals
@@ -0,0 +1,125 @@
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from scrapers.page_pool import PagePool
+from scrapers.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-AU,en;q=0.9",
+}
+
+
+class BaseFetcher:
+    """
+    Fetches the HTML of a page. Returns None when the page could not be loaded.
+    """
+    name = "base"
+
+    async def fetch(self, url: str) -> Optional[str]:
+        raise NotImplementedError("Subclasses must implement fetch()")
+
+    async def close(self):
+        pass
+
+
+class HttpFetcher(BaseFetcher):
+    """
+    Plain HTTP fetcher backed by a pooled keep-alive client (HTTP/2 where the server supports it).
+    """
+    name = "http"
+
+    def __init__(self, limiter: Optional[AdaptiveRateLimiter] = None, max_connections: int = 10,
+                 timeout: float = 15.0, client: Optional[httpx.AsyncClient] = None):
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.client = client or httpx.AsyncClient(
+            http2=True,
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def fetch(self, url: str) -> Optional[str]:
+        async with self.limiter.track(url) as outcome:
+            response = await self.client.get(url)
+            outcome.status = response.status_code
+            outcome.retry_after = parse_retry_after(response.headers.get("retry-after"))
+        if response.status_code != 200:
+            return None
+        return response.text
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class PlaywrightFetcher(BaseFetcher):
+    """
+    Renders the page in Chromium using a page borrowed from the pool.
+    """
+    name = "playwright"
+
+    def __init__(self, pool: PagePool, limiter: Optional[AdaptiveRateLimiter] = None):
+        self.pool = pool
+        self.limiter = limiter or AdaptiveRateLimiter()
+
+    async def fetch(self, url: str) -> Optional[str]:
+        async with self.pool.acquire() as page:
+            async with self.limiter.track(url) as outcome:
+                response = await page.goto(url, wait_until="domcontentloaded")
+                if response:
+                    outcome.status = response.status
+                    outcome.retry_after = parse_retry_after(response.headers.get("retry-after"))
+            if response and response.status >= 400:
+                return None
+            return await page.content()
+
+
+def has_markers(*markers: str) -> Callable[[str], bool]:
+    """
+    Builds a completeness check that passes when every marker appears in the HTML.
+    """
+    def check(html: str) -> bool:
+        return all(marker in html for marker in markers)
+    return check
+
+
+class FallbackFetcher(BaseFetcher):
+    """
+    Tries each engine in order and escalates to the next one when the fetch fails
+    or the returned HTML is missing required content.
+    Counts how many pages each engine served.
+    """
+    name = "fallback"
+
+    def __init__(self, engines: List[BaseFetcher], is_complete: Callable[[str], bool],
+                 served: Optional[Counter] = None, logger=None):
+        self.engines = engines
+        self.is_complete = is_complete
+        self.served = served if served is not None else Counter()
+        self.logger = logger
+
+    async def fetch(self, url: str) -> Optional[str]:
+        for engine in self.engines:
+            try:
+                html = await engine.fetch(url)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"{engine.name} fetch failed for {url}: {e}")
+                continue
+
+            if html and self.is_complete(html):
+                self.served[engine.name] += 1
+                return html
+
+            if self.logger:
+                self.logger.info(f"{engine.name} returned incomplete page for {url}, escalating.")
+
+        self.served["failed"] += 1
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.served)
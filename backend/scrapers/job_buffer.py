@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class JobBuffer:
+    """
+    Collects scraped jobs and writes them with JobDatabase.upsert_jobs,
+    flushing every `flush_size` jobs or every `flush_interval` seconds.
+    The source URLs of jobs that could not be written collect in failed_urls.
+    """
+    def __init__(self, db, flush_size: int, flush_interval: float,
+                 on_saved: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+                 logger: Optional[logging.Logger] = None):
+        self.db = db
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.on_saved = on_saved
+        self.logger = logger or logging.getLogger("JobBuffer")
+        self.pending: List[Dict[str, Any]] = []
+        self.saved_count = 0
+        self.flush_count = 0
+        self.failed_urls = set()
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._timer = asyncio.create_task(self._flush_periodically())
+
+    async def add(self, job_data: Dict[str, Any]):
+        self.pending.append(job_data)
+        if len(self.pending) >= self.flush_size:
+            await self.flush()
+
+    async def flush(self) -> List[Dict[str, Any]]:
+        async with self._lock:
+            if not self.pending:
+                return []
+            batch, self.pending = self.pending, []
+            try:
+                saved = await asyncio.to_thread(self.db.upsert_jobs, batch)
+            except Exception as e:
+                # Don't lose the whole batch to one bad row: retry jobs individually
+                self.logger.error(f"Batch upsert of {len(batch)} jobs failed, saving one by one: {e}")
+                saved = []
+                for job_data in batch:
+                    try:
+                        saved.append(await asyncio.to_thread(self.db.upsert_job, job_data))
+                    except Exception as job_error:
+                        self.logger.error(f"Failed to save job: {job_error}")
+                        self.failed_urls.update(job_data.get("source_urls") or [])
+            self.flush_count += 1
+            self.saved_count += len(saved)
+            self.logger.info(f"Flushed {len(batch)} jobs ({len(saved)} rows written)")
+
+        if self.on_saved:
+            for job in saved:
+                # The rows are already written: one failing handler mustn't cost the rest of the batch theirs
+                try:
+                    await self.on_saved(job)
+                except Exception as e:
+                    self.logger.error(f"Saved-job handler failed for job {job.get('id')}: {e}")
+        return saved
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                # Shielded so stopping the timer never abandons a batch mid-write
+                await asyncio.shield(self.flush())
+            except Exception as e:
+                self.logger.error(f"Periodic flush failed: {e}")
+
+    async def close(self):
+        """Stops the timer and writes whatever is still pending."""
+        if self._timer:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+            self._timer = None
+        await self.flush()
@@ -0,0 +1,31 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+
+
+class PagePool:
+    """
+    A fixed-size pool of Playwright pages shared by concurrent fetches.
+    Acquiring a page blocks until one is free, so the pool size caps
+    how many pages are loading at the same time.
+    """
+    def __init__(self, pages: List):
+        self.size = len(pages)
+        self._pages: asyncio.Queue = asyncio.Queue()
+        for page in pages:
+            self._pages.put_nowait(page)
+
+    @classmethod
+    async def create(cls, context, size: int) -> "PagePool":
+        """Opens `size` pages in the given browser context."""
+        pages = [await context.new_page() for _ in range(max(1, size))]
+        return cls(pages)
+
+    @asynccontextmanager
+    async def acquire(self):
+        page = await self._pages.get()
+        try:
+            yield page
+        finally:
+            self._pages.put_nowait(page)
+
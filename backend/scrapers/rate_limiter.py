@@ -0,0 +1,118 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Responses that mean the host wants us to slow down
+BACKOFF_STATUSES = {403, 429}
+
+
+class RequestOutcome:
+    """Filled in by the caller inside `AdaptiveRateLimiter.track`."""
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+
+
+class _HostBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.not_before = 0.0
+        self.lock = asyncio.Lock()
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-host token bucket whose refill rate adapts with AIMD:
+    fast successful responses add `increase` req/s, while 403/429/5xx,
+    timeouts and errors multiply the rate by `decrease`.
+    """
+    def __init__(self, initial_rate: float = 1.0, min_rate: float = 0.2, max_rate: float = 4.0,
+                 increase: float = 0.1, decrease: float = 0.5, slow_response: float = 3.0,
+                 burst: float = 1.0):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_response = slow_response
+        self.burst = burst
+        self._buckets: Dict[str, _HostBucket] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc or url
+
+    def _bucket(self, host: str) -> _HostBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _HostBucket(self.initial_rate, self.burst)
+        return bucket
+
+    async def acquire(self, host: str):
+        """Waits until a request to `host` is allowed."""
+        bucket = self._bucket(host)
+        async with bucket.lock:
+            while True:
+                now = time.monotonic()
+                if now < bucket.not_before:
+                    await asyncio.sleep(bucket.not_before - now)
+                    continue
+                bucket.refill(now)
+                if bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    return
+                await asyncio.sleep((1 - bucket.tokens) / bucket.rate)
+
+    def record(self, host: str, status: Optional[int], latency: float, error: bool = False,
+               retry_after: Optional[float] = None):
+        """Adjusts the host's rate from the outcome of a request."""
+        bucket = self._bucket(host)
+        if error or (status is not None and (status in BACKOFF_STATUSES or status >= 500)):
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            if retry_after:
+                bucket.not_before = max(bucket.not_before, time.monotonic() + retry_after)
+        elif status is not None and status < 400 and latency < self.slow_response:
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def current_rate(self, host: str) -> float:
+        """Current allowed requests per second for the host."""
+        bucket = self._buckets.get(host)
+        return bucket.rate if bucket else self.initial_rate
+
+    def rates(self) -> Dict[str, float]:
+        return {host: bucket.rate for host, bucket in self._buckets.items()}
+
+    @asynccontextmanager
+    async def track(self, url: str):
+        """
+        Acquires a slot for the URL's host and records the outcome.
+        The caller sets `outcome.status` (and optionally `retry_after`);
+        an exception is recorded as a failure and re-raised.
+        """
+        host = self.host_of(url)
+        await self.acquire(host)
+        outcome = RequestOutcome()
+        start = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            self.record(host, outcome.status, time.monotonic() - start, error=True)
+            raise
+        self.record(host, outcome.status, time.monotonic() - start, retry_after=outcome.retry_after)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given in seconds."""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
@@ -0,0 +1,96 @@
+from collections import Counter
+from typing import Dict, Any, Iterable, Optional
+from urllib.parse import urlparse
+
+# Resource types we never need: we only read the HTML document
+BLOCKED_RESOURCE_TYPES = {
+    "image", "media", "font", "stylesheet", "texttrack", "manifest",
+    "eventsource", "websocket", "ping", "beacon", "imageset",
+}
+
+# Analytics / tag-manager / monitoring hosts, matched by domain suffix
+TRACKER_HOSTS = {
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "tiqcdn.com",
+    "optimizely.com",
+    "newrelic.com",
+    "nr-data.net",
+    "go-mpulse.net",
+    "datadoghq.com",
+    "browser-intake-datadoghq.com",
+    "sentry.io",
+    "bat.bing.com",
+    "clarity.ms",
+    "branch.io",
+    "braze.com",
+    "appsflyer.com",
+    "tiktok.com",
+    "linkedin.com",
+}
+
+
+class ResourceBlocker:
+    """
+    Request-interception layer for a Playwright browser context.
+    Aborts requests for non-document resources and known analytics hosts,
+    and keeps per-run counters of what was blocked and what was loaded.
+    """
+    def __init__(self, blocked_types: Optional[Iterable[str]] = None, tracker_hosts: Optional[Iterable[str]] = None):
+        self.blocked_types = set(blocked_types) if blocked_types is not None else set(BLOCKED_RESOURCE_TYPES)
+        self.tracker_hosts = set(tracker_hosts) if tracker_hosts is not None else set(TRACKER_HOSTS)
+        self.reset()
+
+    def reset(self):
+        self.blocked_by_type = Counter()
+        self.blocked_trackers = Counter()
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+
+    async def attach(self, context):
+        """Routes every request of the context through the blocker."""
+        await context.route("**/*", self.handle_route)
+        context.on("response", self._on_response)
+
+    def is_tracker(self, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.tracker_hosts)
+
+    async def handle_route(self, route):
+        request = route.request
+        if self.is_tracker(request.url):
+            self.blocked_trackers[urlparse(request.url).hostname] += 1
+            await route.abort()
+        elif request.resource_type in self.blocked_types:
+            self.blocked_by_type[request.resource_type] += 1
+            await route.abort()
+        else:
+            self.allowed_requests += 1
+            await route.continue_()
+
+    def _on_response(self, response):
+        # Aborted requests never transfer a body, so only loaded bytes are measurable
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.allowed_bytes += int(length)
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked_by_type.values()) + sum(self.blocked_trackers.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "blocked_trackers": sum(self.blocked_trackers.values()),
+            "allowed_requests": self.allowed_requests,
+            "allowed_bytes": self.allowed_bytes,
+        }
@@ -0,0 +1,83 @@
+import json
+import re
+from typing import Dict, Any, Optional
+
+# SEEK server-renders the page state into a script tag as `window.SEEK_REDUX_DATA = {...};`
+STATE_MARKER = "window.SEEK_REDUX_DATA"
+
+# The state is a JS object literal, which may contain bare `undefined` values
+_UNDEFINED_RE = re.compile(r'(?<=[:,\[])\s*undefined(?=\s*[,}\]])')
+
+_decoder = json.JSONDecoder()
+
+
+def has_page_state(html: str) -> bool:
+    return STATE_MARKER in html
+
+
+def extract_page_state(html: str) -> Optional[Dict[str, Any]]:
+    """
+    Pulls the embedded page-state JSON out of the HTML without parsing the document.
+    Returns None if the blob is missing or cannot be decoded.
+    """
+    marker = html.find(STATE_MARKER)
+    if marker == -1:
+        return None
+    start = html.find("{", marker)
+    end = html.find("</script>", start)
+    if start == -1 or end == -1:
+        return None
+
+    blob = _UNDEFINED_RE.sub("null", html[start:end])
+    try:
+        state, _ = _decoder.raw_decode(blob)
+    except ValueError:
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def _label(value: Any) -> Optional[str]:
+    """SEEK wraps most display values as {"label": ...}."""
+    if isinstance(value, dict):
+        value = value.get("label")
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return None
+
+
+def extract_job(html: str) -> Optional[Dict[str, Any]]:
+    """
+    Extracts job details from SEEK's embedded page state.
+    Returns None if the state is missing or does not describe a job,
+    so the caller can fall back to walking the DOM.
+    """
+    state = extract_page_state(html)
+    if not state:
+        return None
+
+    try:
+        job = state["jobdetails"]["result"]["job"]
+    except (KeyError, TypeError):
+        return None
+    if not isinstance(job, dict):
+        return None
+
+    title = (job.get("title") or "").strip()
+    content = job.get("content")
+    if not title or not content:
+        return None
+
+    advertiser = job.get("advertiser") or {}
+    listed_at = job.get("listedAt") or {}
+
+    return {
+        "listing_id": str(job["id"]) if job.get("id") else None,
+        "title": title,
+        "company": (advertiser.get("name") or "").strip() or None,
+        "location": _label(job.get("location")),
+        "salary": _label(job.get("salary")),
+        "work_type": _label(job.get("workTypes")),
+        "listed_at": listed_at.get("dateTimeUtc") if isinstance(listed_at, dict) else None,
+        "description_html": content,
+    }
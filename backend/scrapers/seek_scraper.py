@@ -1,72 +1,401 @@
 import os
+import re
+import math
 import asyncio
-import random
 from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 from scrapers.base_scraper import BaseScraper
-from datetime import datetime
+from scrapers.job_buffer import JobBuffer
+from scrapers.page_pool import PagePool
+from scrapers.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from scrapers.coordinator import CrawlCoordinator
+from scrapers.resource_blocker import ResourceBlocker
+from scrapers.fetchers import BaseFetcher, HttpFetcher, PlaywrightFetcher, FallbackFetcher, has_markers
+from scrapers.seek_extractor import extract_job, has_page_state
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
 
 from config import SEARCH_TERMS, SCRAPER_SETTINGS
 
+LISTING_ID_RE = re.compile(r"/job/(\d+)")
+
 class SeekScraper(BaseScraper):
-    def __init__(self):
-        super().__init__("seek")
+    def __init__(self, db=None):
+        super().__init__("seek", db)
         self.base_url = "https://www.seek.com.au"
+        # Shared by every fetch so all requests to a host adapt to the same rate
+        self.limiter = AdaptiveRateLimiter(**SCRAPER_SETTINGS['rate_limit'])
+        self.blocker = None
+        self.http_fetcher = None
+        self.engine_counts = Counter()
+        self.has_detail_elements = has_markers(
+            'data-automation="job-detail-title"',
+            'data-automation="jobAdDetails"',
+        )
+
+    def is_complete_job_page(self, html: str) -> bool:
+        """
+        A detail page is usable if it carries the embedded page state
+        or the DOM elements we fall back to.
+        """
+        return has_page_state(html) or self.has_detail_elements(html)
 
     async def scrape(self, page_limit: int = None, search_terms: list = None, initial_run: bool = False):
         self.logger.info("Starting Seek Scraper...")
         
         terms = search_terms if search_terms else SEARCH_TERMS
         limit = page_limit if page_limit else SCRAPER_SETTINGS['page_limit']
-        days_ago = SCRAPER_SETTINGS['initial_days_ago'] if initial_run else SCRAPER_SETTINGS['days_ago']
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        # Shard terms round-robin across isolated browser contexts
+        shard_count = max(1, min(SCRAPER_SETTINGS['term_workers'], len(terms)))
+        shards = [terms[i::shard_count] for i in range(shard_count)]
+        coordinator = CrawlCoordinator()
+        self.blocker = ResourceBlocker() if SCRAPER_SETTINGS['block_resources'] else None
+        self.engine_counts = Counter()
+        if SCRAPER_SETTINGS['fetch_engine'] == "http_first":
+            self.http_fetcher = HttpFetcher(self.limiter, max_connections=SCRAPER_SETTINGS['concurrency'] * shard_count)
+        
+        if SCRAPER_SETTINGS['seen_index'] and self.db.seen_index is None:
+            try:
+                await asyncio.to_thread(self.db.load_seen_index)
+            except Exception as e:
+                self.logger.error(f"Could not load seen index, checking URLs against the DB: {e}")
+        
+        if SCRAPER_SETTINGS['save_batch_size'] > 1:
+            self.buffer = JobBuffer(self.db, SCRAPER_SETTINGS['save_batch_size'], SCRAPER_SETTINGS['save_flush_interval'],
+                                    on_saved=self.notify_saved, logger=self.logger)
+            self.buffer.start()
+        
+        try:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=True)
+                shard_resources = [await self._open_shard(browser) for _ in shards]
+                
+                if SCRAPER_SETTINGS['crawl_mode'] == "planned":
+                    await self._crawl_planned(shard_resources, shards, limit, coordinator, initial_run)
+                else:
+                    await asyncio.gather(*(
+                        self._crawl_shard(page, fetcher, shard, limit, coordinator, initial_run)
+                        for (page, fetcher), shard in zip(shard_resources, shards)
+                    ))
+
+                await browser.close()
+        finally:
+            if self.buffer:
+                await self.buffer.close()
+                self.logger.info(f"Saved {self.buffer.saved_count} rows in {self.buffer.flush_count} batched writes.")
+                self.buffer = None
+            
+        if self.http_fetcher:
+            await self.http_fetcher.close()
+            self.http_fetcher = None
+            
+        for term, stats in coordinator.results.items():
+            self.logger.info(f"Term '{term}': {stats['found']} found, {stats['claimed']} new, {stats['saved']} saved")
+        totals = coordinator.totals()
+        if self.blocker:
+            stats = self.blocker.stats()
+            self.logger.info(
+                f"Blocked {stats['blocked_requests']} requests ({stats['blocked_trackers']} trackers, by type: {stats['blocked_by_type']}); "
+                f"loaded {stats['allowed_requests']} requests, {stats['allowed_bytes']} bytes."
             )
-            page = await context.new_page()
+        self.logger.info(f"Job pages served by engine: {dict(self.engine_counts)}")
+        self.logger.info(f"Final request rates (req/s): { {host: round(rate, 2) for host, rate in self.limiter.rates().items()} }")
+        self.logger.info(f"Seek Scraper Finished. Saved {totals['saved']} of {totals['claimed']} new jobs across {shard_count} shard(s).")
+        return coordinator
+
+    async def _open_shard(self, browser):
+        """
+        Opens an isolated browser context with a listing page and a detail fetcher.
+        """
+        context = await browser.new_context(
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        )
+        if self.blocker:
+            await self.blocker.attach(context)
+        page = await context.new_page()
+        detail_pages = await PagePool.create(context, SCRAPER_SETTINGS['concurrency'])
+        engines = [PlaywrightFetcher(detail_pages, self.limiter)]
+        if self.http_fetcher:
+            engines.insert(0, self.http_fetcher)
+        fetcher = FallbackFetcher(engines, self.is_complete_job_page, served=self.engine_counts, logger=self.logger)
+        return page, fetcher
+
+    async def _crawl_shard(self, page, fetcher: BaseFetcher, terms: list, limit: int,
+                           coordinator: CrawlCoordinator, initial_run: bool = False):
+        """
+        Crawls a subset of search terms, one term at a time, in the shard's browser context.
+        """
+        for term in terms:
+            await self._crawl_term(page, fetcher, term, limit, coordinator, initial_run)
+
+    def _days_ago_for(self, state: dict, initial_run: bool) -> int:
+        """
+        Derives the search date range from the term's last successful run,
+        falling back to the configured defaults.
+        """
+        if initial_run:
+            return SCRAPER_SETTINGS['initial_days_ago']
+        last_success = state.get("last_success_at") if state else None
+        if not last_success:
+            return SCRAPER_SETTINGS['days_ago']
+        
+        last_success_at = datetime.fromisoformat(last_success)
+        if last_success_at.tzinfo is None:
+            last_success_at = last_success_at.replace(tzinfo=timezone.utc)
+        elapsed = datetime.now(timezone.utc) - last_success_at
+        # One extra day covers listings published just before the last run
+        days = math.ceil(elapsed.total_seconds() / 86400) + 1
+        return max(1, min(days, SCRAPER_SETTINGS['initial_days_ago']))
 
-            for term in terms:
-                self.logger.info(f"Searching for: {term}")
-                encoded_term = term.replace(" ", "-")
+    @staticmethod
+    def _listing_id(job_url: str):
+        match = LISTING_ID_RE.search(job_url)
+        return int(match.group(1)) if match else None
+
+    def _all_known(self, job_links: list, existing_urls: list, watermark) -> bool:
+        """
+        True if every link on the page is already in the DB or at/below the term's watermark.
+        """
+        existing = set(existing_urls)
+        for link in job_links:
+            if link in existing:
+                continue
+            listing_id = self._listing_id(link)
+            if watermark is None or listing_id is None or listing_id > watermark:
+                return False
+        return True
+
+    def _open_term(self, term: str, initial_run: bool) -> dict:
+        """
+        Loads the term's stored watermark and works out the date range to search.
+        """
+        incremental = SCRAPER_SETTINGS['incremental']
+        state = self.db.get_crawl_state(self.platform, term) if incremental else None
+        watermark = state.get("newest_listing_id") if state else None
+        if incremental:
+            days_ago = self._days_ago_for(state, initial_run)
+        else:
+            days_ago = SCRAPER_SETTINGS['initial_days_ago'] if initial_run else SCRAPER_SETTINGS['days_ago']
+        return {
+            "term": term,
+            "watermark": watermark,
+            "newest_seen": watermark,
+            "days_ago": days_ago,
+            "started_at": datetime.now(timezone.utc),
+            "succeeded": True,
+        }
+
+    def _listing_url(self, term: str, page_num: int, days_ago: int) -> str:
+        encoded_term = term.replace(" ", "-")
+        return f"{self.base_url}/{encoded_term}-jobs?page={page_num}&daterange={days_ago}&sortmode=ListedDate"
+
+    def _observe_listings(self, cursor: dict, job_links: list):
+        """Raises the term's newest-seen listing ID."""
+        listing_ids = [i for i in map(self._listing_id, job_links) if i is not None]
+        if cursor["newest_seen"] is not None:
+            listing_ids.append(cursor["newest_seen"])
+        if listing_ids:
+            cursor["newest_seen"] = max(listing_ids)
+
+    async def _unsaved(self, job_urls) -> set:
+        """
+        The job URLs whose buffered saves failed. Flushes the buffer first, since until
+        then submit_job has only acknowledged that a job was queued, not written.
+        """
+        if not self.buffer:
+            return set()
+        await self.buffer.flush()
+        return self.buffer.failed_urls.intersection(job_urls)
+
+    def _close_term(self, cursor: dict):
+        """Advances the term's watermark if every listing page loaded."""
+        if not SCRAPER_SETTINGS['incremental'] or not cursor["succeeded"]:
+            return
+        try:
+            self.db.save_crawl_state(self.platform, cursor["term"], cursor["newest_seen"], cursor["started_at"].isoformat())
+        except Exception as e:
+            self.logger.error(f"Failed to save crawl state for '{cursor['term']}': {e}")
+
+    async def _crawl_term(self, page, fetcher: BaseFetcher, term: str, limit: int,
+                          coordinator: CrawlCoordinator, initial_run: bool = False):
+        """
+        Walks the listing pages for one search term, newest first, and processes new jobs.
+        With incremental crawling, pagination stops at the first page made up entirely of
+        known jobs and the term's watermark is advanced after a successful run.
+        """
+        cursor = self._open_term(term, initial_run)
+        self.logger.info(f"Searching for: {term} (last {cursor['days_ago']} days)")
+        submitted = []
+        
+        for page_num in range(1, limit + 1):
+            url = self._listing_url(term, page_num, cursor["days_ago"])
+            self.logger.info(f"Visiting List Page: {url}")
+            
+            try:
+                job_links = await self._get_job_links(page, url)
+                self.logger.info(f"Current request rate: {self.limiter.current_rate(self.limiter.host_of(url)):.2f} req/s")
+                if job_links is None:
+                    cursor["succeeded"] = False
+                    break
+                if not job_links:
+                    self.logger.info("No more results found.")
+                    break
                 
-                for page_num in range(1, limit + 1):
-                    url = f"{self.base_url}/{encoded_term}-jobs?page={page_num}&daterange={days_ago}"
-                    self.logger.info(f"Visiting List Page: {url}")
-                    
-                    try:
-                        job_links = await self._get_job_links(page, url)
-                        if not job_links:
-                            self.logger.info("No more results found or error fetching links.")
-                            break
-                        
-                        # Deduplication: Check which URLs already exist
-                        existing_urls = self.db.check_existing_urls(job_links)
-                        new_links = [link for link in job_links if link not in existing_urls]
-                        
-                        skipped_count = len(job_links) - len(new_links)
-                        if skipped_count > 0:
-                            self.logger.info(f"Skipping {skipped_count} existing jobs.")
-                        
-                        self.logger.info(f"Found {len(new_links)} NEW jobs on page {page_num}")
+                self._observe_listings(cursor, job_links)
+                
+                # Deduplication: Check which URLs already exist
+                existing_urls = self.db.check_existing_urls(job_links)
+                new_links = [link for link in job_links if link not in existing_urls]
+                
+                skipped_count = len(job_links) - len(new_links)
+                if skipped_count > 0:
+                    self.logger.info(f"Skipping {skipped_count} existing jobs.")
+                
+                # Skip jobs another shard has already picked up in this run
+                new_links = coordinator.claim(new_links)
+                
+                self.logger.info(f"Found {len(new_links)} NEW jobs on page {page_num}")
+                
+                saved = await self._process_jobs(fetcher, new_links)
+                submitted.extend(new_links)
+                coordinator.record(term, found=len(job_links), claimed=len(new_links), saved=len(saved))
+                if len(saved) < len(new_links):
+                    # Listings at or below the watermark count as known, so keep it where it is and retry these next run
+                    self.logger.warning(f"{len(new_links) - len(saved)} jobs on page {page_num} were not saved; "
+                                        f"the watermark for '{term}' will not advance.")
+                    cursor["succeeded"] = False
+                
+                if SCRAPER_SETTINGS['incremental'] and self._all_known(job_links, existing_urls, cursor["watermark"]):
+                    self.logger.info(f"Page {page_num} only has known jobs, stopping pagination for '{term}'.")
+                    break
                         
-                        for job_url in new_links:
-                            await self._process_job(page, job_url)
-                                
-                    except Exception as e:
-                        self.logger.error(f"Error processing page {page_num}: {e}")
+            except Exception as e:
+                self.logger.error(f"Error processing page {page_num}: {e}")
+                cursor["succeeded"] = False
+
+        unsaved = await self._unsaved(submitted)
+        if unsaved:
+            self.logger.warning(f"{len(unsaved)} buffered jobs for '{term}' failed to save; its watermark will not advance.")
+            cursor["succeeded"] = False
+        self._close_term(cursor)
+
+    async def _plan_term(self, page, term: str, limit: int, initial_run: bool = False):
+        """
+        Collects listing links for one term without visiting any job pages.
+        Returns the term cursor and the links in listing order.
+        """
+        cursor = self._open_term(term, initial_run)
+        links = []
+        
+        for page_num in range(1, limit + 1):
+            url = self._listing_url(term, page_num, cursor["days_ago"])
+            self.logger.info(f"Planning from List Page: {url}")
+            
+            job_links = await self._get_job_links(page, url)
+            if job_links is None:
+                cursor["succeeded"] = False
+                break
+            if not job_links:
+                break
+            
+            self._observe_listings(cursor, job_links)
+            links.extend(job_links)
+            
+            # Without a DB round trip per page, only the watermark can end pagination early
+            if SCRAPER_SETTINGS['incremental'] and self._all_known(job_links, [], cursor["watermark"]):
+                break
+        
+        return cursor, links
+
+    async def _crawl_planned(self, shard_resources: list, shards: list, limit: int,
+                             coordinator: CrawlCoordinator, initial_run: bool = False):
+        """
+        Two-phase crawl: gathers listing links for every term first, dedupes them globally
+        with a single DB check, then fetches the resulting frontier across all shards.
+        """
+        async def plan_shard(page, terms):
+            return [await self._plan_term(page, term, limit, initial_run) for term in terms]
+
+        planned = await asyncio.gather(*(
+            plan_shard(page, shard) for (page, _), shard in zip(shard_resources, shards)
+        ))
+        plans = [plan for shard_plans in planned for plan in shard_plans]
+        
+        # Remember the first term that listed each URL, for per-term stats
+        first_term = {}
+        for cursor, links in plans:
+            coordinator.record(cursor["term"], found=len(links))
+            for link in links:
+                first_term.setdefault(link, cursor["term"])
+        
+        unique_links = list(first_term)
+        existing_urls = set(self.db.check_existing_urls(unique_links)) if unique_links else set()
+        frontier = coordinator.claim([link for link in unique_links if link not in existing_urls])
+        for link in frontier:
+            coordinator.record(first_term[link], claimed=1)
+        
+        self.logger.info(
+            f"Crawl plan: {sum(len(links) for _, links in plans)} listings across {len(plans)} terms, "
+            f"{len(unique_links)} unique, {len(existing_urls)} already stored, {len(frontier)} to fetch."
+        )
+        
+        done = 0
+        failed = set()
+        def on_done(job_url: str, saved_job):
+            nonlocal done
+            done += 1
+            if saved_job:
+                coordinator.record(first_term[job_url], saved=1)
+            else:
+                failed.add(job_url)
+            self.logger.info(f"Progress: {done}/{len(frontier)} jobs fetched")
+        
+        chunks = [frontier[i::len(shard_resources)] for i in range(len(shard_resources))]
+        await asyncio.gather(*(
+            self._process_jobs(fetcher, chunk, on_done=on_done)
+            for (_, fetcher), chunk in zip(shard_resources, chunks)
+        ))
+        
+        failed |= await self._unsaved(frontier)
+        for cursor, links in plans:
+            # A term whose listings weren't all saved keeps its watermark, so they are retried next run
+            if failed.intersection(links):
+                cursor["succeeded"] = False
+            self._close_term(cursor)
 
-            await browser.close()
-            self.logger.info("Seek Scraper Finished.")
+    async def _process_jobs(self, fetcher: BaseFetcher, job_urls: list, on_done=None) -> list:
+        """
+        Processes job URLs concurrently, at most SCRAPER_SETTINGS['concurrency'] at a time.
+        Calls on_done(job_url, saved_job) as each job finishes and returns the jobs that were saved.
+        """
+        semaphore = asyncio.Semaphore(SCRAPER_SETTINGS['concurrency'])
+
+        async def worker(job_url: str):
+            async with semaphore:
+                saved_job = await self._process_job(fetcher, job_url)
+            if on_done:
+                on_done(job_url, saved_job)
+            return saved_job
 
-    async def _get_job_links(self, page, url: str) -> list:
+        results = await asyncio.gather(*(worker(job_url) for job_url in job_urls))
+        return [job for job in results if job]
+
+    async def _get_job_links(self, page, url: str) -> Optional[list]:
         """
         Navigates to the list page and extracts job links.
+        Returns None if the page could not be loaded.
         """
         try:
-            await page.goto(url, wait_until="domcontentloaded")
-            await asyncio.sleep(random.uniform(2, 4))
+            async with self.limiter.track(url) as outcome:
+                response = await page.goto(url, wait_until="domcontentloaded")
+                if response:
+                    outcome.status = response.status
+                    outcome.retry_after = parse_retry_after(response.headers.get("retry-after"))
+            if response and response.status >= 400:
+                self.logger.error(f"List page returned HTTP {response.status}: {url}")
+                return None
             
             content = await page.content()
             if "No matching search results" in content:
@@ -86,7 +415,7 @@ class SeekScraper(BaseScraper):
             return job_links
         except Exception as e:
             self.logger.error(f"Error getting job links from {url}: {e}")
-            return []
+            return None
 
     def _remove_html_tags(self, content: str) -> str:
         """
@@ -110,35 +439,54 @@ class SeekScraper(BaseScraper):
             return "Intermediate"
         return "Intermediate" # Default to Intermediate if unknown
 
-    async def _process_job(self, page, job_url: str):
+    def _extract_from_dom(self, html: str) -> dict:
         """
-        Navigates to a job URL, extracts details, and saves the job.
+        Extracts job details by walking the rendered DOM.
+        Returns the same keys as seek_extractor.extract_job.
+        """
+        job_soup = BeautifulSoup(html, 'lxml')
+        
+        def text_of(tag: str, automation: str):
+            elem = job_soup.find(tag, attrs={"data-automation": automation})
+            return elem.text.strip() if elem else None
+        
+        description_elem = job_soup.find("div", attrs={"data-automation": "jobAdDetails"})
+        raw_content = str(description_elem) if description_elem else str(job_soup.find("body"))
+        
+        return {
+            "listing_id": None,
+            "title": text_of("h1", "job-detail-title"),
+            "company": text_of("span", "advertiser-name"),
+            "location": text_of("span", "job-detail-location"),
+            "salary": text_of("span", "job-detail-salary"),
+            "work_type": text_of("span", "job-detail-work-type"),
+            "listed_at": None,
+            "description_html": raw_content,
+        }
+
+    async def _process_job(self, fetcher: BaseFetcher, job_url: str):
+        """
+        Fetches a job URL, extracts details, and saves the job.
         """
         try:
             self.logger.info(f"Scraping Job: {job_url}")
-            await page.goto(job_url, wait_until="domcontentloaded")
-            await asyncio.sleep(random.uniform(1, 3))
+            job_content = await fetcher.fetch(job_url)
+            if not job_content:
+                self.logger.warning(f"Could not fetch job page: {job_url}")
+                return None
             
-            job_content = await page.content()
-            job_soup = BeautifulSoup(job_content, 'lxml')
+            # Prefer the embedded page state; walk the DOM only if it is unavailable
+            details = extract_job(job_content)
+            if details is None:
+                self.logger.info(f"No embedded job data, falling back to DOM: {job_url}")
+                details = self._extract_from_dom(job_content)
             
-            # Extract Details
-            title_elem = job_soup.find("h1", attrs={"data-automation": "job-detail-title"})
-            title = title_elem.text.strip() if title_elem else "Unknown Title"
+            title = details["title"] or "Unknown Title"
+            company = details["company"] or "Unknown Company"
+            location = details["location"] or "Australia"
+            salary = details["salary"]
             
-            company_elem = job_soup.find("span", attrs={"data-automation": "advertiser-name"})
-            company = company_elem.text.strip() if company_elem else "Unknown Company"
-            
-            location_elem = job_soup.find("span", attrs={"data-automation": "job-detail-location"})
-            location = location_elem.text.strip() if location_elem else "Australia"
-            
-            salary_elem = job_soup.find("span", attrs={"data-automation": "job-detail-salary"})
-            salary = salary_elem.text.strip() if salary_elem else None
-            
-            description_elem = job_soup.find("div", attrs={"data-automation": "jobAdDetails"})
-            raw_content = str(description_elem) if description_elem else str(job_soup.find("body"))
-            
-            description = self._remove_html_tags(raw_content)
+            description = self._remove_html_tags(details["description_html"])
             seniority = self._determine_seniority(title, description)
             
             self.logger.info(f"Extracted: {title} at {company}")
@@ -154,16 +502,17 @@ class SeekScraper(BaseScraper):
                 "description": description,
                 "salary": salary,
                 "seniority": seniority,
+                "posted_at": details["listed_at"],
+                "job_type": details["work_type"],
                 "llm_analysis": llm_analysis,
                 "platforms": ["seek"],
             }
             
-            saved_job = self.save_job(job_data)
-            if saved_job:
-                self.logger.info(f"Saved job: {title}")
+            return await self.submit_job(job_data)
             
         except Exception as e:
             self.logger.error(f"Error scraping job details {job_url}: {e}")
+            return None
 
     def run(self):
         # Default run with config values
@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import os
+import time
+from itertools import islice
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzers.skill_extractor import SkillExtractor
+from config import PROCESSOR_SETTINGS, SKILL_EXTRACTOR_SETTINGS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("BenchmarkSkillExtractor")
+
+def load_descriptions(path: str = None, limit: int = 1000):
+    """Descriptions from a JSONL export (see export_jobs.py), or straight from storage."""
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            jobs = (json.loads(line) for line in f if line.strip())
+            return [job["description"] for job in islice((j for j in jobs if j.get("description")), limit)]
+    from db.storage import create_storage
+    jobs = create_storage().iter_jobs(columns=("description",))
+    return [job["description"] for job in islice((j for j in jobs if j.get("description")), limit)]
+
+def benchmark_extractor(descriptions, repeat: int = 3):
+    extractor = SkillExtractor.from_file(SKILL_EXTRACTOR_SETTINGS['taxonomy_path'])
+    confident, terms = 0, 0
+    for description in descriptions:
+        analysis, confidence = extractor.extract(description)
+        confident += confidence >= SKILL_EXTRACTOR_SETTINGS['min_confidence']
+        terms += sum(len(v) for v in analysis.get("skills", {}).values())
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for description in descriptions:
+            extractor.extract(description)
+        best = min(best, time.perf_counter() - start)
+    return {
+        "jobs": len(descriptions),
+        "patterns": extractor.size,
+        "seconds": best,
+        "jobs_per_second": len(descriptions) / best if best else float("inf"),
+        "confident_share": confident / len(descriptions) if descriptions else 0.0,
+        "terms_per_job": terms / len(descriptions) if descriptions else 0.0,
+    }
+
+async def benchmark_llm(descriptions):
+    """Live LLM analyses (full prompt, cache and extractor off), concurrently."""
+    from analyzers.job_analyzer import JobAnalyzer
+
+    analyzer = JobAnalyzer(model_name=PROCESSOR_SETTINGS['model'], extractor_mode="off")
+    analyzer.cache = None  # measure real calls, not cache hits
+    start = time.perf_counter()
+    results = await asyncio.gather(*(analyzer.analyze_job_description_async(d) for d in descriptions),
+                                   return_exceptions=True)
+    seconds = time.perf_counter() - start
+    return {"jobs": len(descriptions), "seconds": seconds, "jobs_per_second": len(descriptions) / seconds,
+            "failed": sum(1 for r in results if not r or isinstance(r, Exception))}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the rule-based skill extractor with the LLM path.")
+    parser.add_argument("--file", help="JSONL export to read descriptions from (default: the configured storage)")
+    parser.add_argument("--limit", type=int, default=1000, help="Descriptions to benchmark")
+    parser.add_argument("--llm", type=int, default=0, help="Also time this many live LLM analyses")
+    args = parser.parse_args()
+
+    descriptions = load_descriptions(args.file, args.limit)
+    if not descriptions:
+        logger.error("No descriptions to benchmark.")
+        sys.exit(1)
+    rules = benchmark_extractor(descriptions)
+    logger.info(
+        f"Extractor: {rules['jobs']} jobs in {rules['seconds'] * 1000:.1f} ms "
+        f"({rules['jobs_per_second']:.0f} jobs/s, {rules['patterns']} patterns), "
+        f"{rules['terms_per_job']:.1f} terms/job, {rules['confident_share']:.0%} above the confidence threshold"
+    )
+    if args.llm:
+        llm = asyncio.run(benchmark_llm(descriptions[:args.llm]))
+        logger.info(
+            f"LLM: {llm['jobs']} jobs in {llm['seconds']:.1f} s ({llm['jobs_per_second']:.2f} jobs/s, "
+            f"{llm['failed']} failed); extractor is {rules['jobs_per_second'] / llm['jobs_per_second']:.0f}x faster"
+        )
@@ -0,0 +1,52 @@
+import argparse
+import logging
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.vector_index import VectorIndex
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("BenchmarkVectorIndex")
+
+def benchmark_search(jobs: int = 100_000, dimensions: int = 128, k: int = 10, repeat: int = 5):
+    """Median top-k query time over random unit vectors."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((jobs, dimensions)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = VectorIndex(dimensions)
+    start = time.perf_counter()
+    index.upsert([str(i) for i in range(jobs)], vectors)
+    build = time.perf_counter() - start
+
+    timings = []
+    for i in range(repeat):
+        query = vectors[i] + 0.1 * rng.standard_normal(dimensions).astype(np.float32)
+        start = time.perf_counter()
+        index.search(query, k=k)
+        timings.append(time.perf_counter() - start)
+    return {"jobs": jobs, "build_seconds": build, "median_seconds": sorted(timings)[len(timings) // 2]}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time top-k searches over the in-process vector index.")
+    parser.add_argument("--jobs", type=int, default=100_000, help="Indexed vectors")
+    parser.add_argument("--dimensions", type=int, default=128, help="Vector dimensions")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Fail when the median search is slower")
+    args = parser.parse_args()
+
+    result = benchmark_search(args.jobs, args.dimensions)
+    median_ms = result["median_seconds"] * 1000
+    logger.info(f"Index: {result['jobs']} jobs built in {result['build_seconds']:.2f} s, "
+                f"median top-10 search {median_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if median_ms > args.budget_ms:
+        logger.error("Median search time is over budget.")
+        sys.exit(1)
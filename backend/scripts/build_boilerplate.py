@@ -0,0 +1,37 @@
+import argparse
+import logging
+import sys
+import os
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzers.preprocessing import BoilerplateStore
+from config import PREPROCESS_SETTINGS
+from db.storage import create_storage
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("BuildBoilerplate")
+
+def build_boilerplate(db=None, path: str = None) -> int:
+    """
+    Rebuilds the boilerplate paragraph store from every stored description.
+    Rerun it as the corpus grows; the analyzer picks the store up on start.
+    """
+    db = db or create_storage()
+    store = BoilerplateStore(path or PREPROCESS_SETTINGS['store_path'], PREPROCESS_SETTINGS['min_jobs'],
+                             PREPROCESS_SETTINGS['min_chars'])
+    try:
+        return store.build(job.get("description") or "" for job in db.iter_jobs(columns=("description",)))
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find boilerplate paragraphs shared across job descriptions.")
+    parser.add_argument("--path", help="Store file (default: PREPROCESS_SETTINGS['store_path'])")
+    args = parser.parse_args()
+    build_boilerplate(path=args.path)
@@ -0,0 +1,61 @@
+import argparse
+import logging
+import sys
+import os
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import NEAR_DUPLICATE_SETTINGS
+from db.near_duplicates import cluster, normalize_company
+from db.storage import create_storage, near_duplicate_tools
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("ClusterDuplicates")
+
+def cluster_jobs(db, backfill: bool = False, merge: bool = False):
+    """
+    Clusters the existing table by description similarity (MinHash + LSH).
+    backfill: store signatures and LSH buckets for jobs saved before detection existed,
+              so upsert_job can match new postings against them.
+    merge: fold each cluster into its oldest job and delete the rest.
+    Returns the clusters as lists of job ids, oldest first.
+    """
+    hasher, lsh = near_duplicate_tools()
+    signatures, companies, missing = {}, {}, []
+    for job in db.iter_jobs(columns=("company", "description", "minhash")):
+        signature = job.get("minhash")
+        if not signature:
+            computed = hasher.signature(job.get("description") or "")
+            if computed is None:
+                continue
+            signature = computed.tolist()
+            missing.append((job["id"], signature))
+        signatures[job["id"]] = signature
+        companies[job["id"]] = normalize_company(job.get("company"))
+    
+    if backfill and missing:
+        logger.info(f"Backfilling signatures for {len(missing)} jobs...")
+        db.save_minhashes(missing)
+    
+    groups = companies if NEAR_DUPLICATE_SETTINGS['same_company'] else None
+    clusters = cluster(signatures, lsh, NEAR_DUPLICATE_SETTINGS['threshold'], groups)
+    duplicate_count = sum(len(members) - 1 for members in clusters)
+    logger.info(f"Scanned {len(signatures)} jobs: {len(clusters)} clusters, {duplicate_count} near-duplicates.")
+    
+    if merge:
+        for members in clusters:
+            db.merge_duplicate_jobs(members[0], members[1:])
+        logger.info(f"Merged {duplicate_count} near-duplicates into {len(clusters)} jobs.")
+    return clusters
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find near-duplicate job postings.")
+    parser.add_argument("--backfill", action="store_true", help="Store signatures for jobs that have none")
+    parser.add_argument("--merge", action="store_true", help="Merge each cluster into its oldest job")
+    args = parser.parse_args()
+    cluster_jobs(create_storage(), backfill=args.backfill, merge=args.merge)
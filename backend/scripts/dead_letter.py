@@ -0,0 +1,47 @@
+import argparse
+import logging
+import sys
+import os
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.storage import create_storage
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("DeadLetter")
+
+def list_dead_jobs(db=None, limit: int = 100):
+    """Logs the jobs the processor gave up on, newest first."""
+    db = db or create_storage()
+    jobs = db.get_dead_letter_jobs(limit)
+    for job in jobs:
+        logger.info(f"{job['id']} | {job.get('job_title')} @ {job.get('company')} | "
+                    f"{job.get('attempts')} attempts | {job.get('last_error')}")
+    logger.info(f"{len(jobs)} dead-lettered jobs shown.")
+    return jobs
+
+def requeue(job_ids=None, db=None, limit: int = 1000) -> int:
+    """Sends the given jobs (default: every dead-lettered job) back to the processor."""
+    db = db or create_storage()
+    if not job_ids:
+        job_ids = [job['id'] for job in db.get_dead_letter_jobs(limit)]
+    count = db.requeue_jobs(list(job_ids)) if job_ids else 0
+    logger.info(f"Requeued {count} jobs.")
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or requeue jobs whose LLM analysis keeps failing.")
+    parser.add_argument("--requeue", nargs="*", metavar="JOB_ID",
+                        help="Reset these jobs (default: all dead-lettered jobs) to pending")
+    parser.add_argument("--limit", type=int, default=100, help="Jobs to list")
+    args = parser.parse_args()
+
+    if args.requeue is not None:
+        requeue(args.requeue)
+    else:
+        list_dead_jobs(limit=args.limit)
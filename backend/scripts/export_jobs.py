@@ -0,0 +1,38 @@
+import argparse
+import json
+import logging
+import sys
+import os
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.storage import create_storage, JOB_COLUMNS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("ExportJobs")
+
+def export_jobs(path: str, columns=JOB_COLUMNS) -> int:
+    """
+    Writes every job as one JSON line, streaming pages with iter_jobs
+    so memory stays flat however large the table is.
+    """
+    db = create_storage()
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for job in db.iter_jobs(columns=columns):
+            f.write(json.dumps(job, default=str) + "\n")
+            count += 1
+    logger.info(f"Exported {count} jobs to {path}")
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export job postings to JSONL.")
+    parser.add_argument("path", help="Output .jsonl file")
+    parser.add_argument("--columns", help="Comma-separated columns (default: all but the embedding)")
+    args = parser.parse_args()
+    export_jobs(args.path, [c.strip() for c in args.columns.split(",")] if args.columns else JOB_COLUMNS)
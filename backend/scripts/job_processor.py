@@ -1,8 +1,11 @@
+import argparse
 import logging
-import time
-from db.database import JobDatabase
+from typing import Dict, List
+from db.storage import DEAD, create_async_storage, create_storage, default_worker_id
 from analyzers.job_analyzer import JobAnalyzer
-from config import PROCESSOR_SETTINGS
+from analyzers.llm_limiter import is_permanent
+from analyzers.batch_backfill import BatchBackfill, create_batch_client
+from config import PROCESSOR_SETTINGS, BATCH_SETTINGS
 
 # Configure logging
 logging.basicConfig(
@@ -18,44 +21,103 @@ def process_jobs(batch_size: int = None):
     asyncio.run(process_jobs_async(bs))
 
 async def process_jobs_async(batch_size: int):
-    db = JobDatabase()
     analyzer = JobAnalyzer(model_name=PROCESSOR_SETTINGS['model'])
     
     logger.info(f"Starting Job Processor (Batch Size: {batch_size})...")
     logger.info("Connecting to database...")
-    
-    while True:
+    db = await create_async_storage(max_connections=PROCESSOR_SETTINGS['db_connections'])
+    try:
+        await run_batches(db, analyzer, batch_size)
+    finally:
+        await db.close()
+
+    if analyzer.cache is not None:
+        logger.info(analyzer.cache.report())
+    if analyzer.preprocessor is not None:
+        logger.info(analyzer.preprocessor.report())
+    logger.info(analyzer.limiter.report())
+    logger.info("Job Processor Finished.")
+
+async def run_batches(db, analyzer, batch_size: int, worker_id: str = None) -> Dict[str, int]:
+    """
+    Sliding-window processing: a fetcher keeps up to `batch_size` jobs queued,
+    claiming the next batch while the current one is in flight, and workers pick
+    jobs up as soon as they are free, so one slow call never holds back the rest.
+    The analyzer's LLMLimiter decides how many LLM calls actually run at once.
+    Jobs are leased to `worker_id` as they are claimed, so any number of
+    processor instances can share the backlog without analyzing a job twice.
+    Jobs that fail are not retried during the same run.
+    """
+    worker_id = worker_id or default_worker_id()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size)
+    stats = {"analyzed": 0, "failed": 0}
+    attempted = set()
+    worker_count = PROCESSOR_SETTINGS['llm_limits']['max_concurrency']
+
+    async def fetcher():
         try:
-            # Fetch unanalyzed jobs
-            response = db.supabase.table("job_postings") \
-                .select("*") \
-                .is_("llm_analysis", "null") \
-                .limit(batch_size) \
-                .execute()
-            
-            jobs = response.data
-            
-            if not jobs:
-                logger.info("No unanalyzed jobs found.")
-                break
-                
-            logger.info(f"Found {len(jobs)} unanalyzed jobs. Processing batch...")
-            
-            tasks = []
-            for job in jobs:
-                tasks.append(process_single_job(db, analyzer, job))
-            
-            # Run batch concurrently
-            await asyncio.gather(*tasks)
-            
-            # Brief sleep to avoid hammering if loop continues immediately
-            await asyncio.sleep(1)
-                
+            while True:
+                # Leased jobs aren't claimable again, so each claim returns new work, except
+                # jobs that failed this run and whose backoff is already over: claim past those
+                limit = batch_size + stats["failed"]
+                jobs = await db.claim_jobs(worker_id, limit)
+                fresh = [job for job in jobs if job['id'] not in attempted]
+                if len(fresh) < len(jobs):
+                    await db.release_jobs(worker_id, [job['id'] for job in jobs if job['id'] in attempted])
+                if fresh:
+                    logger.info(f"Claimed {len(fresh)} unanalyzed jobs as {worker_id}. Queueing...")
+                for job in fresh:
+                    attempted.add(job['id'])
+                    await queue.put(job)
+                if len(jobs) < limit or not fresh:
+                    return
         except Exception as e:
             logger.error(f"Error in processing loop: {e}")
-            break
+        finally:
+            for _ in range(worker_count):
+                await queue.put(None)
 
-    logger.info("Job Processor Finished.")
+    workers = [asyncio.create_task(analysis_worker(queue, db, analyzer, stats, i)) for i in range(worker_count)]
+    await fetcher()
+    await asyncio.gather(*workers)
+    if not attempted:
+        logger.info("No unanalyzed jobs found.")
+    logger.info(f"Analyzed {stats['analyzed']} jobs, {stats['failed']} failed.")
+    return stats
+
+async def analysis_worker(queue: asyncio.Queue, db, analyzer, stats: Dict[str, int], worker_id: int = 0):
+    """
+    Takes the next job plus whatever else is already queued (up to the pack size)
+    so several descriptions share one LLM call, without waiting for a full pack.
+    Stops at a None sentinel.
+    """
+    while True:
+        jobs = [await queue.get()]
+        while jobs[-1] is not None and len(jobs) < PROCESSOR_SETTINGS['pack_size'] and not queue.empty():
+            jobs.append(queue.get_nowait())
+        stop = jobs[-1] is None
+        batch = [job for job in jobs if job is not None]
+        try:
+            if batch:
+                for ok in await process_job_batch(db, analyzer, batch):
+                    stats["analyzed" if ok else "failed"] += 1
+        except Exception as e:
+            logger.error(f"Worker {worker_id} failed on jobs {[job.get('id') for job in batch]}: {e}")
+            stats["failed"] += len(batch)
+        finally:
+            for _ in jobs:
+                queue.task_done()
+        if stop:
+            return
+
+async def record_failure(db, job_id, error: str, retryable: bool = True):
+    """Counts a failed analysis so the job backs off, or is dead-lettered once out of attempts."""
+    try:
+        state = await db.record_analysis_failure(job_id, error, retryable)
+        if state.get("processing_status") == DEAD:
+            logger.warning(f"Job {job_id} moved to the dead letter queue after {state.get('attempts')} attempts: {error}")
+    except Exception as e:
+        logger.error(f"Failed to record the failed analysis of job {job_id}: {e}")
 
 async def process_single_job(db, analyzer, job):
     job_id = job['id']
@@ -63,7 +125,8 @@ async def process_single_job(db, analyzer, job):
     
     if not description:
         logger.warning(f"Job {job_id} has no description. Skipping.")
-        return
+        await record_failure(db, job_id, "No description", retryable=False)
+        return False
         
     logger.info(f"Analyzing Job: {job.get('job_title')} ({job_id})")
     
@@ -71,16 +134,90 @@ async def process_single_job(db, analyzer, job):
         analysis = await analyzer.analyze_job_description_async(description)
         if analysis:
             logger.info(f"Generated analysis of {len(str(analysis))} characters for job {job_id}")
-            # Note: DB update is synchronous for now, which is fine as it's fast enough
-            # or we could make it async if the DB client supports it.
-            # For now, we'll just run it in the thread.
-            db.update_llm_analysis(job_id, analysis)
+            await db.update_llm_analysis(job_id, analysis)
             logger.info(f"Successfully analyzed and updated job {job_id}")
+            return True
         else:
             logger.warning(f"Analysis returned empty for job {job_id}")
+            await record_failure(db, job_id, "Analysis returned empty")
 
     except Exception as e:
         logger.error(f"Failed to analyze job {job_id}: {e}")
+        await record_failure(db, job_id, f"{type(e).__name__}: {e}", retryable=not is_permanent(e))
+    return False
+
+async def process_job_batch(db, analyzer, jobs) -> List[bool]:
+    """
+    Analyzes a batch of jobs with up to PROCESSOR_SETTINGS['pack_size'] descriptions
+    per LLM call and stores each result. Returns one success flag per job.
+    """
+    if PROCESSOR_SETTINGS['pack_size'] <= 1 or len(jobs) <= 1:
+        return list(await asyncio.gather(*(process_single_job(db, analyzer, job) for job in jobs)))
+    
+    outcome = {job['id']: False for job in jobs}
+    items = []
+    for job in jobs:
+        if job.get('description'):
+            items.append((job['id'], job['description']))
+        else:
+            logger.warning(f"Job {job['id']} has no description. Skipping.")
+            await record_failure(db, job['id'], "No description", retryable=False)
+    if not items:
+        return [False] * len(jobs)
+    
+    logger.info(f"Analyzing {len(items)} jobs in packs of up to {PROCESSOR_SETTINGS['pack_size']}")
+    try:
+        analyses = await analyzer.analyze_job_descriptions_async(items)
+    except Exception as e:
+        logger.error(f"Failed to analyze batch of {len(items)} jobs: {e}")
+        await asyncio.gather(*(record_failure(db, job_id, f"{type(e).__name__}: {e}", retryable=not is_permanent(e))
+                               for job_id, _ in items))
+        return [False] * len(jobs)
+    
+    async def store(job_id, analysis):
+        if isinstance(analysis, Exception):
+            await record_failure(db, job_id, f"{type(analysis).__name__}: {analysis}", retryable=not is_permanent(analysis))
+            return
+        if not analysis:
+            logger.warning(f"Analysis returned empty for job {job_id}")
+            await record_failure(db, job_id, "Analysis returned empty")
+            return
+        try:
+            await db.update_llm_analysis(job_id, analysis)
+            outcome[job_id] = True
+        except Exception as e:
+            logger.error(f"Failed to store analysis for job {job_id}: {e}")
+            await record_failure(db, job_id, f"{type(e).__name__}: {e}")
+    
+    await asyncio.gather(*(store(job_id, analyses.get(job_id)) for job_id, _ in items))
+    logger.info(f"Successfully analyzed and updated {sum(outcome.values())} of {len(jobs)} jobs")
+    return [outcome[job['id']] for job in jobs]
+
+def backfill_jobs(all_jobs: bool = False, work_dir: str = None, db=None, client=None, analyzer=None):
+    """
+    Re-analyzes jobs through the batch API: cheaper and far higher throughput than
+    live requests, at the cost of waiting for the batch to finish (up to the
+    completion window). Rerunning with the same work_dir resumes an unfinished backfill.
+    """
+    backfill = BatchBackfill(
+        db or create_storage(),
+        analyzer or JobAnalyzer(model_name=PROCESSOR_SETTINGS['model']),
+        client or create_batch_client(BATCH_SETTINGS),
+        work_dir or BATCH_SETTINGS['work_dir'],
+        requests_per_file=BATCH_SETTINGS['requests_per_file'],
+        poll_interval=BATCH_SETTINGS['poll_interval'],
+    )
+    stats = backfill.run(all_jobs)
+    logger.info(f"Backfill finished: {stats['applied']} of {stats['requests']} jobs updated, {stats['failed']} failed.")
+    return stats
 
 if __name__ == "__main__":
-    process_jobs()
+    parser = argparse.ArgumentParser(description="Analyze job descriptions with the LLM.")
+    parser.add_argument("--backfill", action="store_true", help="Submit jobs through the batch API instead of live requests")
+    parser.add_argument("--all", action="store_true", help="With --backfill, re-analyze every job, not only unanalyzed ones")
+    parser.add_argument("--work-dir", help="Backfill request files and resume state (default: BATCH_SETTINGS['work_dir'])")
+    args = parser.parse_args()
+    if args.backfill:
+        backfill_jobs(all_jobs=args.all, work_dir=args.work_dir)
+    else:
+        process_jobs()
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import signal
+from typing import Any, Dict
+
+from analyzers.job_analyzer import JobAnalyzer
+from scrapers.seek_scraper import SeekScraper
+from db.storage import create_async_storage, default_worker_id
+from scripts.job_processor import analysis_worker
+from config import PIPELINE_SETTINGS, PROCESSOR_SETTINGS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("Pipeline")
+
+
+class AnalysisPipeline:
+    """
+    Runs the scraper and the analyzer in one process.
+    Every saved job goes straight into a bounded queue that a pool of analyzer
+    workers consumes, so LLM latency overlaps with crawl latency.
+    When the queue is full the scraper waits (backpressure).
+    `db` is an async storage (see create_async_storage) used for the analysis reads and writes.
+    """
+    def __init__(self, scraper, analyzer, db, workers: int = None, queue_size: int = None, backlog_limit: int = None,
+                 worker_id: str = None):
+        self.scraper = scraper
+        self.db = db
+        self.worker_id = worker_id or default_worker_id()
+        self.analyzer = analyzer
+        self.worker_count = workers or PIPELINE_SETTINGS['workers']
+        self.backlog_limit = backlog_limit if backlog_limit is not None else PIPELINE_SETTINGS['backlog_limit']
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or PIPELINE_SETTINGS['queue_size'])
+        self.enqueued_ids = set()
+        self.stopping = asyncio.Event()
+        self.producers = []
+        self.stats = {"scraped": 0, "backlog": 0, "analyzed": 0, "failed": 0}
+        scraper.saved_job_handlers.append(self.on_job_saved)
+
+    async def enqueue(self, job: Dict[str, Any], source: str) -> bool:
+        """Queues a job for analysis unless it is already analyzed or queued."""
+        if job.get("llm_analysis") or job.get("id") in self.enqueued_ids:
+            return False
+        self.enqueued_ids.add(job.get("id"))
+        await self.queue.put(job)
+        self.stats[source] += 1
+        return True
+
+    async def on_job_saved(self, job: Dict[str, Any]):
+        if self.stopping.is_set() or job.get("llm_analysis") or job.get("id") in self.enqueued_ids:
+            return
+        # Lease it first, so a job_processor running alongside doesn't analyze it too
+        if await self.db.claim_jobs_by_id(self.worker_id, [job.get("id")]):
+            try:
+                await self.enqueue(job, "scraped")
+            except asyncio.CancelledError:
+                await self.db.release_jobs(self.worker_id, [job.get("id")])
+                raise
+
+    async def enqueue_backlog(self):
+        """
+        DB-polling fallback: claims and queues up to backlog_limit jobs left unanalyzed
+        by earlier runs. Jobs are claimed a queue's worth at a time as space frees up,
+        so none sits in the queue long enough for its lease to run out.
+        """
+        remaining = self.backlog_limit
+        while remaining > 0 and not self.stopping.is_set():
+            limit = min(remaining, max(1, self.queue.maxsize - self.queue.qsize()))
+            jobs = await self.db.claim_jobs(self.worker_id, limit)
+            if jobs:
+                logger.info(f"Queueing {len(jobs)} unanalyzed jobs from earlier runs.")
+            remaining -= len(jobs)
+            queued = 0
+            try:
+                for job in jobs:
+                    if self.stopping.is_set():
+                        break
+                    await self.enqueue(job, "backlog")
+                    queued += 1
+            finally:
+                # On shutdown, hand back the claimed jobs that won't be analyzed rather than
+                # leaving them locked until their lease runs out
+                if queued < len(jobs):
+                    await self.db.release_jobs(self.worker_id, [job.get("id") for job in jobs[queued:]])
+            if len(jobs) < limit:
+                return
+
+    async def worker(self, worker_id: int):
+        await analysis_worker(self.queue, self.db, self.analyzer, self.stats, worker_id)
+
+    def shutdown(self):
+        """Stops producing new work; queued jobs are still analyzed before exit."""
+        if self.stopping.is_set():
+            return
+        logger.info("Shutdown requested. Stopping scraper and draining the analysis queue...")
+        self.stopping.set()
+        for task in self.producers:
+            task.cancel()
+
+    async def run(self, initial_run: bool = False) -> Dict[str, int]:
+        workers = [asyncio.create_task(self.worker(i)) for i in range(self.worker_count)]
+        self.producers = [
+            asyncio.create_task(self.scraper.scrape(initial_run=initial_run)),
+            asyncio.create_task(self.enqueue_backlog()),
+        ]
+
+        results = await asyncio.gather(*self.producers, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Producer failed: {result}")
+
+        # Drain: workers finish everything queued, then stop at their sentinel
+        for _ in workers:
+            await self.queue.put(None)
+        await asyncio.gather(*workers)
+
+        logger.info(
+            f"Pipeline finished. Queued {self.stats['scraped']} scraped and {self.stats['backlog']} backlog jobs; "
+            f"analyzed {self.stats['analyzed']}, failed {self.stats['failed']}."
+        )
+        for component in (getattr(self.analyzer, "cache", None), getattr(self.analyzer, "preprocessor", None),
+                          getattr(self.analyzer, "limiter", None)):
+            if component is not None:
+                logger.info(component.report())
+        return self.stats
+
+
+async def run_pipeline(initial_run: bool = False) -> Dict[str, int]:
+    scraper = SeekScraper()
+    analyzer = JobAnalyzer(model_name=PROCESSOR_SETTINGS['model'])
+    db = await create_async_storage(max_connections=PROCESSOR_SETTINGS['db_connections'], storage=scraper.db)
+    pipeline = AnalysisPipeline(scraper, analyzer, db)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, pipeline.shutdown)
+        except (NotImplementedError, RuntimeError):
+            pass  # Signal handlers are unavailable on this platform/thread
+
+    try:
+        return await pipeline.run(initial_run=initial_run)
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_pipeline())
@@ -5,6 +5,8 @@ import logging
 import os
 from datetime import datetime
 
+from config import PIPELINE_SETTINGS
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -50,6 +52,31 @@ def run_process_and_stream_output(command, env):
         
     return process.poll()
 
+def run_pipeline():
+    logger.info("Starting scheduled pipeline run...")
+    try:
+        # Scraping and analysis run concurrently in one fresh process
+        env = os.environ.copy()
+        
+        return_code = run_process_and_stream_output(
+            ["python", "-m", "scripts.pipeline"],
+            env=env
+        )
+        
+        if return_code == 0:
+            logger.info("Pipeline finished successfully.")
+        else:
+            logger.error(f"Pipeline failed with return code {return_code}.")
+            
+    except Exception as e:
+        logger.error(f"Error running pipeline: {e}")
+
+def run_scheduled_job():
+    if PIPELINE_SETTINGS['enabled']:
+        run_pipeline()
+    else:
+        run_scraper()
+
 def run_scraper():
     logger.info("Starting scheduled scraper run...")
     try:
@@ -88,12 +115,12 @@ def main():
     logger.info("Scheduler started. Waiting for 06:00...")
     
     # Schedule the job every day at 06:00
-    schedule.every().day.at("06:00").do(run_scraper)
+    schedule.every().day.at("06:00").do(run_scheduled_job)
     
     # Also run immediately on startup if requested (optional, good for testing)
     if os.getenv("RUN_ON_STARTUP", "false").lower() == "true":
         logger.info("Running on startup...")
-        run_scraper()
+        run_scheduled_job()
 
     while True:
         schedule.run_pending()
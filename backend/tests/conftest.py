@@ -0,0 +1,12 @@
+import pytest
+import config
+
+@pytest.fixture(autouse=True)
+def no_local_analysis_stores(monkeypatch):
+    """
+    A plain JobAnalyzer() would open the analysis cache and boilerplate store under
+    data/, so tests would share state with real runs (and a cache hit could hide a
+    broken mock). Tests that need either pass one in explicitly.
+    """
+    monkeypatch.setitem(config.ANALYSIS_CACHE_SETTINGS, "enabled", False)
+    monkeypatch.setitem(config.PREPROCESS_SETTINGS, "enabled", False)
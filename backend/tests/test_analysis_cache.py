@@ -0,0 +1,67 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from analyzers.analysis_cache import AnalysisCache
+from analyzers.job_analyzer import JobAnalyzer
+
+class TestAnalysisCache(unittest.TestCase):
+    def test_lru_eviction_and_persistence(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "cache.db")
+        cache = AnalysisCache(path, max_entries=2)
+        cache.put("a", {"n": 1})
+        cache.put("b", {"n": 2})
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", {"n": 3})
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((len(cache), cache.stats["evicted"]), (2, 1))
+        cache.close()
+
+        reopened = AnalysisCache(path, max_entries=2)
+        self.assertEqual(reopened.get("c"), {"n": 3})
+        self.assertEqual(
+            AnalysisCache.key("m", "v1", "Python  and\nAWS "), AnalysisCache.key("m", "v1", "Python and AWS"))
+        self.assertNotEqual(AnalysisCache.key("m", "v1", "Python"), AnalysisCache.key("m", "v2", "Python"))
+        reopened.close()
+
+    def test_analyzer_calls_llm_once_per_distinct_description(self):
+        calls = []
+
+        async def fake_llm(prompt):
+            calls.append(prompt)
+            await asyncio.sleep(0.01)
+            return AIMessage(content=json.dumps({"skills": {"technical_skills": ["Python"]}}))
+
+        cache = AnalysisCache(input_cost_per_million=1.0, output_cost_per_million=1.0)
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "dummy-key"}):
+            analyzer = JobAnalyzer(model_name="test-model", cache=cache, extractor_mode="off")
+        analyzer.llm = RunnableLambda(lambda prompt: None, afunc=fake_llm)
+
+        async def run():
+            # Two identical descriptions in flight at once share one call
+            first = await asyncio.gather(
+                analyzer.analyze_job_description_async("Senior engineer. Python required."),
+                analyzer.analyze_job_description_async("Senior engineer.  Python required.\n"),
+            )
+            again = await analyzer.analyze_job_description_async("Senior engineer. Python required.")
+            other = await analyzer.analyze_job_description_async("Accountant. Xero required.")
+            return first + [again, other]
+
+        results = asyncio.run(run())
+
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all(r["skills"]["technical_skills"] == ["Python"] for r in results))
+        self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (2, 2))
+        self.assertAlmostEqual(cache.hit_rate(), 0.5)
+        self.assertGreater(cache.saved_cost(), 0)
+        self.assertIn("50% hit rate", cache.report())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import asyncio
+import json
+import time
+import httpx
+from supabase import AsyncClientOptions, create_async_client
+from db.async_database import AsyncJobDatabase
+
+class TestAsyncJobDatabase(unittest.TestCase):
+    def test_concurrent_updates_share_one_session_without_blocking(self):
+        """
+        Twenty updates that each take 50ms on the server finish in about one round trip,
+        all through the single pooled HTTP client.
+        """
+        requests = []
+
+        async def handler(request: httpx.Request):
+            requests.append(request)
+            await asyncio.sleep(0.05)
+            body = json.loads(request.content)
+            return httpx.Response(200, json=[{"id": request.url.params["id"][3:], **body}])
+
+        async def run():
+            http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            supabase = await create_async_client("http://db.local", "key", options=AsyncClientOptions(httpx_client=http_client))
+            async with AsyncJobDatabase(supabase, http_client) as db:
+                start = time.perf_counter()
+                results = await asyncio.gather(*(db.update_llm_analysis(str(i), {"skills": {}}) for i in range(20)))
+                return results, time.perf_counter() - start, http_client
+
+        results, elapsed, http_client = asyncio.run(run())
+
+        self.assertEqual([r["id"] for r in results], [str(i) for i in range(20)])
+        self.assertEqual(len(requests), 20)
+        self.assertEqual(requests[0].method, "PATCH")
+        self.assertLess(elapsed, 0.5)
+        self.assertTrue(http_client.is_closed)
+
+    def test_release_is_chunked_like_the_sync_client(self):
+        requests = []
+
+        async def handler(request: httpx.Request):
+            requests.append(request)
+            ids = request.url.params["id"][4:-1].split(",")
+            return httpx.Response(200, json=[{"id": job_id} for job_id in ids])
+
+        async def run():
+            http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            supabase = await create_async_client("http://db.local", "key", options=AsyncClientOptions(httpx_client=http_client))
+            async with AsyncJobDatabase(supabase, http_client) as db:
+                return await db.release_jobs("node-a", [str(i) for i in range(250)])
+
+        self.assertEqual(asyncio.run(run()), 250)
+        self.assertEqual(len(requests), 3)
+
+if __name__ == '__main__':
+    unittest.main()
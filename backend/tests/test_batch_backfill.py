@@ -0,0 +1,117 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from analyzers.analysis_cache import AnalysisCache
+from analyzers.batch_backfill import BatchBackfill, LocalBatchServer
+from analyzers.job_analyzer import JobAnalyzer
+from analyzers.skill_extractor import SkillExtractor
+from db.sqlite_database import SQLiteJobDatabase
+
+def answer(body):
+    prompt = body["messages"][0]["content"]
+    if "Broken" in prompt:
+        return "not json at all"
+    if "Outage" in prompt:
+        raise RuntimeError("model overloaded")
+    return json.dumps({"skills": {"technical_skills": ["Python"]}})
+
+class TestBatchBackfill(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = SQLiteJobDatabase(os.path.join(self.tmp.name, "jobs.db"))
+        self.jobs = self.db.upsert_jobs([
+            {"job_title": f"Role {i}", "company": f"Company {i}", "source_urls": [f"https://seek/{i}"],
+             "description": f"Role {i} needs Python. {'Broken' if i == 3 else ''}{'Outage' if i == 4 else ''}"}
+            for i in range(5)
+        ])
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "dummy-key"}):
+            self.analyzer = JobAnalyzer(model_name="test-model", cache=AnalysisCache(), extractor_mode="off")
+        self.server = LocalBatchServer(answer, polls_until_done=2)
+        self.work_dir = os.path.join(self.tmp.name, "backfill")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def backfill(self):
+        return BatchBackfill(self.db, self.analyzer, self.server, self.work_dir, requests_per_file=2, poll_interval=0)
+
+    def test_backfill_applies_results_and_resumes(self):
+        first = self.backfill()
+        self.assertEqual(first.prepare(), 5)
+        first.submit()
+        # Interrupted after submitting: a new run resumes without resubmitting
+        stats = self.backfill().run()
+
+        self.assertEqual(len(self.server.batches), 3)
+        self.assertEqual(stats, {"requests": 5, "applied": 3, "failed": 2})
+        analyses = {job["id"]: job["llm_analysis"] for job in self.db.iter_jobs(columns=("llm_analysis",))}
+        self.assertEqual(analyses[self.jobs[0]["id"]], {"skills": {"technical_skills": ["Python"]}})
+        self.assertIsNone(analyses[self.jobs[3]["id"]])
+        self.assertEqual(sorted(self.backfill().state["failed"]), sorted([self.jobs[3]["id"], self.jobs[4]["id"]]))
+
+        # Everything is applied, so running again changes nothing
+        self.assertEqual(self.backfill().apply(), 0)
+
+    def test_finished_backfill_is_not_resumed(self):
+        self.assertEqual(self.backfill().run()["applied"], 3)
+        # A later --all run (e.g. after a prompt change) starts over instead of "resuming" the finished one
+        again = self.backfill()
+        # The three applied results were cached, so only the two failed jobs need requests
+        self.assertEqual(again.prepare(all_jobs=True), 2)
+        self.assertEqual(again.state["applied"], 3)
+        self.assertTrue(again.state["all_jobs"])
+        self.assertEqual(again.state["prompt_version"], self.analyzer.prompt_version)
+
+        # An unfinished run can't be resumed with other settings
+        with self.assertRaises(ValueError):
+            self.backfill().prepare(all_jobs=False)
+
+    def test_requests_are_routed_like_live_analyses(self):
+        extractor = SkillExtractor.from_file()
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "dummy-key"}):
+            self.analyzer = JobAnalyzer(model_name="test-model", cache=AnalysisCache(), extractor=extractor,
+                                        extractor_mode="hybrid")
+        description = "Engineer building Python and PyTorch models deployed with Docker on AWS and Kubernetes."
+        job = self.db.upsert_job({"job_title": "ML Engineer", "company": "Acme", "source_urls": ["https://seek/ml"],
+                                  "description": description})
+        self.server.handler = lambda body: json.dumps({"skills": {"soft_skills": ["Communication"]}})
+
+        backfill = self.backfill()
+        backfill.run()
+
+        prompts = [json.loads(line)["body"]["messages"][0]["content"]
+                   for batch in self.server.batches.values() for line in self.server.files[batch["input_file_id"]].splitlines()]
+        free_text = [p for p in prompts if "PyTorch" in p]
+        self.assertEqual(len(free_text), 1)
+        self.assertIn(self.analyzer.free_text_prompt.format_messages(description="")[0].content[:40], free_text[0])
+        # The extractor's skills are merged in, and the result is cached for live analyses
+        analysis = next(j["llm_analysis"] for j in self.db.iter_jobs(columns=("llm_analysis",)) if j["id"] == job["id"])
+        self.assertEqual(analysis["skills"]["soft_skills"], ["Communication"])
+        self.assertIn("PyTorch", analysis["skills"]["tools_and_technologies"])
+        key = self.analyzer._cache_key(self.analyzer.prepare_description(description))
+        self.assertEqual(self.analyzer.cache.get(key), analysis)
+
+    def test_jobs_of_a_failed_batch_are_listed_as_failed(self):
+        backfill = self.backfill()
+        backfill.prepare()
+        backfill.submit()
+        batch_id = backfill.state["batches"][0]["batch_id"]
+        self.server.batches[batch_id]["status"] = "expired"
+        backfill.wait()
+        backfill.apply()
+
+        # The expired batch held jobs 0 and 1; jobs 3 and 4 failed individually
+        self.assertEqual(sorted(backfill.state["failed"]), sorted(self.jobs[i]["id"] for i in (0, 1, 3, 4)))
+        self.assertEqual(backfill.state["applied"], 1)
+
+    def test_only_unanalyzed_jobs_unless_all(self):
+        self.db.update_llm_analysis(self.jobs[0]["id"], {"skills": {}})
+        self.assertEqual(self.backfill().prepare(), 4)
+        other = BatchBackfill(self.db, self.analyzer, self.server, os.path.join(self.tmp.name, "all"))
+        self.assertEqual(other.prepare(all_jobs=True), 5)
+
+if __name__ == '__main__':
+    unittest.main()
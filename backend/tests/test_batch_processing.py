@@ -1,8 +1,10 @@
 import unittest
 import asyncio
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock, patch
+import config
 from scripts.job_processor import process_jobs_async
 
+@patch.dict(config.PROCESSOR_SETTINGS, {"pack_size": 1})
 class TestBatchProcessing(unittest.TestCase):
     def test_batch_execution(self):
         """
@@ -11,16 +13,15 @@ class TestBatchProcessing(unittest.TestCase):
         """
         
         # Mock DB
-        mock_db = MagicMock()
-        mock_response = MagicMock()
+        mock_db = AsyncMock()
         # Return 3 dummy jobs
-        mock_response.data = [
+        jobs = [
             {"id": "1", "description": "Job 1", "job_title": "Title 1"},
             {"id": "2", "description": "Job 2", "job_title": "Title 2"},
             {"id": "3", "description": "Job 3", "job_title": "Title 3"},
         ]
         # First call returns jobs, second call returns empty list to break loop
-        mock_db.supabase.table.return_value.select.return_value.is_.return_value.limit.return_value.execute.side_effect = [mock_response, MagicMock(data=[])]
+        mock_db.claim_jobs.side_effect = [jobs, []]
         
         # Mock Analyzer
         mock_analyzer = MagicMock()
@@ -28,7 +29,7 @@ class TestBatchProcessing(unittest.TestCase):
         
         # Patch the classes in the module
         import scripts.job_processor
-        scripts.job_processor.JobDatabase = MagicMock(return_value=mock_db)
+        scripts.job_processor.create_async_storage = AsyncMock(return_value=mock_db)
         scripts.job_processor.JobAnalyzer = MagicMock(return_value=mock_analyzer)
         
         # Run the async function
@@ -36,7 +37,7 @@ class TestBatchProcessing(unittest.TestCase):
         
         # Verify
         self.assertEqual(mock_analyzer.analyze_job_description_async.call_count, 3)
-        self.assertEqual(mock_db.update_llm_analysis.call_count, 3)
+        self.assertEqual(mock_db.update_llm_analysis.await_count, 3)
         print("Batch processing test passed: 3 jobs processed concurrently.")
 
 if __name__ == "__main__":
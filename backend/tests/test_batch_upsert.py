@@ -0,0 +1,222 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, patch
+from db.database import JobDatabase
+from scrapers.job_buffer import JobBuffer
+
+def make_db(existing_rows):
+    with patch('db.database.create_client'), patch.dict('os.environ', {"SUPABASE_URL": "http://db", "SUPABASE_KEY": "key"}):
+        db = JobDatabase()
+    # job_urls and job_lsh_buckets get their own (empty) mocks
+    tables = {"job_postings": MagicMock()}
+    db.supabase.table.side_effect = lambda name: tables.setdefault(name, MagicMock())
+    table = tables["job_postings"]
+    table.select.return_value.in_.return_value.execute.return_value = MagicMock(data=existing_rows)
+    table.insert.side_effect = lambda rows: MagicMock(execute=MagicMock(return_value=MagicMock(data=[dict(r, id=f"new-{i}") for i, r in enumerate(rows)])))
+    table.upsert.side_effect = lambda rows, on_conflict: MagicMock(execute=MagicMock(return_value=MagicMock(data=rows)))
+    return db, table
+
+class TestBatchUpsert(unittest.TestCase):
+    def test_upsert_jobs_merges_in_memory_and_writes_in_bulk(self):
+        """
+        Verifies that a batch costs one lookup plus one insert and one upsert request,
+        with the same merge semantics as upsert_job.
+        """
+        existing = {
+            "id": "42", "fingerprint": "acme|ml engineer", "job_title": "ML Engineer", "company": "Acme",
+            "locations": ["Sydney"], "platforms": ["seek"], "source_urls": ["https://seek/1"],
+            "description": "Old", "salary": "$100k", "seniority": "Senior", "llm_analysis": {"skills": {}},
+        }
+        db, table = make_db([existing])
+
+        saved = db.upsert_jobs([
+            {"job_title": "ML Engineer", "company": "Acme", "locations": ["Melbourne"], "source_urls": ["https://seek/2"],
+             "platforms": ["seek"], "description": "New"},
+            {"job_title": "Data Scientist", "company": "Beta", "locations": ["Perth"], "source_urls": ["https://seek/3"],
+             "platforms": ["seek"], "description": "DS"},
+            {"job_title": "data scientist ", "company": "BETA", "locations": ["Remote"], "source_urls": ["https://seek/4"],
+             "platforms": ["seek"], "salary": "$150k"},
+        ])
+
+        self.assertEqual(table.select.call_count, 1)
+        self.assertEqual(table.insert.call_count, 1)
+        self.assertEqual(table.upsert.call_count, 1)
+        self.assertEqual(len(saved), 2)
+
+        inserted = table.insert.call_args.args[0]
+        self.assertEqual(len(inserted), 1)
+        self.assertEqual(inserted[0]["fingerprint"], "beta|data scientist")
+        self.assertEqual(inserted[0]["job_title"], "Data Scientist")
+        self.assertEqual(sorted(inserted[0]["locations"]), ["Perth", "Remote"])
+        self.assertEqual(sorted(inserted[0]["source_urls"]), ["https://seek/3", "https://seek/4"])
+        self.assertEqual((inserted[0]["description"], inserted[0]["salary"]), ("DS", "$150k"))
+
+        updated = table.upsert.call_args.args[0]
+        self.assertEqual(table.upsert.call_args.kwargs["on_conflict"], "id")
+        self.assertEqual(updated[0]["id"], "42")
+        self.assertEqual(sorted(updated[0]["locations"]), ["Melbourne", "Sydney"])
+        self.assertEqual(sorted(updated[0]["source_urls"]), ["https://seek/1", "https://seek/2"])
+        self.assertEqual(updated[0]["description"], "New")
+        self.assertEqual(updated[0]["salary"], "$100k")
+        self.assertNotIn("llm_analysis", updated[0])
+
+    def test_upsert_jobs_merges_by_url_when_title_changed(self):
+        """A re-scraped listing with an edited title merges into the job owning its URL, as upsert_job does."""
+        existing = {
+            "id": "42", "fingerprint": "acme|ml engineer", "job_title": "ML Engineer", "company": "Acme",
+            "locations": ["Sydney"], "platforms": ["seek"], "source_urls": ["https://seek/1"], "description": "Old",
+        }
+        db, table = make_db([])
+        by_column = {"fingerprint": [], "id": [existing]}
+        table.select.return_value.in_.side_effect = lambda column, values: MagicMock(
+            execute=MagicMock(return_value=MagicMock(data=by_column[column])))
+        urls = db.supabase.table("job_urls")
+        urls.select.return_value.in_.return_value.execute.return_value = MagicMock(
+            data=[{"url_hash": db._url_hash("https://seek/1"), "url": "https://seek/1", "job_id": "42"}])
+
+        db.upsert_jobs([
+            {"job_title": "Senior ML Engineer", "company": "Acme", "source_urls": ["https://seek/1"],
+             "platforms": ["seek"], "description": "New"},
+            {"job_title": "Data Scientist", "company": "Beta", "source_urls": ["https://seek/3"], "platforms": ["seek"]},
+        ])
+
+        self.assertEqual(urls.select.return_value.in_.call_count, 1)
+        updated = table.upsert.call_args.args[0]
+        self.assertEqual([(row["id"], row["description"]) for row in updated], [("42", "New")])
+        self.assertEqual([row["fingerprint"] for row in table.insert.call_args.args[0]], ["beta|data scientist"])
+
+    def test_changed_description_resets_failed_jobs_in_a_separate_upsert(self):
+        """A bulk upsert nulls keys a row lacks, so only the reset rows carry processing state."""
+        rows = [
+            {"id": "1", "fingerprint": "acme|ml engineer", "job_title": "ML Engineer", "company": "Acme",
+             "source_urls": ["https://seek/1"], "description": "Old", "processing_status": "dead"},
+            {"id": "2", "fingerprint": "beta|data scientist", "job_title": "Data Scientist", "company": "Beta",
+             "source_urls": ["https://seek/2"], "description": "DS", "processing_status": "done"},
+        ]
+        db, table = make_db(rows)
+
+        db.upsert_jobs([
+            {"job_title": "ML Engineer", "company": "Acme", "source_urls": ["https://seek/1"], "description": "New"},
+            {"job_title": "Data Scientist", "company": "Beta", "source_urls": ["https://seek/2"], "description": "DS v2"},
+        ])
+
+        self.assertEqual(table.upsert.call_count, 2)
+        reset, kept = sorted((call.args[0] for call in table.upsert.call_args_list), key=lambda group: group[0]["id"])
+        self.assertEqual([row["id"] for row in kept], ["2"])
+        self.assertNotIn("processing_status", kept[0])
+        self.assertEqual([row["id"] for row in reset], ["1"])
+        self.assertEqual((reset[0]["processing_status"], reset[0]["attempts"], reset[0]["last_error"]), ("pending", 0, None))
+
+    def test_merges_without_a_description_keep_the_stored_minhash(self):
+        rows = [
+            {"id": "1", "fingerprint": "acme|ml engineer", "job_title": "ML Engineer", "company": "Acme",
+             "source_urls": ["https://seek/1"], "description": "Old"},
+            {"id": "2", "fingerprint": "beta|data scientist", "job_title": "Data Scientist", "company": "Beta",
+             "source_urls": ["https://seek/2"], "description": "DS"},
+        ]
+        db, table = make_db(rows)
+
+        db.upsert_jobs([
+            {"job_title": "ML Engineer", "company": "Acme", "source_urls": ["https://seek/1"],
+             "description": "Build machine learning pipelines in Python and deploy models to production on AWS"},
+            {"job_title": "Data Scientist", "company": "Beta", "source_urls": ["https://seek/3"]},
+        ])
+
+        groups = [call.args[0] for call in table.upsert.call_args_list]
+        self.assertEqual(sorted(len(group) for group in groups), [1, 1])
+        for group in groups:
+            self.assertEqual(len({frozenset(row) for row in group}), 1)
+        unsigned = next(group[0] for group in groups if group[0]["id"] == "2")
+        self.assertNotIn("minhash", unsigned)
+
+    def test_merging_duplicates_carries_over_the_analysis(self):
+        rows = [
+            {"id": "1", "source_urls": ["https://seek/1"], "description": "Old", "llm_analysis": None, "processing_status": "retry"},
+            {"id": "2", "source_urls": ["https://seek/2"], "description": "Dup", "llm_analysis": {"skills": {}},
+             "processing_status": "done", "attempts": 0},
+        ]
+        db, table = make_db(rows)
+        table.update.return_value.eq.return_value.execute.return_value = MagicMock(data=[{"id": "1"}])
+
+        db.merge_duplicate_jobs("1", ["2"])
+
+        self.assertIn("llm_analysis", table.select.call_args.args[0])
+        payload = table.update.call_args.args[0]
+        self.assertEqual((payload["llm_analysis"], payload["processing_status"]), ({"skills": {}}, "done"))
+        self.assertNotIn("description", payload)
+
+    def test_analyses_are_written_in_chunked_bulk_requests(self):
+        db, table = make_db([])
+        db.supabase.rpc.side_effect = lambda name, params: MagicMock(
+            execute=MagicMock(return_value=MagicMock(data=len(params["updates"]))))
+
+        with patch('db.database.ANALYSIS_UPDATE_CHUNK_SIZE', 2):
+            written = db.update_llm_analyses([(f"job-{i}", {"skills": {}}) for i in range(5)])
+
+        self.assertEqual(written, 5)
+        self.assertEqual([call.args[1]["updates"][0]["id"] for call in db.supabase.rpc.call_args_list],
+                         ["job-0", "job-2", "job-4"])
+        self.assertEqual({call.args[0] for call in db.supabase.rpc.call_args_list}, {"update_llm_analyses"})
+        table.update.assert_not_called()
+
+    def test_buffer_flushes_by_size_and_on_close(self):
+        db = MagicMock()
+        db.upsert_jobs.side_effect = lambda jobs: [dict(job, id=job["n"]) for job in jobs]
+        notified = []
+
+        async def on_saved(job):
+            notified.append(job["id"])
+
+        async def run():
+            buffer = JobBuffer(db, flush_size=2, flush_interval=60, on_saved=on_saved)
+            buffer.start()
+            for n in range(5):
+                await buffer.add({"n": n})
+            await buffer.close()
+            return buffer
+
+        buffer = asyncio.run(run())
+
+        self.assertEqual([len(call.args[0]) for call in db.upsert_jobs.call_args_list], [2, 2, 1])
+        self.assertEqual(notified, [0, 1, 2, 3, 4])
+        self.assertEqual((buffer.saved_count, buffer.flush_count), (5, 3))
+
+    def test_failing_handler_does_not_drop_the_rest_of_the_batch(self):
+        db = MagicMock()
+        db.upsert_jobs.side_effect = lambda jobs: [dict(job, id=job["n"]) for job in jobs]
+        notified = []
+
+        async def on_saved(job):
+            if job["id"] == 0:
+                raise RuntimeError("claim failed")
+            notified.append(job["id"])
+
+        async def run():
+            buffer = JobBuffer(db, flush_size=3, flush_interval=60, on_saved=on_saved)
+            for n in range(3):
+                await buffer.add({"n": n})
+            return buffer
+
+        buffer = asyncio.run(run())
+
+        self.assertEqual(notified, [1, 2])
+        self.assertEqual(buffer.saved_count, 3)
+
+    def test_buffer_flushes_on_interval_and_falls_back_per_job(self):
+        db = MagicMock()
+        db.upsert_jobs.side_effect = RuntimeError("payload rejected")
+        db.upsert_job.side_effect = lambda job: dict(job, id=job["n"])
+
+        async def run():
+            buffer = JobBuffer(db, flush_size=100, flush_interval=0.01)
+            buffer.start()
+            await buffer.add({"n": 1})
+            await asyncio.sleep(0.05)
+            flushed_by_timer = db.upsert_job.call_count
+            await buffer.close()
+            return flushed_by_timer
+
+        self.assertEqual(asyncio.run(run()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, AsyncMock, patch
+from scrapers.seek_scraper import SeekScraper
+from scrapers.page_pool import PagePool
+from scrapers.rate_limiter import AdaptiveRateLimiter
+from scrapers.coordinator import CrawlCoordinator
+from scrapers.fetchers import PlaywrightFetcher
+import config
+
+class TestConcurrentScraping(unittest.TestCase):
+    @patch('scrapers.base_scraper.create_storage')
+    def test_job_details_fetched_concurrently(self, MockDB):
+        """
+        Verifies that detail fetches run in parallel on the page pool,
+        never using more pages than the pool holds.
+        """
+        scraper = SeekScraper()
+        in_flight = 0
+        peak = 0
+        processed = []
+
+        class FakePage:
+            def __init__(self, name):
+                self.name = name
+                self.url = None
+
+            async def goto(self, url, wait_until=None):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                self.url = url
+                in_flight -= 1
+
+            async def content(self):
+                processed.append((self.name, self.url))
+                return "<html></html>"
+
+        urls = [f"https://www.seek.com.au/job/{i}" for i in range(10)]
+        scraper.save_job = MagicMock(return_value={"id": "1"})
+
+        async def run():
+            pool = PagePool([FakePage("page-a"), FakePage("page-b"), FakePage("page-c")])
+            limiter = AdaptiveRateLimiter(initial_rate=1000, burst=10)
+            return await scraper._process_jobs(PlaywrightFetcher(pool, limiter), urls)
+
+        with patch.dict(config.SCRAPER_SETTINGS, {'concurrency': 5}):
+            saved = asyncio.run(run())
+
+        self.assertEqual(len(saved), 10)
+        self.assertEqual(sorted(url for _, url in processed), sorted(urls))
+        self.assertEqual(peak, 3)
+        self.assertEqual({page for page, _ in processed}, {"page-a", "page-b", "page-c"})
+
+    @patch('scrapers.base_scraper.create_storage')
+    @patch('scrapers.seek_scraper.async_playwright')
+    def test_terms_sharded_across_contexts(self, mock_pw, MockDB):
+        """
+        Verifies that search terms are split across browser contexts and that
+        a job listed under several terms is only fetched once.
+        """
+        with patch.dict(config.SCRAPER_SETTINGS, {'page_limit': 1, 'term_workers': 2, 'concurrency': 1}):
+            scraper = SeekScraper()
+            scraper.db.check_existing_urls.return_value = []
+            scraper.db.get_crawl_state.return_value = None
+            shared_url = "https://www.seek.com.au/job/1"
+            scraper._get_job_links = AsyncMock(return_value=[shared_url])
+            scraper._process_job = AsyncMock(return_value={"id": "1"})
+
+            mock_browser = MagicMock()
+            mock_browser.new_context = AsyncMock(return_value=MagicMock(new_page=AsyncMock()))
+            mock_browser.close = AsyncMock()
+            mock_pw.return_value.__aenter__.return_value.chromium.launch = AsyncMock(return_value=mock_browser)
+
+            coordinator = asyncio.run(scraper.scrape(search_terms=["A", "B", "C"]))
+
+            self.assertEqual(mock_browser.new_context.call_count, 2)
+            self.assertEqual(scraper._get_job_links.call_count, 3)
+            self.assertEqual(scraper._process_job.call_count, 1)
+            self.assertEqual(coordinator.totals(), {"found": 3, "claimed": 1, "saved": 1})
+
+    @patch('scrapers.base_scraper.create_storage')
+    @patch('scrapers.seek_scraper.async_playwright')
+    def test_planned_crawl_dedupes_globally(self, mock_pw, MockDB):
+        """
+        Verifies that planned mode gathers listings from every term first, checks them
+        against the DB in one call, and fetches each new job exactly once.
+        """
+        listings = {
+            "Machine-Learning": ["https://www.seek.com.au/job/1", "https://www.seek.com.au/job/2"],
+            "AI-Engineer": ["https://www.seek.com.au/job/2", "https://www.seek.com.au/job/3"],
+            "Data-Scientist": ["https://www.seek.com.au/job/3", "https://www.seek.com.au/job/4"],
+        }
+
+        async def fake_get_job_links(page, url):
+            term = url.split("/")[-1].split("-jobs")[0]
+            return listings[term] if "page=1&" in url else []
+
+        with patch.dict(config.SCRAPER_SETTINGS, {'page_limit': 2, 'term_workers': 2, 'concurrency': 2,
+                                                  'crawl_mode': 'planned', 'incremental': False}):
+            scraper = SeekScraper()
+            scraper.db.check_existing_urls.return_value = ["https://www.seek.com.au/job/4"]
+            scraper._get_job_links = AsyncMock(side_effect=fake_get_job_links)
+            scraper._process_job = AsyncMock(return_value={"id": "saved"})
+
+            mock_browser = MagicMock()
+            mock_browser.new_context = AsyncMock(return_value=MagicMock(new_page=AsyncMock()))
+            mock_browser.close = AsyncMock()
+            mock_pw.return_value.__aenter__.return_value.chromium.launch = AsyncMock(return_value=mock_browser)
+
+            coordinator = asyncio.run(scraper.scrape(search_terms=["Machine Learning", "AI Engineer", "Data Scientist"]))
+
+        scraper.db.check_existing_urls.assert_called_once()
+        self.assertEqual(len(scraper.db.check_existing_urls.call_args.args[0]), 4)
+        fetched = sorted(call.args[1] for call in scraper._process_job.call_args_list)
+        self.assertEqual(fetched, [f"https://www.seek.com.au/job/{i}" for i in (1, 2, 3)])
+        self.assertEqual(coordinator.totals(), {"found": 6, "claimed": 3, "saved": 3})
+        self.assertEqual(coordinator.results["Machine Learning"]["claimed"], 2)
+
+    def test_coordinator_claims_each_url_once(self):
+        coordinator = CrawlCoordinator()
+        self.assertEqual(coordinator.claim(["a", "b"]), ["a", "b"])
+        self.assertEqual(coordinator.claim(["b", "c"]), ["c"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -93,34 +93,29 @@ class TestConfigIntegration(unittest.TestCase):
                 url = args[1]
                 self.assertIn("daterange=31", url)
 
-    @patch('scripts.job_processor.JobDatabase')
+    @patch('scripts.job_processor.create_async_storage')
     @patch('scripts.job_processor.JobAnalyzer')
     def test_processor_config_usage(self, MockAnalyzer, MockDB):
         """
         Verifies that JobProcessor uses values from config.py.
         """
-        with patch.dict(config.PROCESSOR_SETTINGS, {'batch_size': 15, 'model': 'test-model'}):
+        with patch.dict(config.PROCESSOR_SETTINGS, {'batch_size': 15, 'model': 'test-model', 'db_connections': 4}):
             # Mock DB response to be empty so it finishes immediately
-            mock_db_instance = MockDB.return_value
-            mock_response = MagicMock()
-            mock_response.data = []
-            mock_db_instance.supabase.table.return_value.select.return_value.is_.return_value.limit.return_value.execute.return_value = mock_response
-            
-            # Run process_jobs
-            asyncio.run(process_jobs_async(batch_size=None)) # Should use default from config if we modified the function to handle None, 
-            # but wait, the function signature is process_jobs_async(batch_size: int).
-            # The wrapper process_jobs() handles the default.
-            # Let's test process_jobs() wrapper or pass the config value manually if we were testing the script entry point.
-            # Actually, process_jobs() reads the config.
+            mock_db_instance = AsyncMock()
+            mock_db_instance.claim_jobs.return_value = []
+            MockDB.return_value = mock_db_instance
             
+            # process_jobs() reads the batch size from config
             from scripts.job_processor import process_jobs
             process_jobs()
             
             # Verify Analyzer was initialized with correct model
             MockAnalyzer.assert_called_with(model_name='test-model')
             
-            # Verify DB limit was called with batch_size 15
-            mock_db_instance.supabase.table.return_value.select.return_value.is_.return_value.limit.assert_called_with(15)
+            # Verify the pooled client size and the batch size 15 come from config
+            MockDB.assert_called_with(max_connections=4)
+            self.assertEqual(mock_db_instance.claim_jobs.await_args.args[1], 15)
+            mock_db_instance.close.assert_awaited_once()
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import asyncio
+import json
+import os
+import re
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from analyzers.analysis_cache import AnalysisCache
+from analyzers.job_analyzer import JobAnalyzer
+
+class RejectedRequest(Exception):
+    status_code = 400
+
+class TestDescriptionPacking(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        async def fake_llm(prompt):
+            text = prompt.to_string()
+            self.calls.append(text)
+            ids = re.findall(r'<job id="([^"]+)">', text)
+            if not ids and "Rejected" in text:
+                raise RejectedRequest("Error code: 400 - invalid request")
+            if not ids:
+                return AIMessage(content=json.dumps({"skills": {"technical_skills": ["Single"]}}))
+            # "bad" comes back malformed, so it has to be re-run on its own
+            output = [{"id": i, "analysis": "oops" if i == "bad" else {"skills": {"technical_skills": [i]}}}
+                      for i in ids]
+            return AIMessage(content=json.dumps(output))
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "dummy-key"}):
+            self.analyzer = JobAnalyzer(model_name="test-model", cache=AnalysisCache(), extractor_mode="off")
+        self.analyzer.llm = RunnableLambda(lambda prompt: None, afunc=fake_llm)
+
+    def test_packs_jobs_and_reruns_invalid_items(self):
+        items = [("a", "Python developer"), ("bad", "Data analyst"), ("c", "Cloud engineer"),
+                 ("d", "Python  developer"), ("e", "Nurse")]
+
+        results = asyncio.run(self.analyzer.analyze_job_descriptions_async(items, max_items=4, token_budget=1000))
+
+        # a/d share a description, so a, bad, c and e fit one pack; "bad" is retried alone
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.calls[0].count("</job>"), 4)
+        self.assertEqual(results["a"], {"skills": {"technical_skills": ["a"]}})
+        self.assertEqual(results["d"], results["a"])
+        self.assertEqual(results["bad"], {"skills": {"technical_skills": ["Single"]}})
+        self.assertEqual(results["e"]["skills"]["technical_skills"], ["e"])
+
+        # Everything is cached now
+        again = asyncio.run(self.analyzer.analyze_job_descriptions_async(items[:3], max_items=4, token_budget=1000))
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(again["c"], results["c"])
+
+    def test_failed_single_call_returns_its_error(self):
+        items = [("a", "Python developer"), ("bad", "Rejected data analyst")]
+
+        results = asyncio.run(self.analyzer.analyze_job_descriptions_async(items, max_items=4, token_budget=1000))
+
+        self.assertEqual(results["a"], {"skills": {"technical_skills": ["a"]}})
+        self.assertIsInstance(results["bad"], RejectedRequest)
+        with self.assertRaises(RejectedRequest):
+            asyncio.run(self.analyzer.analyze_job_description_async("Rejected data analyst"))
+
+    def test_pack_respects_size_and_token_budget(self):
+        items = [("1", "x" * 400), ("2", "x" * 400), ("3", "x" * 4000), ("4", "x" * 40), ("5", "x" * 40)]
+
+        packs = self.analyzer.pack(items, max_items=3, token_budget=250)
+
+        # 100 estimated tokens each for 1 and 2; the oversized 3 goes alone
+        self.assertEqual([[i for i, _ in pack] for pack in packs], [["1", "2"], ["3"], ["4", "5"]])
+
+if __name__ == '__main__':
+    unittest.main()
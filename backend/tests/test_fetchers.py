@@ -0,0 +1,92 @@
+import os
+import unittest
+import asyncio
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from unittest.mock import patch
+from scrapers.fetchers import BaseFetcher, HttpFetcher, FallbackFetcher
+from scrapers.seek_scraper import SeekScraper
+from scrapers.rate_limiter import AdaptiveRateLimiter
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+class StubBrowserFetcher(BaseFetcher):
+    """Stands in for Playwright by returning a recorded, fully rendered page."""
+    name = "playwright"
+
+    def __init__(self):
+        self.calls = []
+
+    async def fetch(self, url):
+        self.calls.append(url)
+        with open(os.path.join(FIXTURES_DIR, "seek_job.html")) as f:
+            return f.read()
+
+class TestFetchers(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        handler = partial(QuietHandler, directory=FIXTURES_DIR)
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    @patch('scrapers.base_scraper.create_storage')
+    def test_http_first_with_browser_fallback(self, MockDB):
+        """
+        Server-rendered pages are served over plain HTTP; pages missing the
+        job detail elements escalate to the browser engine.
+        """
+        scraper = SeekScraper()
+        browser = StubBrowserFetcher()
+        saved = []
+        scraper.save_job = lambda job: saved.append(job) or job
+
+        async def run():
+            fetcher = FallbackFetcher([HttpFetcher(AdaptiveRateLimiter(initial_rate=100)), browser], scraper.is_complete_job_page)
+            try:
+                await scraper._process_jobs(fetcher, [
+                    f"{self.base_url}/seek_job.html",
+                    f"{self.base_url}/seek_job_shell.html",
+                ])
+            finally:
+                await fetcher.engines[0].close()
+            return fetcher
+
+        fetcher = asyncio.run(run())
+
+        self.assertEqual(fetcher.stats(), {"http": 1, "playwright": 1})
+        self.assertEqual(browser.calls, [f"{self.base_url}/seek_job_shell.html"])
+        self.assertEqual(len(saved), 2)
+        job = saved[0]
+        self.assertEqual(job["job_title"], "Machine Learning Engineer")
+        self.assertEqual(job["company"], "Acme Analytics")
+        self.assertEqual(job["locations"], ["Sydney NSW"])
+        self.assertEqual(job["salary"], "$150,000 – $170,000 + super")
+        self.assertIn("5+ years of experience with Python and PyTorch", job["description"])
+
+    def test_missing_page_counts_as_failed(self):
+        async def run():
+            fetcher = FallbackFetcher([HttpFetcher(AdaptiveRateLimiter(initial_rate=100))], lambda html: True)
+            try:
+                html = await fetcher.fetch(f"{self.base_url}/does_not_exist.html")
+            finally:
+                await fetcher.engines[0].close()
+            return fetcher, html
+
+        fetcher, html = asyncio.run(run())
+        self.assertIsNone(html)
+        self.assertEqual(fetcher.stats(), {"failed": 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, AsyncMock, patch
+from scrapers.seek_scraper import SeekScraper
+from scrapers.coordinator import CrawlCoordinator
+from scrapers.job_buffer import JobBuffer
+import config
+
+def seek_url(listing_id):
+    return f"https://www.seek.com.au/job/{listing_id}"
+
+class TestIncrementalCrawl(unittest.TestCase):
+    def make_scraper(self, MockDB, pages, state):
+        scraper = SeekScraper()
+        scraper.db.get_crawl_state.return_value = state
+        scraper.db.check_existing_urls.side_effect = lambda links: [l for l in links if l.endswith("/101")]
+        scraper._get_job_links = AsyncMock(side_effect=pages)
+        scraper._process_jobs = AsyncMock(side_effect=lambda fetcher, urls: [{"url": u} for u in urls])
+        return scraper
+
+    @patch('scrapers.base_scraper.create_storage')
+    def test_stops_at_page_of_known_jobs(self, MockDB):
+        """
+        Pagination stops once a page only has jobs in the DB or at/below the watermark,
+        and the watermark advances to the newest listing seen.
+        """
+        last_run = (datetime.now(timezone.utc) - timedelta(hours=30)).isoformat()
+        pages = [
+            [seek_url(205), seek_url(204)],
+            [seek_url(150), seek_url(101)],  # 150 is below the watermark, 101 is in the DB
+            [seek_url(99)],
+        ]
+        scraper = self.make_scraper(MockDB, pages, {"newest_listing_id": 200, "last_success_at": last_run})
+
+        with patch.dict(config.SCRAPER_SETTINGS, {'incremental': True, 'days_ago': 7, 'initial_days_ago': 31}):
+            asyncio.run(scraper._crawl_term(MagicMock(), MagicMock(), "Data Scientist", 5, CrawlCoordinator()))
+
+        self.assertEqual(scraper._get_job_links.call_count, 2)
+        first_url = scraper._get_job_links.call_args_list[0].args[1]
+        self.assertIn("daterange=3", first_url)  # 30 hours ago -> 2 days, plus one day margin
+        self.assertIn("sortmode=ListedDate", first_url)
+
+        platform, term, newest, _ = scraper.db.save_crawl_state.call_args.args
+        self.assertEqual((platform, term, newest), ("seek", "Data Scientist", 205))
+
+    @patch('scrapers.base_scraper.create_storage')
+    def test_failed_listing_page_keeps_old_state(self, MockDB):
+        scraper = self.make_scraper(MockDB, [None], None)
+
+        with patch.dict(config.SCRAPER_SETTINGS, {'incremental': True, 'days_ago': 7}):
+            asyncio.run(scraper._crawl_term(MagicMock(), MagicMock(), "Data Scientist", 3, CrawlCoordinator()))
+
+        self.assertIn("daterange=7", scraper._get_job_links.call_args.args[1])
+        scraper.db.save_crawl_state.assert_not_called()
+
+    @patch('scrapers.base_scraper.create_storage')
+    def test_failed_job_saves_keep_old_watermark(self, MockDB):
+        """A listing that couldn't be fetched or saved must not end up below the watermark."""
+        last_run = (datetime.now(timezone.utc) - timedelta(hours=30)).isoformat()
+        scraper = self.make_scraper(MockDB, [[seek_url(205), seek_url(204)], []],
+                                    {"newest_listing_id": 200, "last_success_at": last_run})
+        scraper._process_jobs = AsyncMock(side_effect=lambda fetcher, urls: [{"url": urls[0]}])
+
+        with patch.dict(config.SCRAPER_SETTINGS, {'incremental': True, 'days_ago': 7, 'initial_days_ago': 31}):
+            asyncio.run(scraper._crawl_term(MagicMock(), MagicMock(), "Data Scientist", 5, CrawlCoordinator()))
+
+        scraper.db.save_crawl_state.assert_not_called()
+
+    @patch('scrapers.base_scraper.create_storage')
+    def test_failed_buffered_saves_keep_old_watermark(self, MockDB):
+        """submit_job only acknowledges buffered jobs; a write that fails at flush time still holds the watermark."""
+        last_run = (datetime.now(timezone.utc) - timedelta(hours=30)).isoformat()
+        scraper = self.make_scraper(MockDB, [[seek_url(205), seek_url(204)], []],
+                                    {"newest_listing_id": 200, "last_success_at": last_run})
+        scraper.db.upsert_jobs.side_effect = RuntimeError("batch rejected")
+        scraper.db.upsert_job.side_effect = lambda job: job if job["source_urls"] != [seek_url(204)] else 1 / 0
+
+        async def process_jobs(fetcher, urls):
+            return [await scraper.submit_job({"job_title": "DS", "company": "Acme", "source_urls": [url]}) for url in urls]
+
+        async def crawl():
+            scraper.buffer = JobBuffer(scraper.db, flush_size=25, flush_interval=60)
+            await scraper._crawl_term(MagicMock(), MagicMock(), "Data Scientist", 5, CrawlCoordinator())
+
+        scraper._process_jobs = AsyncMock(side_effect=process_jobs)
+        with patch.dict(config.SCRAPER_SETTINGS, {'incremental': True, 'days_ago': 7, 'initial_days_ago': 31}):
+            asyncio.run(crawl())
+
+        self.assertEqual(scraper.db.upsert_job.call_count, 2)
+        scraper.db.save_crawl_state.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+import config
+from db.async_database import AsyncStorageAdapter
+from db.sqlite_database import SQLiteJobDatabase
+from scripts.job_processor import run_batches
+
+class TestJobLeases(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jobs.db")
+        self.db = SQLiteJobDatabase(self.path)
+        self.ids = [self.db.upsert_job({"job_title": f"Engineer {i}", "company": "Acme",
+                                        "source_urls": [f"https://seek/{i}"], "description": f"Job {i}"})["id"]
+                    for i in range(40)]
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_concurrent_claims_never_overlap(self):
+        # Separate connections behave like separate processor instances
+        instances = [SQLiteJobDatabase(self.path) for _ in range(4)]
+        claims = {i: [] for i in range(4)}
+
+        def claim(i):
+            while True:
+                jobs = instances[i].claim_jobs(f"worker-{i}", 3)
+                if not jobs:
+                    return
+                claims[i].extend(job["id"] for job in jobs)
+
+        threads = [threading.Thread(target=claim, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for instance in instances:
+            instance.close()
+
+        claimed = [job_id for ids in claims.values() for job_id in ids]
+        self.assertEqual(sorted(claimed), sorted(self.ids))
+        self.assertEqual(len(set(claimed)), len(claimed))
+
+    def test_expired_leases_are_reclaimed_and_stale_failures_ignored(self):
+        first = self.db.claim_jobs("worker-a", 1, lease_seconds=0)
+        # An expired lease is reclaimed; an active one keeps the job from other workers
+        reclaimed = self.db.claim_jobs("worker-b", 1)
+        self.assertEqual(reclaimed[0]["id"], first[0]["id"])
+        self.assertNotEqual(self.db.claim_jobs("worker-c", 1)[0]["id"], first[0]["id"])
+
+        self.db.update_llm_analysis(first[0]["id"], {"skills": {}})
+        # worker-a finishing late can't turn the analyzed job back into a retry
+        self.assertEqual(self.db.record_analysis_failure(first[0]["id"], "timeout"), {})
+        state = self.db.get_all_jobs(100, columns=("id", "processing_status", "claimed_by"))
+        self.assertIn({"id": first[0]["id"], "processing_status": "done", "claimed_by": None}, state)
+
+        self.assertEqual(self.db.release_jobs("worker-c", [job["id"] for job in self.db.claim_jobs("worker-c", 2)]), 2)
+        self.assertEqual(self.db.release_jobs("worker-a", [self.ids[5]]), 0)
+
+    @patch.dict(config.PROCESSOR_SETTINGS, {"pack_size": 1})
+    def test_processor_instances_share_the_backlog(self):
+        analyzed = []
+
+        async def analyze(description):
+            analyzed.append(description)
+            await asyncio.sleep(0.001)
+            return {"skills": {}}
+
+        analyzer = MagicMock()
+        analyzer.analyze_job_description_async = AsyncMock(side_effect=analyze)
+        instances = [SQLiteJobDatabase(self.path) for _ in range(3)]
+
+        async def run():
+            return await asyncio.gather(*(
+                run_batches(AsyncStorageAdapter(instance), analyzer, batch_size=4, worker_id=f"node-{i}")
+                for i, instance in enumerate(instances)
+            ))
+
+        stats = asyncio.run(run())
+        for instance in instances:
+            instance.close()
+
+        self.assertEqual(sum(s["analyzed"] for s in stats), 40)
+        self.assertEqual(sorted(analyzed), sorted(f"Job {i}" for i in range(40)))
+        self.assertEqual(self.db.get_unanalyzed_jobs(100), [])
+
+    @unittest.skipUnless(hasattr(time, "tzset"), "needs time.tzset")
+    def test_claims_respect_backoff_on_a_non_utc_host(self):
+        tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Australia/Sydney"
+        time.tzset()
+        try:
+            self.db.record_analysis_failure(self.ids[0], "timeout")
+            claimed = [job["id"] for job in self.db.claim_jobs("worker-a", 100)]
+            lease = self.db.get_all_jobs(100, columns=("id", "lease_expires_at"))
+        finally:
+            if tz is None:
+                os.environ.pop("TZ", None)
+            else:
+                os.environ["TZ"] = tz
+            time.tzset()
+
+        self.assertNotIn(self.ids[0], claimed)
+        self.assertEqual(len(claimed), 39)
+        self.assertTrue(all(job["lease_expires_at"].endswith("+00:00") for job in lease if job["id"] in claimed))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from db.database import JobDatabase
+from db.sqlite_database import SQLiteJobDatabase
+from db.storage import ANALYSIS_COLUMNS, SUMMARY_COLUMNS
+
+class TestKeysetPagination(unittest.TestCase):
+    def test_sqlite_iter_jobs_pages_through_ties_without_offsets(self):
+        db = SQLiteJobDatabase()
+        for i in range(7):
+            db.upsert_job({"job_title": f"Job {i}", "company": "Acme", "source_urls": [f"https://seek/{i}"], "description": f"Role {i}: " + "details " * 200})
+        # Same created_at for several rows: the id breaks the tie
+        db.conn.execute("update job_postings set created_at = '2026-01-01T00:00:00' where job_title in ('Job 2', 'Job 3', 'Job 4')")
+
+        rows = list(db.iter_jobs(columns=("job_title",), page_size=2))
+
+        self.assertEqual(sorted(r["job_title"] for r in rows), [f"Job {i}" for i in range(7)])
+        self.assertEqual(len({r["id"] for r in rows}), 7)
+        self.assertEqual(set(rows[0]), {"job_title", "created_at", "id"})
+        self.assertNotIn("description", db.get_all_jobs(columns=SUMMARY_COLUMNS)[0])
+        self.assertEqual(set(db.get_unanalyzed_jobs(1)[0]), set(ANALYSIS_COLUMNS))
+        with self.assertRaises(ValueError):
+            db.get_all_jobs(columns=("id; drop table job_postings",))
+
+    def test_supabase_iter_jobs_uses_created_at_id_cursor(self):
+        with patch('db.database.create_client'), patch.dict('os.environ', {"SUPABASE_URL": "http://db", "SUPABASE_KEY": "key"}):
+            db = JobDatabase()
+        query = MagicMock()
+        db.supabase.table.return_value.select.return_value.order.return_value.order.return_value.limit.return_value = query
+        query.or_.return_value = query
+        query.execute.side_effect = [
+            MagicMock(data=[{"id": "a", "created_at": "2026-01-01T00:00:00+00:00"}, {"id": "b", "created_at": "2026-01-02T00:00:00+00:00"}]),
+            MagicMock(data=[{"id": "c", "created_at": "2026-01-03T00:00:00+00:00"}]),
+        ]
+
+        rows = list(db.iter_jobs(columns=("source_urls",), page_size=2))
+
+        self.assertEqual([r["id"] for r in rows], ["a", "b", "c"])
+        db.supabase.table.return_value.select.assert_called_with("source_urls, created_at, id")
+        query.or_.assert_called_once_with(
+            'created_at.gt."2026-01-02T00:00:00+00:00",and(created_at.eq."2026-01-02T00:00:00+00:00",id.gt.b)')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import asyncio
+import time
+from unittest.mock import MagicMock, AsyncMock, patch
+import config
+from analyzers.llm_limiter import LLMLimiter, MinuteBudget
+from scripts.job_processor import run_batches
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+class TestLLMLimiter(unittest.TestCase):
+    def test_retries_throttling_and_adapts_concurrency(self):
+        limiter = LLMLimiter(initial_concurrency=8, max_concurrency=8, base_delay=0.001, cooldown=0)
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) <= 2:
+                raise FakeAPIError(429)
+            return "ok"
+
+        self.assertEqual(asyncio.run(limiter.call(flaky)), "ok")
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(limiter.limit, 2 + 1 / 2)  # 8 -> 4 -> 2, then one success adds 1/window
+        self.assertEqual((limiter.stats["retries"], limiter.stats["throttled"]), (2, 2))
+
+        async def broken():
+            raise FakeAPIError(400)
+
+        with self.assertRaises(FakeAPIError):
+            asyncio.run(limiter.call(broken))
+        self.assertEqual(limiter.stats["failed"], 1)
+
+    def test_concurrency_window_caps_calls_in_flight(self):
+        limiter = LLMLimiter(initial_concurrency=3, max_concurrency=3)
+        running, peak = [0], [0]
+
+        async def call():
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+
+        async def run():
+            await asyncio.gather(*(limiter.call(call) for _ in range(12)))
+
+        asyncio.run(run())
+        self.assertEqual(peak[0], 3)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_minute_budget_waits_for_refill(self):
+        budget = MinuteBudget(6000)  # 100 per second
+
+        async def run():
+            await budget.take(6000)
+            start = time.monotonic()
+            await budget.take(10)
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.08)
+
+@patch.dict(config.PROCESSOR_SETTINGS, {"pack_size": 1})
+class TestSlidingWindow(unittest.TestCase):
+    def test_slow_job_does_not_hold_back_the_batch(self):
+        jobs = [{"id": f"job-{i}", "description": "slow" if i == 0 else f"Job {i}"} for i in range(6)]
+        done, claimed, fetches = set(), set(), []
+
+        async def claim_jobs(worker_id, limit):
+            fetches.append(limit)
+            claimable = [job for job in jobs if job["id"] not in done and job["id"] not in claimed][:limit]
+            claimed.update(job["id"] for job in claimable)
+            return claimable
+
+        async def update_llm_analysis(job_id, analysis):
+            done.add(job_id)
+
+        async def analyze(description):
+            await asyncio.sleep(0.2 if description == "slow" else 0.01)
+            return {} if description == "Job 5" else {"skills": {}}
+
+        db = AsyncMock()
+        db.claim_jobs.side_effect = claim_jobs
+        db.update_llm_analysis.side_effect = update_llm_analysis
+        db.record_analysis_failure.return_value = {}
+        analyzer = MagicMock()
+        analyzer.analyze_job_description_async = AsyncMock(side_effect=analyze)
+
+        start = time.monotonic()
+        stats = asyncio.run(run_batches(db, analyzer, batch_size=2))
+
+        self.assertEqual(stats, {"analyzed": 5, "failed": 1})
+        # Everything else finished while the slow job was in flight, and the failed job wasn't re-fetched
+        self.assertLess(time.monotonic() - start, 0.35)
+        self.assertEqual(analyzer.analyze_job_description_async.await_count, 6)
+        self.assertGreater(len(fetches), 2)
+
+if __name__ == '__main__':
+    unittest.main()
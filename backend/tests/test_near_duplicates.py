@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import patch
+from db.near_duplicates import MinHasher, LSHIndex, shingles, similarity
+from db.sqlite_database import SQLiteJobDatabase
+from scripts.cluster_duplicates import cluster_jobs
+import config
+
+DESCRIPTION = (
+    "We are looking for a Senior Machine Learning Engineer to join our platform team in Sydney. "
+    "You will design, train and deploy models that power search and recommendations for millions of users. "
+    "You have five or more years of experience with Python, PyTorch and distributed data processing, "
+    "and you enjoy mentoring other engineers. We offer hybrid work, an annual learning budget and equity."
+)
+EDITED = DESCRIPTION.replace("an annual learning budget", "a generous annual learning budget")
+UNRELATED = (
+    "Our accounting team needs a graduate accountant to prepare monthly reconciliations, support the audit, "
+    "and help with payroll. Experience with Xero is a plus. Based in Perth with flexible hours."
+)
+
+def job(title, company, url, description):
+    return {"job_title": title, "company": company, "source_urls": [url], "locations": ["Sydney"],
+            "platforms": ["seek"], "description": description}
+
+class TestNearDuplicates(unittest.TestCase):
+    def test_signatures_estimate_jaccard_and_lsh_finds_candidates(self):
+        hasher = MinHasher(num_perm=128, shingle_size=5)
+        a, b, c = hasher.signature(DESCRIPTION), hasher.signature(EDITED), hasher.signature(UNRELATED)
+        exact = len(shingles(DESCRIPTION, 5) & shingles(EDITED, 5)) / len(shingles(DESCRIPTION, 5) | shingles(EDITED, 5))
+
+        self.assertAlmostEqual(similarity(a, b), exact, delta=0.12)
+        self.assertLess(similarity(a, c), 0.1)
+        self.assertIsNone(hasher.signature("   "))
+
+        lsh = LSHIndex(bands=16, rows=8)
+        lsh.add("original", a)
+        self.assertEqual(lsh.candidates(b), {"original"})
+        self.assertEqual(lsh.candidates(c), set())
+
+    def test_upsert_merges_reworded_title_with_same_description(self):
+        db = SQLiteJobDatabase()
+        first = db.upsert_job(job("Senior ML Engineer", "Acme", "https://seek/1", DESCRIPTION))
+        second = db.upsert_job(job("Senior Machine Learning Engineer – Sydney", "Acme", "https://seek/2", EDITED))
+        other_company = db.upsert_job(job("Senior ML Engineer", "Beta", "https://seek/3", DESCRIPTION))
+        batch = db.upsert_jobs([job("ML Engineer (Senior)", "ACME", "https://seek/4", DESCRIPTION),
+                                job("Graduate Accountant", "Acme", "https://seek/5", UNRELATED)])
+
+        self.assertEqual(second["id"], first["id"])
+        self.assertEqual(sorted(second["source_urls"]), ["https://seek/1", "https://seek/2"])
+        self.assertNotEqual(other_company["id"], first["id"])
+        self.assertEqual(batch[0]["id"], first["id"])
+        # Only one analysis is needed for the Acme ML role
+        self.assertEqual(len(db.get_unanalyzed_jobs(10)), 3)
+
+    def test_batch_mode_backfills_and_merges_existing_table(self):
+        db = SQLiteJobDatabase()
+        with patch.dict(config.NEAR_DUPLICATE_SETTINGS, {"enabled": False}):
+            ids = [db.upsert_job(job(title, "Acme", f"https://seek/{i}", text))["id"] for i, (title, text) in enumerate([
+                ("Senior ML Engineer", DESCRIPTION), ("Senior Machine Learning Engineer", EDITED), ("Accountant", UNRELATED)])]
+
+        clusters = cluster_jobs(db, backfill=True, merge=True)
+
+        self.assertEqual(clusters, [ids[:2]])
+        remaining = {row["id"]: row for row in db.get_all_jobs()}
+        self.assertEqual(set(remaining), {ids[0], ids[2]})
+        self.assertEqual(sorted(remaining[ids[0]]["source_urls"]), ["https://seek/0", "https://seek/1"])
+        self.assertEqual(db.check_existing_urls(["https://seek/1"]), ["https://seek/1"])
+        # Backfilled buckets let new postings match the older rows
+        self.assertEqual(db.upsert_job(job("ML Eng", "Acme", "https://seek/9", DESCRIPTION))["id"], ids[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, AsyncMock, patch
+import config
+from db.async_database import AsyncStorageAdapter
+from db.sqlite_database import SQLiteJobDatabase
+from scripts.pipeline import AnalysisPipeline
+
+class FakeScraper:
+    """Saves a job every few milliseconds and reports it to the pipeline."""
+    def __init__(self, jobs, events):
+        self.db = MagicMock()
+        self.saved_job_handlers = []
+        self.jobs = jobs
+        self.events = events
+
+    async def scrape(self, initial_run=False):
+        for job in self.jobs:
+            await asyncio.sleep(0.01)
+            self.events.append(("saved", job["id"]))
+            for handler in self.saved_job_handlers:
+                await handler(job)
+        self.events.append(("scrape_done", None))
+
+@patch.dict(config.PROCESSOR_SETTINGS, {"pack_size": 1})
+class TestPipeline(unittest.TestCase):
+    def test_analysis_overlaps_crawl_and_drains(self):
+        """
+        Verifies that jobs are analyzed while the crawl is still running, that backlog
+        jobs from the DB are included, and that every queued job is analyzed before exit.
+        """
+        events = []
+        scraped = [{"id": f"new-{i}", "description": f"Job {i}", "llm_analysis": None} for i in range(4)]
+        already_analyzed = {"id": "done", "description": "Old", "llm_analysis": {"skills": {}}}
+        scraper = FakeScraper(scraped + [already_analyzed], events)
+        backlog = [{"id": "old-1", "description": "Old job"}, {"id": "new-0", "description": "Job 0"}]
+        db = AsyncMock()
+        db.claim_jobs.side_effect = lambda worker_id, limit: [backlog.pop(0) for _ in range(min(limit, len(backlog)))]
+
+        async def analyze(description):
+            events.append(("analyzed", description))
+            await asyncio.sleep(0.005)
+            return {"skills": {"technical_skills": ["Python"]}}
+
+        analyzer = MagicMock()
+        analyzer.analyze_job_description_async = AsyncMock(side_effect=analyze)
+
+        async def run():
+            pipeline = AnalysisPipeline(scraper, analyzer, db, workers=2, queue_size=1, backlog_limit=10)
+            return await pipeline.run()
+
+        stats = asyncio.run(run())
+
+        # new-0 is both scraped and in the backlog; whichever source queues it first wins
+        self.assertEqual(stats["scraped"] + stats["backlog"], 5)
+        self.assertEqual((stats["analyzed"], stats["failed"]), (5, 0))
+        analyzed_ids = sorted(call.args[0] for call in db.update_llm_analysis.await_args_list)
+        self.assertEqual(analyzed_ids, ["new-0", "new-1", "new-2", "new-3", "old-1"])
+        first_analysis = next(i for i, e in enumerate(events) if e[0] == "analyzed")
+        self.assertLess(first_analysis, events.index(("scrape_done", None)))
+
+    def test_shutdown_stops_producers_and_drains_queue(self):
+        scraper = FakeScraper([{"id": f"job-{i}", "description": "Job"} for i in range(50)], [])
+        db = AsyncMock()
+        db.claim_jobs.return_value = []
+        analyzer = MagicMock()
+        analyzer.analyze_job_description_async = AsyncMock(return_value={"skills": {}})
+
+        async def run():
+            pipeline = AnalysisPipeline(scraper, analyzer, db, workers=1, queue_size=2, backlog_limit=10)
+            asyncio.get_running_loop().call_later(0.05, pipeline.shutdown)
+            return await pipeline.run()
+
+        stats = asyncio.run(run())
+
+        self.assertLess(stats["scraped"], 50)
+        self.assertEqual(stats["analyzed"], stats["scraped"])
+
+@patch.dict(config.PROCESSOR_SETTINGS, {"pack_size": 1})
+class TestPipelineLeases(unittest.TestCase):
+    def setUp(self):
+        self.db = SQLiteJobDatabase()
+        self.jobs = [self.db.upsert_job({"job_title": f"Engineer {i}", "company": "Acme",
+                                         "source_urls": [f"https://seek/{i}"], "description": f"Job {i}"})
+                     for i in range(6)]
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_scraped_jobs_are_leased_before_analysis(self):
+        # Another processor instance already holds job 0
+        self.assertEqual(len(self.db.claim_jobs_by_id("node-b", [self.jobs[0]["id"]])), 1)
+        analyzed = []
+
+        async def analyze(description):
+            analyzed.append(description)
+            # While the pipeline analyzes a job, no other instance can claim it
+            job_id = next(job["id"] for job in self.jobs if job["description"] == description)
+            self.assertEqual(self.db.claim_jobs_by_id("node-b", [job_id]), [])
+            return {"skills": {}}
+
+        analyzer = MagicMock()
+        analyzer.analyze_job_description_async = AsyncMock(side_effect=analyze)
+        pipeline = AnalysisPipeline(FakeScraper(self.jobs, []), analyzer, AsyncStorageAdapter(self.db),
+                                    workers=2, queue_size=2, backlog_limit=0, worker_id="node-a")
+        stats = asyncio.run(pipeline.run())
+
+        self.assertEqual((stats["scraped"], stats["analyzed"]), (5, 5))
+        self.assertEqual(sorted(analyzed), [f"Job {i}" for i in range(1, 6)])
+
+    def test_backlog_is_claimed_as_queue_space_frees_up(self):
+        analyzer = MagicMock()
+        analyzer.analyze_job_description_async = AsyncMock(return_value={"skills": {}})
+        db = AsyncStorageAdapter(self.db)
+        limits = []
+        claim_jobs = db.claim_jobs
+
+        async def claim(worker_id, limit):
+            limits.append(limit)
+            return await claim_jobs(worker_id, limit)
+
+        db.claim_jobs = claim
+        pipeline = AnalysisPipeline(FakeScraper([], []), analyzer, db, workers=1, queue_size=2, backlog_limit=10,
+                                    worker_id="node-a")
+        stats = asyncio.run(pipeline.run())
+
+        self.assertEqual((stats["backlog"], stats["analyzed"]), (6, 6))
+        # Never more leased jobs waiting than the queue holds, so leases can't expire in it
+        self.assertGreater(len(limits), 1)
+        self.assertLessEqual(max(limits), 2)
+
+    def test_shutdown_releases_unqueued_backlog(self):
+        async def analyze(description):
+            await asyncio.sleep(0.02)
+            return {"skills": {}}
+
+        analyzer = MagicMock()
+        analyzer.analyze_job_description_async = AsyncMock(side_effect=analyze)
+
+        async def run():
+            pipeline = AnalysisPipeline(FakeScraper([], []), analyzer, AsyncStorageAdapter(self.db),
+                                        workers=1, queue_size=1, backlog_limit=10, worker_id="node-a")
+            asyncio.get_running_loop().call_later(0.03, pipeline.shutdown)
+            return await pipeline.run()
+
+        stats = asyncio.run(run())
+
+        self.assertLess(stats["analyzed"], 6)
+        rows = self.db.get_all_jobs(columns=("id", "processing_status", "claimed_by"))
+        self.assertEqual([row for row in rows if row["processing_status"] == "pending" and row["claimed_by"]], [])
+        self.assertEqual(len(self.db.claim_jobs("node-b", 10)), 6 - stats["analyzed"])
+
+if __name__ == '__main__':
+    unittest.main()
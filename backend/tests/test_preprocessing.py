@@ -0,0 +1,63 @@
+import unittest
+import asyncio
+import json
+import os
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from analyzers.analysis_cache import AnalysisCache
+from analyzers.job_analyzer import JobAnalyzer
+from analyzers.preprocessing import BoilerplateStore, DescriptionPreprocessor, TokenCounter
+
+EEO = "We are an equal opportunity employer and value diversity at our company. We do not discriminate."
+FOOTER = "To apply, click APPLY NOW and send your resume to careers@agency.example. Only shortlisted candidates will be contacted."
+
+def posting(i):
+    return "\n".join([f"Data Engineer {i}", "Requirements:", f"Build pipeline number {i} in Python and maintain our warehouse of {i} tables.",
+                      "Python", EEO, FOOTER])
+
+class TestPreprocessing(unittest.TestCase):
+    def setUp(self):
+        self.store = BoilerplateStore(min_jobs=3, min_chars=40)
+        self.store.build(posting(i) for i in range(5))
+
+    def test_drops_boilerplate_but_keeps_short_and_unique_lines(self):
+        preprocessor = DescriptionPreprocessor(self.store, TokenCounter(None), max_tokens=1000)
+        description = posting(99) + "\n" + FOOTER.lower()
+
+        prepared, stats = preprocessor.prepare(description)
+
+        self.assertEqual(prepared.splitlines(), ["Data Engineer 99", "Requirements:",
+                                                 "Build pipeline number 99 in Python and maintain our warehouse of 99 tables.", "Python"])
+        self.assertEqual(stats["dropped"], 3)
+        self.assertLess(stats["tokens_after"], stats["tokens_before"] / 2)
+        self.assertEqual(len(self.store), 2)
+
+    def test_token_cap(self):
+        preprocessor = DescriptionPreprocessor(BoilerplateStore(), TokenCounter(None), max_tokens=10)
+        prepared, stats = preprocessor.prepare("word " * 100)
+        self.assertLessEqual(stats["tokens_after"], 10)
+        self.assertTrue(prepared.startswith("word word"))
+        self.assertEqual(preprocessor.stats["truncated"], 1)
+
+    def test_analyzer_sends_prepared_description(self):
+        prompts = []
+
+        def fake_llm(prompt):
+            prompts.append(prompt.to_string())
+            return AIMessage(content=json.dumps({"responsibilities": ["Build pipelines"]}))
+
+        preprocessor = DescriptionPreprocessor(self.store, TokenCounter(None), max_tokens=1000)
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "dummy-key"}):
+            analyzer = JobAnalyzer(model_name="test-model", cache=AnalysisCache(), extractor_mode="off",
+                                   preprocessor=preprocessor)
+        analyzer.llm = RunnableLambda(fake_llm)
+
+        asyncio.run(analyzer.analyze_job_description_async(posting(7)))
+
+        self.assertIn("Build pipeline number 7", prompts[0])
+        self.assertNotIn("equal opportunity", prompts[0])
+        self.assertIn("saved", preprocessor.report())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+import config
+from db.database import due_for_analysis
+from db.storage import JobStorage
+from db.async_database import AsyncStorageAdapter
+from db.sqlite_database import SQLiteJobDatabase
+from scripts.job_processor import run_batches
+
+class AuthError(Exception):
+    status_code = 401
+
+class TestProcessingState(unittest.TestCase):
+    def setUp(self):
+        self.db = SQLiteJobDatabase()
+        self.ids = [self.db.upsert_job({"job_title": f"Engineer {i}", "company": "Acme",
+                                        "source_urls": [f"https://seek/{i}"], "description": f"Job {i}"})["id"]
+                    for i in range(3)]
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_failures_back_off_then_dead_letter(self):
+        job_id = self.ids[0]
+        state = self.db.record_analysis_failure(job_id, "timeout")
+
+        self.assertEqual(state["processing_status"], "retry")
+        self.assertEqual(state["attempts"], 1)
+        # Backing off: not handed out again until next_eligible_at
+        self.assertNotIn(job_id, [job["id"] for job in self.db.get_unanalyzed_jobs(10)])
+
+        with patch.dict(config.PROCESSOR_SETTINGS, {"retry_base_delay": 0}):
+            self.db.record_analysis_failure(self.ids[1], "timeout")
+        self.assertIn(self.ids[1], [job["id"] for job in self.db.get_unanalyzed_jobs(10)])
+
+        dead = self.db.record_analysis_failure(self.ids[2], "No description", retryable=False)
+        self.assertEqual(dead["processing_status"], "dead")
+        self.assertEqual([job["id"] for job in self.db.get_dead_letter_jobs()], [self.ids[2]])
+        self.assertEqual(self.db.get_dead_letter_jobs()[0]["last_error"], "No description")
+
+        self.assertEqual(self.db.requeue_jobs([self.ids[2]]), 1)
+        self.assertEqual(self.db.get_dead_letter_jobs(), [])
+        self.assertIn(self.ids[2], [job["id"] for job in self.db.get_unanalyzed_jobs(10)])
+
+    def test_rescraped_description_gives_failed_jobs_a_fresh_start(self):
+        self.db.record_analysis_failure(self.ids[0], "No description", retryable=False)
+        self.db.record_analysis_failure(self.ids[1], "timeout")
+
+        self.db.upsert_jobs([
+            {"job_title": "Engineer 0", "company": "Acme", "source_urls": ["https://seek/0"], "description": "Job 0, now filled in"},
+            {"job_title": "Engineer 1", "company": "Acme", "source_urls": ["https://seek/1"], "description": "Job 1"},
+        ])
+
+        state = {row["id"]: row for row in self.db.iter_jobs(columns=("id", "processing_status", "attempts", "last_error"))}
+        self.assertEqual((state[self.ids[0]]["processing_status"], state[self.ids[0]]["attempts"], state[self.ids[0]]["last_error"]),
+                         ("pending", 0, None))
+        # Same text: the backoff still applies
+        self.assertEqual(state[self.ids[1]]["processing_status"], "retry")
+        self.assertEqual(state[self.ids[1]]["attempts"], 1)
+        self.assertEqual(self.db.get_dead_letter_jobs(), [])
+
+    def test_client_errors_are_dead_lettered_with_the_real_error(self):
+        async def analyze(description):
+            if description == "Job 0":
+                raise AuthError("Error code: 401 - invalid api key")
+            raise ValueError("unparseable output")
+
+        analyzer = MagicMock()
+        analyzer.analyze_job_description_async = AsyncMock(side_effect=analyze)
+        with patch.dict(config.PROCESSOR_SETTINGS, {"pack_size": 1}):
+            asyncio.run(run_batches(AsyncStorageAdapter(self.db), analyzer, batch_size=3))
+
+        dead = self.db.get_dead_letter_jobs()
+        self.assertEqual([(job["id"], job["attempts"]) for job in dead], [(self.ids[0], 1)])
+        self.assertEqual(dead[0]["last_error"], "AuthError: Error code: 401 - invalid api key")
+        retrying = {row["id"]: row for row in self.db.iter_jobs(columns=("id", "processing_status", "last_error"))}
+        self.assertEqual(retrying[self.ids[1]]["processing_status"], "retry")
+        self.assertEqual(retrying[self.ids[1]]["last_error"], "ValueError: unparseable output")
+
+    def test_packed_batches_record_per_job_errors(self):
+        async def analyze_many(items):
+            return {job_id: AuthError("invalid api key") if job_id == self.ids[0] else {"skills": {}} for job_id, _ in items}
+
+        analyzer = MagicMock()
+        analyzer.analyze_job_descriptions_async = AsyncMock(side_effect=analyze_many)
+        with patch.dict(config.PROCESSOR_SETTINGS, {"pack_size": 8}):
+            stats = asyncio.run(run_batches(AsyncStorageAdapter(self.db), analyzer, batch_size=3))
+
+        self.assertEqual(stats, {"analyzed": 2, "failed": 1})
+        self.assertEqual([(job["id"], job["last_error"]) for job in self.db.get_dead_letter_jobs()],
+                         [(self.ids[0], "AuthError: invalid api key")])
+
+    @patch.dict(config.PROCESSOR_SETTINGS, {"pack_size": 1, "retry_base_delay": 0, "max_attempts": 3})
+    def test_processor_converges_around_a_poison_job(self):
+        poison = self.ids[0]
+
+        async def analyze(description):
+            if description == "Job 0":
+                raise ValueError("unparseable output")
+            return {"skills": {}}
+
+        analyzer = MagicMock()
+        analyzer.analyze_job_description_async = AsyncMock(side_effect=analyze)
+        db = AsyncStorageAdapter(self.db)
+
+        runs = [asyncio.run(run_batches(db, analyzer, batch_size=2)) for _ in range(5)]
+
+        self.assertEqual(runs[0], {"analyzed": 2, "failed": 1})
+        self.assertEqual(runs[1:3], [{"analyzed": 0, "failed": 1}] * 2)
+        # Dead-lettered after max_attempts; later runs find no work and make no LLM calls
+        self.assertEqual(runs[3:], [{"analyzed": 0, "failed": 0}] * 2)
+        self.assertEqual(analyzer.analyze_job_description_async.await_count, 5)
+        dead = self.db.get_dead_letter_jobs()
+        self.assertEqual([(job["id"], job["attempts"]) for job in dead], [(poison, 3)])
+        self.assertIn("unparseable output", dead[0]["last_error"])
+        done = self.db.get_all_jobs(columns=("id", "processing_status"))
+        self.assertEqual(sorted(job["processing_status"] for job in done), ["dead", "done", "done"])
+
+@unittest.skipUnless(hasattr(time, "tzset"), "needs time.tzset")
+class TestProcessingStateTimezone(unittest.TestCase):
+    """Backoff times are compared against the database clock, so they must not depend on the host timezone."""
+    def setUp(self):
+        self.tz = os.environ.get("TZ")
+
+    def tearDown(self):
+        if self.tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self.tz
+        time.tzset()
+
+    def test_backoff_is_utc_on_hosts_east_and_west_of_utc(self):
+        for tz in ("Australia/Sydney", "America/Los_Angeles"):
+            os.environ["TZ"] = tz
+            time.tzset()
+            with patch.dict(config.PROCESSOR_SETTINGS, {"retry_base_delay": 300}):
+                payload = JobStorage._failure_payload(1, "timeout")
+            next_eligible_at = datetime.fromisoformat(payload["next_eligible_at"])
+            self.assertEqual(next_eligible_at.utcoffset().total_seconds(), 0)
+            delay = (next_eligible_at - datetime.now(timezone.utc)).total_seconds()
+            self.assertTrue(290 < delay <= 300, (tz, delay))
+
+            query = MagicMock()
+            for method in ("is_", "in_", "or_", "order"):
+                getattr(query, method).return_value = query
+            due_for_analysis(query)
+            self.assertIn("+00:00", query.or_.call_args.args[0])
+
+            db = SQLiteJobDatabase()
+            job_id = db.upsert_job({"job_title": "Engineer", "company": "Acme", "source_urls": ["https://seek/1"],
+                                    "description": "Job"})["id"]
+            db.record_analysis_failure(job_id, "timeout")
+            self.assertEqual(db.get_unanalyzed_jobs(10), [])
+            db.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import asyncio
+import time
+from scrapers.rate_limiter import AdaptiveRateLimiter
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    def test_rate_adapts_to_responses(self):
+        """
+        Fast 200s raise the rate additively; throttling responses and errors cut it multiplicatively.
+        """
+        limiter = AdaptiveRateLimiter(initial_rate=1.0, min_rate=0.2, max_rate=1.5, increase=0.25, decrease=0.5)
+        host = "www.seek.com.au"
+
+        limiter.record(host, 200, latency=0.1)
+        self.assertAlmostEqual(limiter.current_rate(host), 1.25)
+        limiter.record(host, 200, latency=10.0)  # slow success: hold
+        self.assertAlmostEqual(limiter.current_rate(host), 1.25)
+        for _ in range(5):
+            limiter.record(host, 200, latency=0.1)
+        self.assertAlmostEqual(limiter.current_rate(host), 1.5)
+
+        limiter.record(host, 429, latency=0.1)
+        self.assertAlmostEqual(limiter.current_rate(host), 0.75)
+        limiter.record(host, None, latency=30.0, error=True)
+        self.assertAlmostEqual(limiter.current_rate(host), 0.375)
+        limiter.record(host, 403, latency=0.1)
+        self.assertAlmostEqual(limiter.current_rate(host), 0.2)
+
+        limiter.record(host, 404, latency=0.1)  # neutral
+        self.assertAlmostEqual(limiter.current_rate(host), 0.2)
+        self.assertEqual(limiter.current_rate("other.host"), 1.0)
+
+    def test_acquire_spaces_requests_per_host(self):
+        limiter = AdaptiveRateLimiter(initial_rate=20.0)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.acquire("a") for _ in range(3)))
+            await limiter.acquire("b")
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        # First request uses the initial token, the next two wait 1/20 s each
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 0.5)
+
+    def test_track_records_failures(self):
+        limiter = AdaptiveRateLimiter(initial_rate=1.0, decrease=0.5)
+
+        async def run():
+            async with limiter.track("https://www.seek.com.au/job/1") as outcome:
+                outcome.status = 200
+            with self.assertRaises(TimeoutError):
+                async with limiter.track("https://www.seek.com.au/job/2"):
+                    raise TimeoutError()
+
+        asyncio.run(run())
+        self.assertAlmostEqual(limiter.current_rate("www.seek.com.au"), 0.55)
+
+if __name__ == '__main__':
+    unittest.main()
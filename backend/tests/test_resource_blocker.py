@@ -0,0 +1,49 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, AsyncMock
+from scrapers.resource_blocker import ResourceBlocker
+
+def make_route(url, resource_type):
+    route = MagicMock()
+    route.request.url = url
+    route.request.resource_type = resource_type
+    route.abort = AsyncMock()
+    route.continue_ = AsyncMock()
+    return route
+
+class TestResourceBlocker(unittest.TestCase):
+    def test_blocks_assets_and_trackers(self):
+        """
+        Verifies that documents pass through while assets and analytics hosts are aborted.
+        """
+        blocker = ResourceBlocker()
+        document = make_route("https://www.seek.com.au/job/1", "document")
+        image = make_route("https://image-service-cdn.seek.com.au/logo.png", "image")
+        font = make_route("https://www.seek.com.au/static/font.woff2", "font")
+        tracker = make_route("https://www.googletagmanager.com/gtm.js", "script")
+
+        async def run():
+            for route in (document, image, font, tracker):
+                await blocker.handle_route(route)
+
+        asyncio.run(run())
+
+        document.continue_.assert_awaited_once()
+        document.abort.assert_not_awaited()
+        for route in (image, font, tracker):
+            route.abort.assert_awaited_once()
+
+        stats = blocker.stats()
+        self.assertEqual(stats["blocked_requests"], 3)
+        self.assertEqual(stats["blocked_by_type"], {"image": 1, "font": 1})
+        self.assertEqual(stats["blocked_trackers"], 1)
+        self.assertEqual(stats["allowed_requests"], 1)
+
+    def test_counts_loaded_bytes(self):
+        blocker = ResourceBlocker()
+        blocker._on_response(MagicMock(headers={"content-length": "1200"}))
+        blocker._on_response(MagicMock(headers={}))
+        self.assertEqual(blocker.stats()["allowed_bytes"], 1200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import unittest
+import asyncio
+from unittest.mock import patch
+from scrapers.seek_extractor import extract_job, extract_page_state
+from scrapers.seek_scraper import SeekScraper
+from scrapers.fetchers import BaseFetcher
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return f.read()
+
+class FixtureFetcher(BaseFetcher):
+    def __init__(self, html):
+        self.html = html
+
+    async def fetch(self, url):
+        return self.html
+
+class TestSeekExtractor(unittest.TestCase):
+    def test_extracts_job_from_page_state(self):
+        job = extract_job(load_fixture("seek_job_state.html"))
+
+        self.assertEqual(job["listing_id"], "81234567")
+        self.assertEqual(job["title"], "Data Scientist")
+        self.assertEqual(job["company"], "Bright Data Co")
+        self.assertEqual(job["location"], "Melbourne VIC")
+        self.assertEqual(job["salary"], "$900 – $1,000 per day")
+        self.assertEqual(job["work_type"], "Contract/Temp")
+        self.assertEqual(job["listed_at"], "2026-10-16T01:23:45.000Z")
+        self.assertIn("forecasting models", job["description_html"])
+
+    def test_missing_or_broken_state_returns_none(self):
+        self.assertIsNone(extract_job(load_fixture("seek_job.html")))
+        self.assertIsNone(extract_page_state("<script>window.SEEK_REDUX_DATA = {broken</script>"))
+        self.assertIsNone(extract_job('<script>window.SEEK_REDUX_DATA = {"jobdetails": {}};</script>'))
+
+    @patch('scrapers.base_scraper.create_storage')
+    def test_scraper_prefers_state_and_falls_back_to_dom(self, MockDB):
+        scraper = SeekScraper()
+        saved = []
+        scraper.save_job = lambda job: saved.append(job) or job
+
+        async def run():
+            await scraper._process_job(FixtureFetcher(load_fixture("seek_job_state.html")), "https://www.seek.com.au/job/81234567")
+            await scraper._process_job(FixtureFetcher(load_fixture("seek_job.html")), "https://www.seek.com.au/job/1")
+
+        asyncio.run(run())
+
+        from_state, from_dom = saved
+        self.assertEqual(from_state["job_title"], "Data Scientist")
+        self.assertEqual(from_state["posted_at"], "2026-10-16T01:23:45.000Z")
+        self.assertEqual(from_state["job_type"], "Contract/Temp")
+        self.assertIn("3+ years experience in data science", from_state["description"])
+
+        self.assertEqual(from_dom["job_title"], "Machine Learning Engineer")
+        self.assertEqual(from_dom["company"], "Acme Analytics")
+        self.assertEqual(from_dom["job_type"], "Full time")
+        self.assertIsNone(from_dom["posted_at"])
+
+if __name__ == '__main__':
+    unittest.main()
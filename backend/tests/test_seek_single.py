@@ -8,6 +8,10 @@ class SingleItemSeekScraper(SeekScraper):
     A subclass of SeekScraper that stops after finding one job
     and prints the details to the console.
     """
+    async def submit_job(self, job_data):
+        # Bypass the batch buffer so the first job is printed straight away
+        return self.save_job(job_data)
+
     def save_job(self, job_data):
         print("\n--- Scraped Job Details ---")
         for key, value in job_data.items():
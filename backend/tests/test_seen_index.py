@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from db.database import JobDatabase
+from db.seen_index import BloomFilter, SeenIndex, _digest
+
+class TestSeenIndex(unittest.TestCase):
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"https://www.seek.com.au/job/{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add_digest(_digest(key))
+
+        self.assertTrue(all(bloom.contains_digest(_digest(k)) for k in keys))
+        false_hits = sum(bloom.contains_digest(_digest(f"https://other/{i}")) for i in range(10000))
+        self.assertLess(false_hits, 300)
+
+    def test_index_answers_urls_and_fingerprints(self):
+        index = SeenIndex(expected_jobs=10)
+        index.add_job({"fingerprint": "acme|ml engineer", "source_urls": ["https://seek/1", "https://seek/2"]})
+
+        self.assertTrue(index.has_url("https://seek/2"))
+        self.assertFalse(index.has_url("https://seek/3"))
+        self.assertTrue(index.has_fingerprint("acme|ml engineer"))
+        self.assertFalse(index.has_fingerprint("acme|data scientist"))
+        self.assertEqual(index.stats(), {"urls": 2, "fingerprints": 1})
+
+    def test_database_loads_index_in_pages_and_checks_urls_locally(self):
+        """
+        Verifies that the index is loaded with keyset pages, that URL checks then
+        skip the database, and that newly saved jobs are added to the index.
+        """
+        with patch('db.database.create_client'), patch.dict('os.environ', {"SUPABASE_URL": "http://db", "SUPABASE_KEY": "key"}):
+            db = JobDatabase()
+        table = db.supabase.table.return_value
+        table.select.return_value.limit.return_value.execute.return_value = MagicMock(count=3)
+        pages = [
+            [{"id": "1", "fingerprint": "a|x", "source_urls": ["https://seek/1"]},
+             {"id": "2", "fingerprint": "b|y", "source_urls": ["https://seek/2"]}],
+            [{"id": "3", "fingerprint": "c|z", "source_urls": ["https://seek/3"]}],
+        ]
+        ordered = table.select.return_value.order.return_value.limit.return_value
+        ordered.execute.return_value = MagicMock(data=pages[0])
+        ordered.gt.return_value.execute.return_value = MagicMock(data=pages[1])
+
+        db.load_seen_index(page_size=2)
+
+        ordered.gt.assert_called_once_with("id", "2")
+        table.select.reset_mock()
+        existing = db.check_existing_urls(["https://seek/3", "https://seek/9"])
+        self.assertEqual(existing, ["https://seek/3"])
+        table.select.assert_not_called()
+        self.assertIsNone(db.get_job_by_fingerprint("Nobody", "Nothing"))
+        table.select.assert_not_called()
+
+        table.select.return_value.eq.return_value.execute.return_value = MagicMock(data=[])
+        table.insert.return_value.execute.return_value = MagicMock(
+            data=[{"id": "4", "fingerprint": "d|w", "source_urls": ["https://seek/9"]}])
+        db.upsert_job({"job_title": "W", "company": "D", "source_urls": ["https://seek/9"]})
+        self.assertTrue(db.seen_index.has_url("https://seek/9"))
+
+if __name__ == '__main__':
+    unittest.main()
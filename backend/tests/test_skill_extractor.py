@@ -0,0 +1,74 @@
+import unittest
+import asyncio
+import json
+import os
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from analyzers.analysis_cache import AnalysisCache
+from analyzers.job_analyzer import JobAnalyzer
+from analyzers.skill_extractor import AhoCorasick, SkillExtractor
+
+DESCRIPTION = """Senior ML Engineer. You will build models in Python and PyTorch, deploy them with
+Docker on AWS and ship React Native apps. 3+ years experience with Kubernetes.
+Bachelor's in Computer Science required; AWS certified preferred. Go (golang) is a plus.
+Great communication skills. Work with product and design teams."""
+
+class TestSkillExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = SkillExtractor.from_file()
+
+    def test_automaton_reports_overlapping_patterns(self):
+        automaton = AhoCorasick()
+        for pattern in ("he", "she", "his", "hers"):
+            automaton.add(pattern, pattern)
+        automaton.build()
+        self.assertEqual(sorted(automaton.iter_matches("ushers")), [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")])
+
+    def test_extracts_llm_shaped_skills(self):
+        analysis, confidence = self.extractor.extract(DESCRIPTION)
+
+        skills = analysis["skills"]
+        self.assertEqual(skills["technical_skills"], ["Machine Learning", "Python", "Go"])
+        self.assertEqual(skills["tools_and_technologies"], ["PyTorch", "Docker", "AWS", "React Native", "Kubernetes"])
+        self.assertEqual(skills["experience_years"], ["3+ years experience with Kubernetes"])
+        self.assertEqual(skills["degrees_and_certifications"], ["Bachelor's degree", "AWS Certification"])
+        self.assertGreaterEqual(confidence, 0.6)
+
+    def test_word_boundaries_and_case(self):
+        analysis, _ = self.extractor.extract("JavaScript and React.js; we excel at Spark. spark joy, not a C++ shop")
+        skills = analysis["skills"]
+        self.assertEqual(skills["technical_skills"], ["JavaScript", "C++"])
+        self.assertEqual(skills["tools_and_technologies"], ["React", "Apache Spark"])
+        self.assertEqual(self.extractor.extract("Registered nurse, caring and kind.")[1], 0.0)
+
+    def test_analyzer_only_asks_llm_for_free_text_fields(self):
+        prompts = []
+
+        def fake_llm(prompt):
+            prompts.append(prompt.to_string())
+            return AIMessage(content=json.dumps({"skills": {"soft_skills": ["Communication"]},
+                                                 "responsibilities": ["Build models"]}))
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "dummy-key"}):
+            hybrid = JobAnalyzer(model_name="test-model", cache=AnalysisCache(), extractor=self.extractor,
+                                 extractor_mode="hybrid")
+            rules_only = JobAnalyzer(model_name="test-model", cache=AnalysisCache(), extractor=self.extractor,
+                                     extractor_mode="rules")
+        hybrid.llm = rules_only.llm = RunnableLambda(fake_llm)
+
+        result = asyncio.run(hybrid.analyze_job_description_async(DESCRIPTION))
+        self.assertEqual(len(prompts), 1)
+        self.assertNotIn("tools_and_technologies", prompts[0])
+        self.assertEqual(result["skills"]["soft_skills"], ["Communication"])
+        self.assertIn("PyTorch", result["skills"]["tools_and_technologies"])
+        self.assertEqual(result["responsibilities"], ["Build models"])
+
+        # Low confidence falls back to the full prompt; rules mode skips the LLM when confident
+        hybrid.analyze_job_description("Registered nurse, caring and kind.")
+        self.assertIn("tools_and_technologies", prompts[1])
+        self.assertEqual(rules_only.analyze_job_description(DESCRIPTION), self.extractor.extract(DESCRIPTION)[0])
+        self.assertEqual(len(prompts), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from unittest.mock import patch
+from db.sqlite_database import SQLiteJobDatabase
+from db.storage import create_storage, create_async_storage
+from db.async_database import AsyncStorageAdapter
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = SQLiteJobDatabase(os.path.join(self.tmp.name, "jobs.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_upsert_merges_duplicates_like_supabase_backend(self):
+        first = self.db.upsert_job({"job_title": "ML Engineer", "company": "Acme", "locations": ["Sydney"],
+                                    "platforms": ["seek"], "source_urls": ["https://seek/1"], "description": "Old"})
+        merged = self.db.upsert_job({"job_title": " ml engineer", "company": "ACME", "location": "Melbourne",
+                                     "platforms": ["seek"], "source_urls": ["https://seek/2"], "description": "New"})
+        # Same listing URL under an edited title still merges into the same job
+        renamed = self.db.upsert_job({"job_title": "Senior ML Engineer", "company": "Acme", "source_urls": ["https://seek/2"]})
+
+        self.assertEqual(first["id"], merged["id"])
+        self.assertEqual(renamed["id"], first["id"])
+        self.assertEqual(sorted(merged["locations"]), ["Melbourne", "Sydney"])
+        self.assertEqual(merged["description"], "New")
+        self.assertEqual(len(self.db.get_all_jobs()), 1)
+        self.assertEqual(sorted(self.db.check_existing_urls(["https://seek/1", "https://seek/2", "https://seek/3"])),
+                         ["https://seek/1", "https://seek/2"])
+
+    def test_batch_analysis_and_crawl_state(self):
+        saved = self.db.upsert_jobs([
+            {"job_title": "Data Scientist", "company": "Beta", "source_urls": ["https://seek/3"]},
+            {"job_title": "data scientist", "company": "beta", "source_urls": ["https://seek/4"]},
+            {"job_title": "AI Engineer", "company": "Gamma", "source_urls": ["https://seek/5"]},
+        ])
+        self.assertEqual(len(saved), 2)
+
+        self.db.update_llm_analysis(saved[0]["id"], {"skills": {"technical_skills": ["Python"]}})
+        unanalyzed = self.db.get_unanalyzed_jobs(10)
+        self.assertEqual([job["id"] for job in unanalyzed], [saved[1]["id"]])
+        self.assertEqual(self.db.get_job_by_fingerprint("Beta", "Data Scientist")["llm_analysis"]["skills"]["technical_skills"], ["Python"])
+
+        self.db.save_crawl_state("seek", "Data Scientist", 123, "2026-01-01T00:00:00")
+        self.db.save_crawl_state("seek", "Data Scientist", 456, "2026-01-02T00:00:00")
+        self.assertEqual(self.db.get_crawl_state("seek", "Data Scientist")["newest_listing_id"], 456)
+        self.assertTrue(self.db.get_crawl_state("seek", "Data Scientist")["updated_at"].endswith("+00:00"))
+        self.assertIsNone(self.db.get_crawl_state("seek", "Other"))
+        self.assertEqual(self.db.conn.execute("pragma journal_mode").fetchone()[0], "wal")
+
+    def test_merging_duplicates_keeps_an_analysis_the_canonical_job_lacks(self):
+        canonical = self.db.upsert_job({"job_title": "ML Engineer", "company": "Acme", "source_urls": ["https://seek/1"]})
+        duplicate = self.db.upsert_job({"job_title": "Machine Learning Engineer", "company": "Acme",
+                                        "source_urls": ["https://seek/2"], "description": "Build ML systems"})
+        self.db.update_llm_analysis(duplicate["id"], {"skills": {"technical_skills": ["Python"]}})
+
+        merged = self.db.merge_duplicate_jobs(canonical["id"], [duplicate["id"]])
+
+        self.assertEqual(merged["description"], "Build ML systems")
+        self.assertEqual(merged["llm_analysis"], {"skills": {"technical_skills": ["Python"]}})
+        self.assertEqual(sorted(merged["source_urls"]), ["https://seek/1", "https://seek/2"])
+        # Already analyzed, so the processor doesn't pay for it again
+        self.assertEqual(self.db.get_unanalyzed_jobs(10), [])
+
+    def test_failed_batch_rolls_back_entirely(self):
+        description = "Build machine learning pipelines in Python and deploy models to production on AWS every week"
+        with self.assertRaises(Exception):
+            self.db.upsert_jobs([
+                {"job_title": "ML Engineer", "company": "Acme", "source_urls": ["https://seek/1"], "description": description},
+                {"job_title": "Data Scientist", "company": "Beta", "source_urls": ["https://seek/2"], "salary": object()},
+            ])
+
+        # The first job's near-duplicate buckets must not have committed it halfway through the batch
+        self.assertEqual(self.db.get_all_jobs(), [])
+        self.assertEqual(self.db.check_existing_urls(["https://seek/1"]), [])
+
+    def test_factory_selects_backend(self):
+        path = os.path.join(self.tmp.name, "factory.db")
+        with patch.dict(os.environ, {"JOB_STORAGE": "sqlite", "JOB_STORAGE_PATH": path}):
+            storage = create_storage()
+            adapter = asyncio.run(create_async_storage(storage=storage))
+        self.assertIsInstance(storage, SQLiteJobDatabase)
+        self.assertIsInstance(adapter, AsyncStorageAdapter)
+
+        storage.upsert_job({"job_title": "X", "company": "Y", "source_urls": ["https://seek/9"]})
+        jobs = asyncio.run(adapter.get_unanalyzed_jobs(5))
+        asyncio.run(adapter.update_llm_analysis(jobs[0]["id"], {"skills": {}}))
+        self.assertEqual(storage.get_unanalyzed_jobs(5), [])
+        storage.close()
+
+        with self.assertRaises(ValueError):
+            create_storage("mongo")
+
+if __name__ == '__main__':
+    unittest.main()
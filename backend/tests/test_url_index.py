@@ -0,0 +1,56 @@
+import unittest
+import hashlib
+from unittest.mock import MagicMock, patch
+from db.database import JobDatabase, URL_HASH_CHUNK_SIZE
+
+def make_db(stored_urls):
+    with patch('db.database.create_client'), patch.dict('os.environ', {"SUPABASE_URL": "http://db", "SUPABASE_KEY": "key"}):
+        db = JobDatabase()
+    postings, url_table = MagicMock(), MagicMock()
+    db.supabase.table.side_effect = lambda name: url_table if name == "job_urls" else postings
+    stored = {JobDatabase._url_hash(url): {"url_hash": JobDatabase._url_hash(url), "url": url, "job_id": job_id}
+              for url, job_id in stored_urls.items()}
+    url_table.select.return_value.in_.side_effect = lambda column, hashes: MagicMock(
+        execute=MagicMock(return_value=MagicMock(data=[stored[h] for h in hashes if h in stored])))
+    return db, postings, url_table
+
+class TestUrlIndex(unittest.TestCase):
+    def test_url_hash_matches_postgres_sha256(self):
+        url = "https://www.seek.com.au/job/123?type=standard&ré=1"
+        self.assertEqual(JobDatabase._url_hash(url), hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def test_check_existing_urls_chunks_large_batches(self):
+        urls = [f"https://www.seek.com.au/job/{i}" for i in range(250)]
+        db, postings, url_table = make_db({urls[5]: "a", urls[180]: "b"})
+
+        existing = db.check_existing_urls(urls)
+
+        self.assertEqual(sorted(existing), sorted([urls[5], urls[180]]))
+        chunks = [len(call.args[1]) for call in url_table.select.return_value.in_.call_args_list]
+        self.assertEqual(chunks, [URL_HASH_CHUNK_SIZE, URL_HASH_CHUNK_SIZE, 50])
+        postings.select.assert_not_called()
+
+    def test_upsert_job_merges_by_known_url_and_records_new_urls(self):
+        """
+        A listing re-scraped under a different title still merges into its job,
+        and every saved URL is registered in job_urls.
+        """
+        db, postings, url_table = make_db({"https://seek/1": "42"})
+        record = {"id": "42", "fingerprint": "acme|ml engineer", "source_urls": ["https://seek/1"],
+                  "locations": ["Sydney"], "platforms": ["seek"]}
+        postings.select.return_value.eq.side_effect = lambda column, value: MagicMock(
+            execute=MagicMock(return_value=MagicMock(data=[record] if column == "id" else [])))
+        postings.update.return_value.eq.return_value.execute.return_value = MagicMock(
+            data=[dict(record, source_urls=["https://seek/1", "https://seek/2"])])
+
+        db.upsert_job({"job_title": "Senior ML Engineer", "company": "Acme", "description": "",
+                       "source_urls": ["https://seek/1", "https://seek/2"]})
+
+        postings.insert.assert_not_called()
+        postings.update.return_value.eq.assert_called_with("id", "42")
+        recorded = url_table.upsert.call_args.args[0]
+        self.assertEqual(sorted(r["url"] for r in recorded), ["https://seek/1", "https://seek/2"])
+        self.assertEqual(url_table.upsert.call_args.kwargs, {"on_conflict": "url_hash", "ignore_duplicates": True})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import os
+import tempfile
+import time
+from unittest.mock import patch
+import numpy as np
+from analyzers.embeddings import HashingEmbedder
+from db.sqlite_database import SQLiteJobDatabase
+from db.vector_index import VectorIndex, EmbeddingCache, SimilarJobIndex
+import config
+
+JOBS = [
+    ("Data Scientist", "Build forecasting models in Python with pandas and scikit-learn for retail demand."),
+    ("Frontend Engineer", "Develop React and TypeScript user interfaces with a focus on accessibility."),
+    ("DevOps Engineer", "Run Kubernetes clusters on AWS, manage Terraform and CI/CD pipelines."),
+]
+
+class TestVectorIndex(unittest.TestCase):
+    def test_top_k_matches_brute_force_over_100k_jobs(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((100_000, 128)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        index = VectorIndex(128)
+        index.upsert([str(i) for i in range(len(vectors))], vectors)
+        query = vectors[42] + 0.1 * rng.standard_normal(128).astype(np.float32)
+        results = index.search(query, k=10)
+
+        expected = np.argsort(vectors @ (query / np.linalg.norm(query)))[::-1][:10]
+        self.assertEqual([int(i) for i, _ in results], expected.tolist())
+        self.assertEqual(results[0][0], "42")
+
+        index.remove(["42"])
+        self.assertNotIn("42", [i for i, _ in index.search(query, k=10)])
+        self.assertEqual(len(index), 99_999)
+
+    def test_sync_is_incremental_and_cache_persists(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache_path = os.path.join(tmp.name, "embeddings.npz")
+        db = SQLiteJobDatabase()
+        for i, (title, description) in enumerate(JOBS):
+            db.upsert_job({"job_title": title, "company": "Acme", "source_urls": [f"https://seek/{i}"], "description": description})
+
+        index = SimilarJobIndex(db, HashingEmbedder(256), EmbeddingCache(cache_path), batch_size=2)
+        self.assertEqual(index.sync(), 3)
+        results = index.search_text("Kubernetes and Terraform on AWS", threshold=0.0, limit=2)
+        self.assertEqual(results[0]["job_title"], "DevOps Engineer")
+
+        # Only the changed job (plus the row at the watermark) is re-read, and only it is re-embedded
+        time.sleep(0.001)
+        db.upsert_job({"job_title": "Data Scientist", "company": "Acme", "source_urls": ["https://seek/9"],
+                       "description": "Train deep learning models with PyTorch for computer vision."})
+        self.assertEqual(index.sync(), 2)
+        self.assertEqual(index.stats["embedded"], 4)
+        self.assertEqual(len(index.index), 3)
+
+        # A new process reuses the persisted embeddings
+        reloaded = SimilarJobIndex(db, HashingEmbedder(256), EmbeddingCache(cache_path))
+        reloaded.sync()
+        self.assertEqual(reloaded.stats, {"embedded": 0, "cached": 3})
+
+    def test_merges_drop_duplicates_without_a_rescan(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db = SQLiteJobDatabase()
+        self.addCleanup(db.close)
+        ids = [db.upsert_job({"job_title": title, "company": "Acme", "source_urls": [f"https://seek/{i}"],
+                              "description": description})["id"] for i, (title, description) in enumerate(JOBS)]
+        settings = {"model": "local", "dimensions": 256, "cache_path": os.path.join(tmp.name, "e.npz"),
+                    "sync_interval": 300, "rebuild_interval": 86400}
+        with patch.dict(config.EMBEDDING_SETTINGS, settings):
+            index = db.similar_jobs_index()
+        self.assertTrue(index.synced.wait(5))
+
+        with patch.object(db, "iter_jobs", wraps=db.iter_jobs) as iter_jobs:
+            db.merge_duplicate_jobs(ids[0], [ids[1]])
+            results = index.search_text("React TypeScript interfaces", threshold=0.0, limit=3)
+        iter_jobs.assert_not_called()
+        self.assertEqual(len(index.index), 2)
+        self.assertNotIn(ids[1], [r["id"] for r in results])
+
+        # A delete another process made is dropped by the next full rebuild
+        with db.conn:
+            db.conn.execute("delete from job_postings where id = ?", (ids[2],))
+        index.sync(full=True)
+        self.assertEqual([r["id"] for r in index.search_text("Kubernetes", threshold=0.0, limit=3)], [ids[0]])
+
+    @unittest.skipUnless(hasattr(time, "tzset"), "needs time.tzset")
+    def test_merges_on_a_non_utc_host_are_picked_up(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db = SQLiteJobDatabase()
+        db.upsert_job({"job_title": "Data Scientist", "company": "Acme", "source_urls": ["https://seek/0"],
+                       "description": JOBS[0][1]})
+        index = SimilarJobIndex(db, HashingEmbedder(256), EmbeddingCache(os.path.join(tmp.name, "e.npz")))
+        index.sync()
+
+        # Local time is hours behind UTC, so a naive local updated_at would sort before the watermark
+        with patch.dict(os.environ, {"TZ": "America/Los_Angeles"}):
+            time.tzset()
+            db.upsert_job({"job_title": "Data Scientist", "company": "Acme", "source_urls": ["https://seek/9"],
+                           "description": "Train deep learning models with PyTorch for computer vision."})
+        time.tzset()
+        self.assertEqual(index.sync(), 1)
+        self.assertEqual(index.stats["embedded"], 2)
+
+    def test_storage_search_similar_jobs(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db = SQLiteJobDatabase()
+        for i, (title, description) in enumerate(JOBS):
+            db.upsert_job({"job_title": title, "company": "Acme", "source_urls": [f"https://seek/{i}"], "description": description})
+
+        self.addCleanup(db.close)
+
+        settings = {"model": "local", "dimensions": 64, "cache_path": os.path.join(tmp.name, "e.npz"),
+                    "sync_interval": 300, "rebuild_interval": 86400}
+        with patch.dict(config.EMBEDDING_SETTINGS, settings):
+            # Syncing happens in the background, never in the query
+            self.assertTrue(db.similar_jobs_index().synced.wait(5))
+            query = HashingEmbedder(64).embed(["React TypeScript interfaces"])[0]
+            results = db.search_similar_jobs(query.tolist(), threshold=0.1, limit=1)
+
+        self.assertEqual([r["job_title"] for r in results], ["Frontend Engineer"])
+        self.assertEqual(HashingEmbedder(64).embed(["same text"]).tolist(), HashingEmbedder(64).embed(["same text"]).tolist())
+
+if __name__ == '__main__':
+    unittest.main()